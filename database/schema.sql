@@ -82,6 +82,13 @@ CREATE TABLE prazos (
     descricao TEXT,
     documento_relacionado_id UUID REFERENCES documentos(id),
     google_calendar_event_id VARCHAR(255),
+    -- Derivação do vencimento (prazos contados em dias; NULL em datas explícitas)
+    origem VARCHAR(50), -- data_explicita, prazo_processual, prazo_padrao, palavra_chave
+    data_base DATE, -- data a partir da qual o prazo é contado
+    dias INTEGER,
+    contagem VARCHAR(20), -- dias_uteis, dias_corridos
+    tribunal VARCHAR(20), -- calendário de feriados (python/data/feriados.json)
+    comarca VARCHAR(100),
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
@@ -130,6 +137,11 @@ CREATE INDEX idx_documentos_tipo ON documentos(tipo_documento);
 CREATE INDEX idx_prazos_caso_id ON prazos(caso_id);
 CREATE INDEX idx_prazos_vencimento ON prazos(data_vencimento);
 CREATE INDEX idx_prazos_status ON prazos(status);
+-- Dias que entram na contagem de cada prazo derivado: localiza os prazos
+-- afetados por um novo feriado ou suspensão (deadline_recompute.py)
+CREATE INDEX idx_prazos_janela_contagem ON prazos
+    USING gist (daterange(data_base, data_vencimento, '[]'))
+    WHERE data_base IS NOT NULL AND data_vencimento >= data_base;
 CREATE INDEX idx_linha_tempo_caso_id ON linha_tempo(caso_id);
 CREATE INDEX idx_linha_tempo_data_evento ON linha_tempo(data_evento);
 CREATE INDEX idx_checklists_juridicos_tipo_acao ON checklists_juridicos(tipo_acao);
@@ -160,3 +172,31 @@ CREATE TRIGGER update_prazos_updated_at BEFORE UPDATE ON prazos
 CREATE TRIGGER update_checklists_caso_updated_at BEFORE UPDATE ON checklists_caso
     FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
+
+-- Aviso de prazos inseridos, alterados ou removidos ao agendador de prazos
+-- (deadline_scheduler.py), que mantém os prazos em aberto em memória. O canal
+-- é o argumento do trigger e deve ser o mesmo de SCHEDULER_CHANNEL (.env)
+CREATE OR REPLACE FUNCTION notify_prazos_alterados()
+RETURNS TRIGGER AS $$
+DECLARE
+    prazo prazos%ROWTYPE;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        prazo := OLD;
+    ELSE
+        prazo := NEW;
+    END IF;
+    PERFORM pg_notify(COALESCE(TG_ARGV[0], 'prazos_alterados'), json_build_object(
+        'operacao', TG_OP,
+        'id', prazo.id,
+        'status', prazo.status,
+        'data_vencimento', prazo.data_vencimento,
+        'data_lembrete', prazo.data_lembrete
+    )::text);
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+CREATE TRIGGER notify_prazos_alterados
+    AFTER INSERT OR DELETE OR UPDATE OF status, data_vencimento, data_lembrete ON prazos
+    FOR EACH ROW EXECUTE FUNCTION notify_prazos_alterados('prazos_alterados');
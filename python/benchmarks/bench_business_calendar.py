@@ -0,0 +1,115 @@
+"""
+JurisPilot - Benchmark do calendário forense
+Compara o cálculo de vencimentos em dias úteis de muitos prazos (tribunais e
+comarcas variados): laço dia a dia em Python, uma chamada de
+BusinessCalendar.add_business_days por prazo e add_business_days_bulk
+
+Uso:
+    python benchmarks/bench_business_calendar.py [--prazos N] [--repeticoes N]
+"""
+
+import sys
+import time
+import random
+import logging
+from pathlib import Path
+from datetime import date, timedelta
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import numpy as np
+from loguru import logger
+from business_calendar import BusinessCalendar
+
+logger.remove()
+logger.add(sys.stderr, level=logging.WARNING)
+
+CALENDARIOS = [(None, None), ('TJSP', 'São Paulo'), ('TJSP', 'Campinas'), ('TJRJ', 'Rio de Janeiro'),
+               ('TJRS', 'Porto Alegre'), ('TRF3', None), ('TRF4', None), ('TJMG', 'Belo Horizonte')]
+DIAS = [3, 5, 5, 15, 15, 15, 15, 30]
+
+
+def synthetic_prazos(total: int):
+    """Prazos com datas de intimação entre 2023 e 2026"""
+    rng = random.Random(7)
+    inicio = date(2023, 1, 1)
+    inicios, dias, tribunais, comarcas = [], [], [], []
+    for _ in range(total):
+        tribunal, comarca = rng.choice(CALENDARIOS)
+        inicios.append(inicio + timedelta(days=rng.randrange(4 * 365)))
+        dias.append(rng.choice(DIAS))
+        tribunais.append(tribunal)
+        comarcas.append(comarca)
+    return inicios, dias, tribunais, comarcas
+
+
+def loop_prazos(calendario: BusinessCalendar, inicios, dias, tribunais, comarcas):
+    """Laço dia a dia com um conjunto de feriados por calendário"""
+    feriados = {}
+    vencimentos = []
+    for inicio, total, tribunal, comarca in zip(inicios, dias, tribunais, comarcas):
+        chave = (tribunal, comarca)
+        if chave not in feriados:
+            feriados[chave] = set(calendario.holidays(tribunal, comarca).astype(date).tolist())
+        sem_expediente = feriados[chave]
+        dia = inicio
+        while dia.weekday() >= 5 or dia in sem_expediente:
+            dia += timedelta(days=1)
+        contados = 0
+        while contados < total:
+            dia += timedelta(days=1)
+            if dia.weekday() < 5 and dia not in sem_expediente:
+                contados += 1
+        vencimentos.append(dia)
+    return np.array(vencimentos, dtype='datetime64[D]')
+
+
+def row_prazos(calendario: BusinessCalendar, inicios, dias, tribunais, comarcas):
+    """Uma chamada de add_business_days por prazo"""
+    return np.array([calendario.add_business_days(*row) for row in zip(inicios, dias, tribunais, comarcas)],
+                    dtype='datetime64[D]')
+
+
+def bulk_prazos(calendario: BusinessCalendar, inicios, dias, tribunais, comarcas):
+    """Todos os prazos em uma chamada"""
+    return calendario.add_business_days_bulk(inicios, dias, tribunais, comarcas)
+
+
+def best_time(func, repeats: int) -> float:
+    """Melhor tempo entre as repetições"""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    args = sys.argv[1:]
+    repeats = 3
+    total = 50000
+    if '--repeticoes' in args:
+        repeats = int(args[args.index('--repeticoes') + 1])
+    if '--prazos' in args:
+        total = int(args[args.index('--prazos') + 1])
+
+    calendario = BusinessCalendar()
+    prazos = synthetic_prazos(total)
+
+    # Calendários construídos antes das medições (e conferência dos resultados)
+    esperado = loop_prazos(calendario, *prazos)
+    assert np.array_equal(row_prazos(calendario, *prazos), esperado)
+    assert np.array_equal(bulk_prazos(calendario, *prazos), esperado)
+    print(f"{total} prazos, {len(CALENDARIOS)} calendários: vencimentos idênticos")
+
+    print(f"{'implementação':>22} {'tempo (ms)':>11} {'prazos/s':>12}")
+    for name, func in [('laço dia a dia', loop_prazos),
+                       ('add_business_days', row_prazos),
+                       ('add_business_days_bulk', bulk_prazos)]:
+        elapsed = best_time(lambda: func(calendario, *prazos), repeats)
+        print(f"{name:>22} {elapsed * 1000:>11.1f} {total / elapsed:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
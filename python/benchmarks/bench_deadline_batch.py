@@ -0,0 +1,93 @@
+"""
+JurisPilot - Benchmark da extração de prazos em lote
+Compara a carga histórica de prazos documento a documento (um
+extract_deadlines por intimação, como em uma requisição por documento) com
+DeadlineBatchExtractor.extract_many conforme o número de processos
+
+Uso:
+    python benchmarks/bench_deadline_batch.py [--documentos N] [--kb N] [--processos 1,2,4] [--repeticoes N]
+"""
+
+import os
+import sys
+import time
+import logging
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from loguru import logger
+from deadline_extractor import DeadlineExtractor
+from deadline_batch import DeadlineBatchExtractor
+from bench_deadline_extractor import synthetic_intimacao
+
+logger.remove()
+logger.add(sys.stderr, level=logging.WARNING)
+
+
+def synthetic_itens(total: int, size_kb: int):
+    """Intimações de tamanhos variados (metade a uma vez e meia size_kb)"""
+    return [
+        {
+            'documento_info': {
+                'texto_extraido': synthetic_intimacao(max(1, size_kb * (2 + index % 3) // 4), seed=index),
+                'data_documento': '2024-11-04',
+                'tribunal': ('TJSP', 'TJRJ', 'TRF3', None)[index % 4]
+            },
+            'tipo_acao': 'Cível'
+        }
+        for index in range(total)
+    ]
+
+
+def best_time(func, repeats: int) -> float:
+    """Melhor tempo entre as repetições"""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    args = sys.argv[1:]
+    repeats = 3
+    total = 2000
+    size_kb = 8
+    cpus = os.cpu_count() or 1
+    processos = sorted({1, 2, 4, cpus})
+    if '--repeticoes' in args:
+        repeats = int(args[args.index('--repeticoes') + 1])
+    if '--documentos' in args:
+        total = int(args[args.index('--documentos') + 1])
+    if '--kb' in args:
+        size_kb = int(args[args.index('--kb') + 1])
+    if '--processos' in args:
+        processos = [int(value) for value in args[args.index('--processos') + 1].split(',')]
+
+    extractor = DeadlineExtractor()
+    itens = synthetic_itens(total, size_kb)
+    esperado = [{'success': True, 'data': extractor.extract_deadlines(item['documento_info'], item['tipo_acao'])}
+                for item in itens]
+
+    print(f"{total} intimações de ~{size_kb} KB, {cpus} CPU(s)")
+    print(f"{'implementação':>28} {'tempo (s)':>10} {'documentos/s':>13} {'ganho':>7}")
+    base = best_time(lambda: [extractor.extract_deadlines(item['documento_info'], item['tipo_acao'])
+                              for item in itens], repeats)
+    print(f"{'documento a documento':>28} {base:>10.2f} {total / base:>13.0f} {1.0:>6.1f}x")
+
+    for workers in processos:
+        lote = DeadlineBatchExtractor(workers=workers, extractor=extractor)
+        try:
+            # Processos iniciados (e resultados conferidos) antes da medição
+            assert lote.extract_many(itens) == esperado
+            elapsed = best_time(lambda: lote.extract_many(itens), repeats)
+        finally:
+            lote.close()
+        name = f"extract_many ({workers} proc.)"
+        print(f"{name:>28} {elapsed:>10.2f} {total / elapsed:>13.0f} {base / elapsed:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
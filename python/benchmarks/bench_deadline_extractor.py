@@ -0,0 +1,222 @@
+"""
+JurisPilot - Benchmark do extrator de prazos
+Compara a extração de prazos com uma busca no texto inteiro por padrão
+(6 datas explícitas, "N dias para ..." e 13 palavras-chave - implementação
+anterior) e com a varredura única do DeadlineExtractor
+
+Uso:
+    python benchmarks/bench_deadline_extractor.py [--kb N] [--repeticoes N]
+
+Antes de medir, confere em um corpus de referência (casos com ocorrências
+sobrepostas, maiúsculas, acentos e intimações sintéticas) que as duas
+implementações produzem os mesmos prazos, na mesma ordem, antes e depois da
+remoção de duplicatas.
+"""
+
+import re
+import sys
+import time
+import random
+import logging
+from pathlib import Path
+from datetime import datetime, timedelta
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from loguru import logger
+from deadline_extractor import DeadlineExtractor
+from keyword_automaton import KeywordAutomaton
+
+logger.remove()
+logger.add(sys.stderr, level=logging.WARNING)
+
+LEGACY_DATE_PATTERNS = [
+    r'vencimento[:\s]+(\d{2}/\d{2}/\d{4})',
+    r'vencer[áa]\s+em[:\s]+(\d{2}/\d{2}/\d{4})',
+    r'prazo[:\s]+até[:\s]+(\d{2}/\d{2}/\d{4})',
+    r'data\s+limite[:\s]+(\d{2}/\d{2}/\d{4})',
+    r'até\s+o\s+dia[:\s]+(\d{2}/\d{2}/\d{4})',
+    r'(\d{2}/\d{2}/\d{4})\s+é\s+o\s+prazo',
+]
+LEGACY_PROCEDURAL_PATTERN = r'(\d+)\s+dias?\s+(?:para|de|para o|para a)?\s*([a-záàâãéêíóôõúç\s]+)'
+LEGACY_PRAZOS_AUTOMATON = KeywordAutomaton({nome: [nome] for nome in DeadlineExtractor.PRAZOS_PROCESSUAIS})
+
+GOLDEN_CASES = [
+    "Prazo: até 25/12/2024 para apresentar contestação.",
+    "PRAZO ATÉ 10/01/2025. Vencimento: 15/01/2025\nData limite: 20/01/2025",
+    "O réu deverá se manifestar até o dia 05/02/2025, sob pena de revelia",
+    "15/03/2025 é o prazo final. Vencerá em 16/03/2025 a parcela",
+    "Fica intimado para, no prazo de 15 dias para contestação, apresentar defesa",
+    "intimação: 5 dias para embargos de declaração e 15 dias úteis para apelação",
+    "No período de 30 dias de manifestação; dentro de 10 dias para réplica",
+    "deadline: 01/04/2025 due date: 02/04/2025 expirar em 03/04/2025",
+    "A expiração: 04/04/2025 limite 05/04/2025 até 06/04/2025 até 06/04/2025",
+    "vencimentovencimento: 07/04/2025 prazoprazo: 08/04/2025",
+    "115 dias para recurso e 2 dias para cumprimento de sentença",
+    "Ação de alimentos. Prazo de contestacao e impugnação ao cumprimento de sentença",
+    "DATA LIMITE 31/12/2099 e data limite: 31/12/2024 vencimento 30/02/2025",
+    "até\nvencimento:\n09/04/2025 prazo:\taté\t10/04/2025",
+    "LIMITE: 11/04/2025 — lımite: 12/04/2025; vencımento 13/04/2025",
+    "15 dias para CONTESTAÇÃO • RECURSO ESPECIAL; ATÉ O DIA 14/04/2025",
+    "Prazo até 15/04/2025 — 20 dias de impugnacao",
+]
+
+PARAGRAPHS = [
+    "Fica a parte ré intimada para apresentar contestação no prazo de 15 dias.",
+    "Prazo: até {data} para manifestação sobre os documentos juntados.",
+    "O recurso deverá ser interposto em 15 dias para apelação, contados da publicação.",
+    "Vencimento: {data}. Após essa data incidirão juros e multa.",
+    "O autor requer a procedência do pedido nos termos da petição inicial.",
+    "Audiência designada; as partes deverão comparecer até o dia {data}.",
+    "Certifico que decorreu o prazo legal sem manifestação da parte contrária.",
+    "Intimem-se. Cumpra-se no prazo de 5 dias para embargos de declaração.",
+    "Os autos foram remetidos ao contador judicial para atualização do débito.",
+    "Data limite: {data} para o pagamento voluntário, sob pena de penhora.",
+]
+
+
+def synthetic_intimacao(size_kb: int, seed: int = 7) -> str:
+    """Intimação longa com parágrafos típicos e datas de vencimento"""
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    target = size_kb * 1024
+    parts = []
+    length = 0
+    while length < target:
+        data = (start + timedelta(days=rng.randrange(900))).strftime('%d/%m/%Y')
+        paragraph = rng.choice(PARAGRAPHS).format(data=data)
+        parts.append(paragraph)
+        length += len(paragraph) + 1
+    return '\n'.join(parts)
+
+
+class LegacyDeadlineExtractor(DeadlineExtractor):
+    """Implementação anterior: uma busca no texto inteiro por padrão"""
+
+    def raw_deadlines(self, texto: str, data_base, tipo_acao=None):
+        prazos = []
+
+        for pattern in LEGACY_DATE_PATTERNS:
+            for match in re.finditer(pattern, texto, re.IGNORECASE):
+                data_str = match.group(1)
+                parsed_date = self.date_engine.parse(data_str)
+                if parsed_date:
+                    prazos.append({
+                        'tipo_prazo': 'processual',
+                        'data_vencimento': parsed_date.strftime('%Y-%m-%d'),
+                        'descricao': f"Prazo identificado: {data_str}",
+                        'origem': 'data_explicita',
+                        'confianca': 'alta'
+                    })
+
+        for match in re.finditer(LEGACY_PROCEDURAL_PATTERN, texto, re.IGNORECASE):
+            # Vencimento calculado como na implementação atual (calendário forense)
+            prazo = self._procedural_deadline(int(match.group(1)), match.group(2).strip().lower(),
+                                              data_base, None, None)
+            if prazo:
+                prazos.append(prazo)
+        encontrados = {hit.rotulo for hit in LEGACY_PRAZOS_AUTOMATON.find_all(texto)}
+        prazos.extend(DeadlineExtractor._extract_procedural_deadlines(self, [], encontrados, data_base, tipo_acao))
+
+        for keyword in self.PRAZO_KEYWORDS:
+            for match in re.finditer(rf'{keyword}[:\s]+([^\.\n]+)', texto, re.IGNORECASE):
+                contexto = match.group(1).strip()
+                data_match = re.search(r'(\d{2}/\d{2}/\d{4})', contexto)
+                if data_match:
+                    parsed_date = self.date_engine.parse(data_match.group(1))
+                    if parsed_date:
+                        prazos.append({
+                            'tipo_prazo': 'processual',
+                            'data_vencimento': parsed_date.strftime('%Y-%m-%d'),
+                            'descricao': f"Prazo encontrado: {contexto[:100]}",
+                            'origem': 'palavra_chave',
+                            'confianca': 'media'
+                        })
+
+        return prazos
+
+    def extract_deadlines(self, documento_info, tipo_acao=None):
+        texto = documento_info.get('texto_extraido', '')
+        if not texto:
+            return []
+        prazos = self.raw_deadlines(texto, documento_info.get('data_documento'), tipo_acao)
+        return self._deduplicate_and_validate(prazos)
+
+
+def raw_deadlines(extractor: DeadlineExtractor, texto: str, data_base, tipo_acao=None):
+    """Prazos da varredura única antes da remoção de duplicatas"""
+    varredura = extractor.scan(texto)
+    candidatos = varredura.candidatos
+    return (extractor._extract_explicit_deadlines(candidatos['data_explicita'], data_base)
+            + extractor._extract_procedural_deadlines(candidatos['prazo_processual'], varredura.prazos_conhecidos,
+                                                      data_base, tipo_acao)
+            + extractor._extract_keyword_deadlines(candidatos['palavra_chave'], data_base))
+
+
+LEGACY_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in
+                   LEGACY_DATE_PATTERNS + [LEGACY_PROCEDURAL_PATTERN]
+                   + [rf'{keyword}[:\s]+([^\.\n]+)' for keyword in DeadlineExtractor.PRAZO_KEYWORDS]]
+
+
+def legacy_scan(texto: str):
+    """Só a localização das ocorrências na implementação anterior (20 buscas e o autômato)"""
+    matches = [list(pattern.finditer(texto)) for pattern in LEGACY_PATTERNS]
+    return matches, {hit.rotulo for hit in LEGACY_PRAZOS_AUTOMATON.find_all(texto)}
+
+
+def check_golden(legacy: LegacyDeadlineExtractor, current: DeadlineExtractor) -> int:
+    """Confere que as duas implementações produzem os mesmos prazos"""
+    corpus = GOLDEN_CASES + [synthetic_intimacao(8, seed) for seed in range(5)]
+    checked = 0
+    for texto in corpus:
+        for data_base in ('2024-11-04', None):
+            documento = {'texto_extraido': texto, 'data_documento': data_base}
+            esperado = legacy.raw_deadlines(texto, data_base)
+            obtido = raw_deadlines(current, texto, data_base)
+            assert obtido == esperado, f"prazos divergentes em: {texto[:60]!r}"
+            assert current.extract_deadlines(documento) == legacy.extract_deadlines(documento)
+            checked += 1
+    return checked
+
+
+def best_time(func, repeats: int) -> float:
+    """Melhor tempo entre as repetições"""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    args = sys.argv[1:]
+    repeats = 5
+    sizes = [20, 1024]
+    if '--repeticoes' in args:
+        repeats = int(args[args.index('--repeticoes') + 1])
+    if '--kb' in args:
+        sizes = [int(args[args.index('--kb') + 1])]
+
+    legacy = LegacyDeadlineExtractor()
+    current = DeadlineExtractor()
+
+    checked = check_golden(legacy, current)
+    print(f"Corpus de referência: {checked} casos com saídas idênticas")
+
+    print(f"{'texto':>8} {'implementação':>28} {'tempo (ms)':>11} {'prazos':>7}")
+    for size_kb in sizes:
+        documento = {'texto_extraido': synthetic_intimacao(size_kb), 'data_documento': '2024-11-04'}
+        label = f"{size_kb} KB"
+        for name, func in [('ocorrências: padrão por vez', legacy_scan),
+                           ('ocorrências: varredura única', current.scan)]:
+            elapsed = best_time(lambda: func(documento['texto_extraido']), repeats)
+            print(f"{label:>8} {name:>28} {elapsed * 1000:>11.2f} {'':>7}")
+        for name, extractor in [('extração: padrão por vez', legacy), ('extração: varredura única', current)]:
+            prazos = extractor.extract_deadlines(documento)
+            elapsed = best_time(lambda: extractor.extract_deadlines(documento), repeats)
+            print(f"{label:>8} {name:>28} {elapsed * 1000:>11.2f} {len(prazos):>7}")
+
+
+if __name__ == "__main__":
+    main()
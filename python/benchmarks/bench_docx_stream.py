@@ -0,0 +1,125 @@
+"""
+JurisPilot - Benchmark da leitura de DOCX em fluxo
+Compara a extração de texto de um contrato longo (cláusulas e tabelas) com o
+modelo de objetos do python-docx (implementação anterior) e com o
+DocxStreamReader. Cada implementação roda em um subprocesso próprio para que
+o pico de memória (RSS) medido seja apenas o dela.
+
+Uso:
+    python benchmarks/bench_docx_stream.py [--paginas N] [--repeticoes N]
+"""
+
+import os
+import sys
+import json
+import time
+import resource
+import tempfile
+import subprocess
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+CLAUSE = (
+    "Cláusula {n}. O CONTRATANTE pagará ao CONTRATADO o valor de R$ 12.345,67 até o "
+    "dia 15/03/2024, sob pena de multa de 2% e juros de 1% ao mês, nos termos do "
+    "art. {n} do Código Civil, ficando eleito o foro da comarca de São Paulo."
+)
+PARAGRAPHS_PER_PAGE = 8
+TABLE_EVERY_PAGES = 4
+TABLE_ROWS = 20
+
+
+def build_contract(path: str, pages: int):
+    """Contrato sintético: cláusulas, uma tabela a cada poucas páginas e quebras de página"""
+    from docx import Document
+
+    doc = Document()
+    doc.core_properties.title = "Contrato de prestação de serviços"
+    doc.core_properties.author = "Escritório"
+    clause = 1
+    for page in range(1, pages + 1):
+        for _ in range(PARAGRAPHS_PER_PAGE):
+            doc.add_paragraph(CLAUSE.format(n=clause))
+            clause += 1
+        if page % TABLE_EVERY_PAGES == 0:
+            table = doc.add_table(rows=TABLE_ROWS, cols=4)
+            for row_index, row in enumerate(table.rows):
+                for col_index, cell in enumerate(row.cells):
+                    cell.text = f"Parcela {row_index + 1}.{col_index + 1}: R$ 1.000,00"
+        if page < pages:
+            doc.add_page_break()
+    doc.save(path)
+
+
+def legacy_extract(path: str) -> str:
+    """Implementação anterior: python-docx com concatenação de strings"""
+    from docx import Document
+
+    text = ""
+    doc = Document(path)
+    for paragraph in doc.paragraphs:
+        text += paragraph.text + "\n"
+    for table in doc.tables:
+        for row in table.rows:
+            for cell in row.cells:
+                text += cell.text + " "
+            text += "\n"
+    return text
+
+
+def stream_extract(path: str) -> str:
+    """DocxStreamReader: blocos na ordem do documento"""
+    from docx_stream import DocxStreamReader
+
+    return "\n".join(block.texto for block in DocxStreamReader(path).iter_blocks())
+
+
+def run_child(mode: str, path: str, repeats: int):
+    """Executa uma implementação e imprime tempo, pico de RSS e tamanho do texto (JSON)"""
+    func = legacy_extract if mode == 'anterior' else stream_extract
+    best = float('inf')
+    chars = 0
+    for _ in range(repeats):
+        start = time.perf_counter()
+        chars = len(func(path))
+        best = min(best, time.perf_counter() - start)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({'tempo': best, 'rss_kb': peak, 'caracteres': chars}))
+
+
+def main():
+    args = sys.argv[1:]
+    if '--executar' in args:
+        index = args.index('--executar')
+        run_child(args[index + 1], args[index + 2], int(args[index + 3]))
+        return
+
+    pages = 200
+    repeats = 3
+    if '--paginas' in args:
+        pages = int(args[args.index('--paginas') + 1])
+    if '--repeticoes' in args:
+        repeats = int(args[args.index('--repeticoes') + 1])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'contrato.docx')
+        build_contract(path, pages)
+        size_kb = os.path.getsize(path) / 1024
+        print(f"Contrato: {pages} páginas, {size_kb:.0f} KB")
+
+        print(f"{'implementação':>16} {'tempo (ms)':>11} {'pico RSS (MB)':>14} {'caracteres':>11} {'speedup':>8}")
+        legacy_time = None
+        for mode, name in [('anterior', 'python-docx'), ('fluxo', 'DocxStreamReader')]:
+            output = subprocess.run(
+                [sys.executable, __file__, '--executar', mode, path, str(repeats)],
+                check=True, capture_output=True, text=True
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            legacy_time = legacy_time or result['tempo']
+            print(f"{name:>16} {result['tempo'] * 1000:>11.1f} {result['rss_kb'] / 1024:>14.1f} "
+                  f"{result['caracteres']:>11} {legacy_time / result['tempo']:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
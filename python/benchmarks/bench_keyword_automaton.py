@@ -0,0 +1,118 @@
+"""
+JurisPilot - Benchmark do autômato de palavras-chave
+Compara a identificação do tipo de documento e dos prazos processuais
+conhecidos feita com laços de "palavra in texto" (implementação anterior) e
+com o KeywordAutomaton
+
+Uso:
+    python benchmarks/bench_keyword_automaton.py [--repeticoes N]
+
+Os laços anteriores só respondem "alguma palavra aparece?"; a linha
+"laços com contagem" mostra o custo de obter a mesma informação que o
+autômato fornece (número de ocorrências e primeira posição de cada palavra).
+"""
+
+import sys
+import time
+import random
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from keyword_automaton import KeywordAutomaton
+from document_processor import DocumentProcessor
+from deadline_extractor import DeadlineExtractor
+
+WORDS = (
+    "o autor requer a procedência do pedido nos termos da petição inicial fica o réu "
+    "intimado para apresentar no prazo legal audiência designada juntada de documento "
+    "anexo parte contrária deferimento exposto fundamentos jurisprudência tribunal"
+).split()
+KEYWORDS = ["contestação", "recurso", "certidão de nascimento", "comprovante de pagamento",
+            "contrato", "protocolo", "extrato", "sentença"]
+PRAZOS_AUTOMATON = KeywordAutomaton({nome: [nome] for nome in DeadlineExtractor.PRAZOS_PROCESSUAIS})
+
+
+def synthetic_text(size_kb: int) -> str:
+    """Texto com palavras comuns e, ocasionalmente, palavras-chave"""
+    random.seed(7)
+    target = size_kb * 1024
+    parts = []
+    length = 0
+    while length < target:
+        word = random.choice(KEYWORDS) if random.random() < 0.002 else random.choice(WORDS)
+        parts.append(word)
+        length += len(word) + 1
+    return ' '.join(parts)
+
+
+def legacy_document_type(text: str) -> str:
+    """Implementação anterior: primeira palavra encontrada na ordem da tabela"""
+    text_lower = text.lower()
+    for doc_type, keywords in DocumentProcessor.DOCUMENT_TYPES.items():
+        for keyword in keywords:
+            if keyword in text_lower:
+                return doc_type
+    return 'documento_generico'
+
+
+def legacy_counts(text: str):
+    """Laços com contagem e primeira posição de cada palavra (mesma informação do autômato)"""
+    text_lower = text.lower()
+    tables = [DocumentProcessor.DOCUMENT_TYPES,
+              {nome: [nome] for nome in DeadlineExtractor.PRAZOS_PROCESSUAIS}]
+    return [
+        {keyword: (text_lower.count(keyword), text_lower.find(keyword))
+         for keywords in table.values() for keyword in keywords}
+        for table in tables
+    ]
+
+
+def legacy_prazos(text: str):
+    """Implementação anterior dos prazos conhecidos"""
+    return [nome for nome in DeadlineExtractor.PRAZOS_PROCESSUAIS if nome in text.lower()]
+
+
+def run_legacy(text: str):
+    return legacy_document_type(text), legacy_prazos(text)
+
+
+def run_automaton(text: str):
+    document_type = DocumentProcessor.DOCUMENT_TYPE_AUTOMATON.best(text)
+    prazos = {hit.rotulo for hit in PRAZOS_AUTOMATON.find_all(text)}
+    return document_type, prazos
+
+
+def best_time(func, repeats: int) -> float:
+    """Melhor tempo entre as repetições"""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    args = sys.argv[1:]
+    repeats = 5
+    if '--repeticoes' in args:
+        repeats = int(args[args.index('--repeticoes') + 1])
+
+    build = best_time(lambda: KeywordAutomaton(DocumentProcessor.DOCUMENT_TYPES,
+                                                  word_boundary=DocumentProcessor.DOCUMENT_TYPE_WHOLE_WORDS), repeats)
+    print(f"Construção do autômato (tipos de documento): {build * 1000:.2f} ms")
+
+    print(f"{'texto':>8} {'implementação':>20} {'tempo (ms)':>11}")
+    for size_kb in (20, 1024):
+        text = synthetic_text(size_kb)
+        label = f"{size_kb} KB"
+        for name, func in [('laços (anterior)', run_legacy),
+                           ('laços com contagem', legacy_counts),
+                           ('KeywordAutomaton', run_automaton)]:
+            elapsed = best_time(lambda: func(text), repeats)
+            print(f"{label:>8} {name:>20} {elapsed * 1000:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+JurisPilot - Benchmark de OCR paralelo
+Mede a vazão (páginas/s) do OCR de páginas conforme o número de processos
+
+Uso:
+    python benchmarks/bench_parallel_ocr.py [arquivo.pdf] [--paginas N]
+
+Sem arquivo, gera páginas sintéticas com texto para o teste.
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from PIL import Image, ImageDraw
+from pdf2image import convert_from_path
+from ocr_engine import OCRPool
+
+
+def synthetic_pages(num_pages: int):
+    """Gera páginas A4 (150 DPI) com linhas de texto"""
+    pages = []
+    for page_num in range(1, num_pages + 1):
+        image = Image.new('L', (1240, 1754), color=255)
+        draw = ImageDraw.Draw(image)
+        for line in range(40):
+            draw.text(
+                (80, 80 + line * 40),
+                f"Pagina {page_num} - linha {line}: prazo de 15 dias para contestacao",
+                fill=0
+            )
+        pages.append(image)
+    return pages
+
+
+def worker_counts():
+    """1, 2, 4, ... até o número de CPUs"""
+    cpus = os.cpu_count() or 1
+    counts = []
+    n = 1
+    while n < cpus:
+        counts.append(n)
+        n *= 2
+    counts.append(cpus)
+    return counts
+
+
+def main():
+    args = sys.argv[1:]
+    num_pages = 16
+    if '--paginas' in args:
+        index = args.index('--paginas')
+        num_pages = int(args[index + 1])
+        del args[index:index + 2]
+
+    if args:
+        pages = convert_from_path(args[0])
+        print(f"Arquivo: {args[0]} ({len(pages)} páginas)")
+    else:
+        pages = synthetic_pages(num_pages)
+        print(f"Páginas sintéticas: {len(pages)}")
+
+    baseline = None
+    print(f"{'processos':>10} {'tempo (s)':>10} {'pág/s':>8} {'speedup':>8}")
+    for workers in worker_counts():
+        pool = OCRPool(workers)
+        # Aquece o pool para não medir a criação dos processos
+        pool.map(pages[:min(workers, len(pages))])
+
+        start = time.perf_counter()
+        pool.map(pages)
+        elapsed = time.perf_counter() - start
+        pool.shutdown()
+
+        baseline = baseline or elapsed
+        print(f"{workers:>10} {elapsed:>10.2f} {len(pages) / elapsed:>8.2f} {baseline / elapsed:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+JurisPilot - Benchmark do pré-processamento de imagens para OCR
+Compara tempo de OCR e qualidade do texto com e sem o pré-processamento
+(OpenCV) em um corpus de imagens
+
+Uso:
+    python benchmarks/bench_preprocessing.py <diretorio_corpus>
+
+O corpus é um diretório com imagens (jpg, png, tiff). Se existir um arquivo
+<nome>.txt com a transcrição correta ao lado da imagem, a qualidade é medida
+pela similaridade com ela; caso contrário, pela confiança média do Tesseract.
+"""
+
+import sys
+import time
+import difflib
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import pytesseract
+from PIL import Image
+from image_preprocessing import ImagePreprocessor
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.bmp', '.tif', '.tiff'}
+
+
+def mean_confidence(image) -> float:
+    """Confiança média (0-100) das palavras reconhecidas"""
+    data = pytesseract.image_to_data(image, lang='por', output_type=pytesseract.Output.DICT)
+    confs = [float(c) for c, word in zip(data['conf'], data['text']) if word.strip() and float(c) >= 0]
+    return sum(confs) / len(confs) if confs else 0.0
+
+
+def quality(text: str, image, ground_truth: Path) -> float:
+    """Similaridade com a transcrição (0-1) ou confiança média do Tesseract (0-1)"""
+    if ground_truth.exists():
+        expected = ' '.join(ground_truth.read_text(encoding='utf-8').split())
+        return difflib.SequenceMatcher(None, expected, ' '.join(text.split())).ratio()
+    return mean_confidence(image) / 100
+
+
+def run(images, preprocessor):
+    """OCR de todas as imagens; retorna tempo total e qualidade média"""
+    total_time = 0.0
+    total_quality = 0.0
+    for path in images:
+        start = time.perf_counter()
+        image = preprocessor.apply(path) if preprocessor else Image.open(path)
+        text = pytesseract.image_to_string(image, lang='por')
+        total_time += time.perf_counter() - start
+        total_quality += quality(text, image, path.with_suffix('.txt'))
+    return total_time, total_quality / len(images)
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+
+    corpus = Path(sys.argv[1])
+    images = sorted(p for p in corpus.iterdir() if p.suffix.lower() in IMAGE_EXTENSIONS)
+    if not images:
+        print(f"Nenhuma imagem encontrada em {corpus}")
+        sys.exit(1)
+
+    configs = [
+        ('sem pré-processamento', None),
+        ('completo', ImagePreprocessor()),
+        ('sem binarização', ImagePreprocessor(binarize=False)),
+        ('sem deskew', ImagePreprocessor(deskew=False)),
+        ('só redução', ImagePreprocessor(grayscale=False, binarize=False, deskew=False, crop_borders=False)),
+    ]
+
+    print(f"Corpus: {corpus} ({len(images)} imagens)")
+    print(f"{'configuração':>24} {'tempo (s)':>10} {'s/imagem':>9} {'qualidade':>10}")
+    for name, preprocessor in configs:
+        elapsed, score = run(images, preprocessor)
+        print(f"{name:>24} {elapsed:>10.2f} {elapsed / len(images):>9.2f} {score:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+JurisPilot - Benchmark de memória da rasterização para OCR
+Mede o pico de memória (RSS) por documento ao rasterizar e executar OCR de
+um PDF digitalizado, comparando a rasterização de todas as páginas em memória
+(comportamento anterior) com a rasterização em blocos para arquivos temporários
+
+Uso:
+    python benchmarks/bench_rasterization_memory.py arquivo.pdf [--dpi 200] [--orcamento-mb 256]
+
+Cada modo roda em um processo separado; o pico inclui os processos filhos
+(pdftoppm, Tesseract e o pool de OCR). Requer Linux/macOS (módulo resource).
+"""
+
+import sys
+import json
+import time
+import resource
+import subprocess
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+
+def _max_rss_mb(who) -> float:
+    """ru_maxrss em MB (KB no Linux, bytes no macOS)"""
+    rss = resource.getrusage(who).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+
+def run_mode(mode: str, pdf_path: str, dpi: int, budget_mb: int):
+    """Executa um modo no processo atual e imprime o resultado em JSON"""
+    import pytesseract
+    from pdf2image import convert_from_path
+    from config import OCRSettings
+    from document_processor import DocumentProcessor
+
+    start = time.perf_counter()
+
+    if mode == 'memoria':
+        images = convert_from_path(pdf_path, dpi=dpi)
+        pages = len(images)
+        for image in images:
+            pytesseract.image_to_string(image, lang='por')
+    else:
+        processor = DocumentProcessor(ocr_settings=OCRSettings(
+            dpi=dpi, grayscale=True, memory_budget_mb=budget_mb
+        ))
+        DocumentProcessor.MIN_TEXT_LAYER_CHARS = sys.maxsize  # força OCR de todas as páginas
+        pages = sum(1 for _ in processor.iter_pages(pdf_path))
+        processor.close()
+
+    print(json.dumps({
+        'modo': mode,
+        'paginas': pages,
+        'tempo': time.perf_counter() - start,
+        'rss_processo_mb': _max_rss_mb(resource.RUSAGE_SELF),
+        'rss_filhos_mb': _max_rss_mb(resource.RUSAGE_CHILDREN)
+    }))
+
+
+def main():
+    args = sys.argv[1:]
+    if not args:
+        print(__doc__)
+        sys.exit(1)
+
+    dpi = 200
+    budget_mb = 256
+    if '--dpi' in args:
+        dpi = int(args[args.index('--dpi') + 1])
+    if '--orcamento-mb' in args:
+        budget_mb = int(args[args.index('--orcamento-mb') + 1])
+    pdf_path = args[0]
+
+    print(f"Arquivo: {pdf_path} - DPI {dpi} - orçamento {budget_mb} MB")
+    print(f"{'modo':>10} {'páginas':>8} {'tempo (s)':>10} {'RSS (MB)':>10} {'RSS filhos (MB)':>16}")
+    for mode in ('memoria', 'blocos'):
+        output = subprocess.run(
+            [sys.executable, __file__, '--executar', mode, pdf_path, str(dpi), str(budget_mb)],
+            capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(f"{result['modo']:>10} {result['paginas']:>8} {result['tempo']:>10.2f} "
+              f"{result['rss_processo_mb']:>10.1f} {result['rss_filhos_mb']:>16.1f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == '--executar':
+        run_mode(sys.argv[2], sys.argv[3], int(sys.argv[4]), int(sys.argv[5]))
+    else:
+        main()
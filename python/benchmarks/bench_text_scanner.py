@@ -0,0 +1,143 @@
+"""
+JurisPilot - Benchmark da varredura de entidades
+Compara a extração de metadados, valores e data com uma expressão regular por
+método (implementação anterior) e com a varredura única do TextScanner, em um
+texto denso em entidades e em um texto corrido com poucas entidades
+
+Uso:
+    python benchmarks/bench_text_scanner.py [--mb N] [--repeticoes N]
+"""
+
+import re
+import sys
+import time
+import random
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from text_scanner import TextScanner
+
+ENTITY_SENTENCES = [
+    "O autor requer a procedência do pedido nos termos da petição inicial.",
+    "Fica o réu intimado para apresentar contestação no prazo de 15 dias.",
+    "Valor da causa: R$ 12.345,67 conforme planilha anexa.",
+    "Pagamento de 1.500,00 reais realizado em 15/03/2024.",
+    "CPF 123.456.789-00, residente na Rua das Flores, 100.",
+    "Empresa inscrita no CNPJ 12.345.678/0001-90.",
+    "Contato: (11) 98765-4321 ou advogado@escritorio.com.br.",
+    "São Paulo, 12 de março de 2024.",
+    "Audiência designada para 2024-05-20 às 14h.",
+    "Nada mais havendo, encerra-se o presente termo.",
+]
+
+# Texto corrido sem entidades (a maior parte de uma petição)
+PROSE = [
+    "Trata-se de ação de cobrança ajuizada em face da empresa requerida.",
+    "A parte autora sustenta que os serviços foram prestados integralmente.",
+    "Não houve manifestação da parte contrária no prazo legal.",
+    "Diante do exposto, requer seja julgado procedente o pedido.",
+    "Termos em que pede deferimento.",
+]
+
+
+def synthetic_text(size_mb: float, entity_ratio: float) -> str:
+    """Texto jurídico sintético com o tamanho aproximado e a proporção de frases com entidades"""
+    random.seed(42)
+    target = int(size_mb * 1024 * 1024)
+    parts = []
+    length = 0
+    while length < target:
+        sentences = ENTITY_SENTENCES if random.random() < entity_ratio else PROSE
+        sentence = random.choice(sentences)
+        parts.append(sentence)
+        length += len(sentence) + 1
+    return '\n'.join(parts)
+
+
+def legacy_extract(text: str):
+    """Implementação anterior: uma busca por expressão regular em cada método"""
+    metadata = {
+        'num_palavras': len(text.split()),
+        'num_linhas': len(text.split('\n')),
+        'tem_cpf': bool(re.search(r'\d{3}\.?\d{3}\.?\d{3}-?\d{2}', text)),
+        'tem_cnpj': bool(re.search(r'\d{2}\.?\d{3}\.?\d{3}/?\d{4}-?\d{2}', text)),
+        'tem_email': bool(re.search(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', text)),
+        'tem_telefone': bool(re.search(r'\(?\d{2}\)?\s?\d{4,5}-?\d{4}', text)),
+    }
+
+    values = []
+    for pattern in [
+        r'R\$\s*(\d{1,3}(?:\.\d{3})*(?:,\d{2})?)',
+        r'(\d{1,3}(?:\.\d{3})*(?:,\d{2})?)\s*reais',
+        r'valor[:\s]+R\$\s*(\d{1,3}(?:\.\d{3})*(?:,\d{2})?)'
+    ]:
+        for match in re.findall(pattern, text, re.IGNORECASE):
+            values.append(float(match.replace('.', '').replace(',', '.')))
+
+    date = None
+    for pattern in [r'\d{2}/\d{2}/\d{4}', r'\d{2}-\d{2}-\d{4}',
+                    r'\d{4}-\d{2}-\d{2}', r'\d{1,2}\s+de\s+\w+\s+de\s+\d{4}']:
+        matches = re.findall(pattern, text)
+        if matches:
+            date = matches[0]
+            break
+
+    return metadata, list(set(values)), date
+
+
+def scanner_extract(scanner: TextScanner, text: str):
+    """Varredura única: metadados, valores e data a partir das mesmas entidades"""
+    entities = scanner.scan(text)
+    found = {entity.tipo for entity in entities}
+    metadata = {
+        'num_palavras': len(text.split()),
+        'num_linhas': text.count('\n') + 1,
+        'tem_cpf': 'cpf' in found,
+        'tem_cnpj': 'cnpj' in found,
+        'tem_email': 'email' in found,
+        'tem_telefone': 'telefone' in found,
+    }
+    values = [TextScanner.parse_money(e.valor) for e in TextScanner.of_type(entities, 'valor')]
+    dates = TextScanner.preferred_dates(entities)
+    return metadata, list(dict.fromkeys(values)), dates[0].valor if dates else None
+
+
+def best_time(func, repeats: int) -> float:
+    """Melhor tempo entre as repetições"""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    args = sys.argv[1:]
+    size_mb = 1.0
+    repeats = 5
+    if '--mb' in args:
+        size_mb = float(args[args.index('--mb') + 1])
+    if '--repeticoes' in args:
+        repeats = int(args[args.index('--repeticoes') + 1])
+
+    scanner = TextScanner()
+    print(f"{'texto':>8} {'implementação':>18} {'tempo (ms)':>11} {'MB/s':>8} {'speedup':>8}")
+    for name, entity_ratio in [('denso', 1.0), ('esparso', 0.05)]:
+        text = synthetic_text(size_mb, entity_ratio)
+
+        legacy = legacy_extract(text)
+        current = scanner_extract(scanner, text)
+        if (legacy[0], set(legacy[1]), legacy[2]) != (current[0], set(current[1]), current[2]):
+            print(f"Aviso: resultados diferentes no texto {name}")
+
+        legacy_time = best_time(lambda: legacy_extract(text), repeats)
+        scanner_time = best_time(lambda: scanner_extract(scanner, text), repeats)
+        print(f"{name:>8} {'regex por método':>18} {legacy_time * 1000:>11.1f} "
+              f"{size_mb / legacy_time:>8.1f}")
+        print(f"{name:>8} {'TextScanner':>18} {scanner_time * 1000:>11.1f} "
+              f"{size_mb / scanner_time:>8.1f} {legacy_time / scanner_time:>7.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -5,9 +5,16 @@ Servidor Flask para expor scripts Python como endpoints HTTP
 
 import os
 import sys
+import atexit
+import json
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
 from pathlib import Path
-from flask import Flask, request, jsonify, send_file
+from typing import Dict, Optional
+from flask import Flask, Response, request, jsonify, send_file, stream_with_context
 from flask_cors import CORS
+from werkzeug.exceptions import RequestEntityTooLarge
 from werkzeug.utils import secure_filename
 from loguru import logger
 import traceback
@@ -17,9 +24,14 @@ sys.path.insert(0, str(Path(__file__).parent))
 
 from config import settings
 from document_processor import DocumentProcessor
+from document_sandbox import DocumentSandbox, SandboxError
+from extraction_cache import ExtractionCache
+from job_queue import JobQueue
+from upload_stream import StreamingUploadRequest
 from proof_classifier import ProofClassifier
 from legal_summary import LegalSummaryGenerator
 from deadline_extractor import DeadlineExtractor
+from deadline_batch import DeadlineBatchExtractor
 from checklist_generator import ChecklistGenerator
 from timeline_generator import TimelineGenerator
 
@@ -27,6 +39,17 @@ from timeline_generator import TimelineGenerator
 app = Flask(__name__)
 CORS(app)
 
+# Uploads recebidos em arquivo temporário próprio (em memória até STORAGE_SPOOL_SIZE),
+# com SHA-256 calculado e STORAGE_MAX_FILE_SIZE aplicado durante o envio
+app.request_class = StreamingUploadRequest
+app.config["UPLOAD_MAX_FILE_SIZE"] = settings.storage.max_file_size
+app.config["UPLOAD_SPOOL_SIZE"] = settings.storage.spool_size
+# Corpo da requisição: o arquivo mais os demais campos do formulário
+app.config["MAX_CONTENT_LENGTH"] = settings.storage.max_file_size + 64 * 1024
+# Lotes (/api/process-batch): até PYTHON_API_BATCH_MAX_FILES arquivos por requisição
+app.config["UPLOAD_BATCH_ENDPOINTS"] = ("process_batch",)
+app.config["UPLOAD_BATCH_MAX_CONTENT_LENGTH"] = app.config["MAX_CONTENT_LENGTH"] * settings.api.batch_max_files
+
 # Configuração de logging
 logger.add(
     settings.log_file,
@@ -36,23 +59,114 @@ logger.add(
 )
 
 # Inicializa processadores
+extraction_cache = ExtractionCache(
+    settings.cache.path,
+    max_size=settings.cache.max_size,
+    max_age_days=settings.cache.max_age_days
+) if settings.cache.enabled else None
+
+# Processos isolados (requisições e jobs) dividem as CPUs entre os seus pools de OCR
+sandbox_processes = settings.sandbox.workers + (settings.jobs.workers if settings.jobs.enabled else 0)
+sandbox_ocr_workers = max(1, min(settings.ocr.workers or os.cpu_count() or 1,
+                                 (os.cpu_count() or 1) // max(1, sandbox_processes)))
+
 document_processor = DocumentProcessor(
-    tesseract_path=os.getenv("TESSERACT_PATH")
+    tesseract_path=os.getenv("TESSERACT_PATH"),
+    cache=extraction_cache,
+    # Com o processamento isolado, o servidor não faz OCR: um único processo de
+    # OCR, iniciado só se for usado (o pool é criado sob demanda)
+    ocr_settings=settings.ocr.model_copy(update={"workers": 1}) if settings.sandbox.enabled else settings.ocr,
+    pdf_settings=settings.pdf,
+    max_pages=settings.sandbox.max_pages or None
 )
+# Extração isolada em processos com tempo e memória limitados (SANDBOX_*);
+# desabilitada, os documentos são processados no próprio servidor
+document_sandbox = DocumentSandbox(
+    document_processor,
+    workers=settings.sandbox.workers,
+    timeout=settings.sandbox.timeout or None,
+    memory_limit_mb=settings.sandbox.memory_limit_mb,
+    max_jobs=settings.sandbox.max_jobs_per_worker,
+    ocr_workers=sandbox_ocr_workers
+) if settings.sandbox.enabled else None
+documents = document_sandbox or document_processor
+# Jobs assíncronos (/api/jobs): fila persistente com processos isolados próprios,
+# com tempo máximo maior e sem ocupar os processos das requisições síncronas
+job_queue = None
+if settings.jobs.enabled:
+    job_documents = DocumentSandbox(
+        document_processor,
+        workers=settings.jobs.workers,
+        timeout=settings.jobs.timeout or None,
+        memory_limit_mb=settings.sandbox.memory_limit_mb,
+        max_jobs=settings.sandbox.max_jobs_per_worker,
+        ocr_workers=sandbox_ocr_workers
+    ) if settings.sandbox.enabled else document_processor
+    job_queue = JobQueue(
+        settings.jobs.path,
+        settings.jobs.files_path,
+        runner=job_documents.process_file,
+        workers=settings.jobs.workers,
+        max_attempts=settings.jobs.max_attempts,
+        callback_url=settings.jobs.callback_url,
+        callback_base_url=settings.n8n.webhook_url,
+        callback_timeout=settings.jobs.callback_timeout,
+        retention_days=settings.jobs.retention_days
+    )
+    job_queue.start()
+
+# Documentos de lotes processados ao mesmo tempo (compartilhado entre requisições)
+batch_executor = ThreadPoolExecutor(max_workers=settings.api.batch_workers, thread_name_prefix="lote")
 proof_classifier = ProofClassifier()
 legal_summary = LegalSummaryGenerator()
 deadline_extractor = DeadlineExtractor()
+# Lotes de /api/extract-deadlines/batch: processos iniciados no primeiro lote grande
+deadline_batch = DeadlineBatchExtractor(
+    workers=settings.api.deadline_workers,
+    chunksize=settings.api.deadline_chunksize,
+    extractor=deadline_extractor
+)
 checklist_generator = ChecklistGenerator()
 timeline_generator = TimelineGenerator()
 
 
+@atexit.register
+def shutdown_services():
+    """Encerra filas, pools e processos ao sair (processos não daemon impediriam o término)"""
+    if job_queue is not None:
+        job_queue.shutdown()
+    batch_executor.shutdown(wait=False)
+    deadline_batch.close()
+    if document_sandbox is not None:
+        document_sandbox.shutdown()
+    document_processor.close()
+
+
+@app.errorhandler(RequestEntityTooLarge)
+def request_entity_too_large(e):
+    """Upload acima do limite de tamanho"""
+    return jsonify({
+        "error": "Arquivo muito grande",
+        "message": f"O tamanho máximo permitido é de {settings.storage.max_file_size} bytes"
+    }), 413
+
+
+@app.errorhandler(SandboxError)
+def sandbox_error(e):
+    """Documento que estourou o tempo ou a memória do processamento isolado"""
+    return jsonify(e.to_dict()), e.http_status
+
+
 @app.route("/health", methods=["GET"])
 def health_check():
     """Endpoint de health check"""
     return jsonify({
         "status": "healthy",
         "service": "JurisPilot API",
-        "version": "1.0.0"
+        "version": "1.0.0",
+        "ocr_workers": document_processor.ocr_pool.health_check(),
+        "sandbox": document_sandbox.health_check() if document_sandbox else None,
+        "jobs": job_queue.stats() if job_queue else None
     }), 200
 
 
@@ -80,26 +194,24 @@ def process_document():
                 "error": f"Extensão não permitida. Permitidas: {', '.join(settings.storage.allowed_extensions)}"
             }), 400
         
-        # Salva arquivo temporariamente
-        upload_path = Path(settings.storage.uploads_path)
-        upload_path.mkdir(parents=True, exist_ok=True)
-        
-        temp_file_path = upload_path / filename
-        file.save(str(temp_file_path))
-        
         try:
-            # Processa documento
-            result = document_processor.process_file(str(temp_file_path))
+            # Processa o upload direto do arquivo temporário da requisição
+            # (em memória para arquivos pequenos; o SHA-256 já foi calculado no envio)
+            result = documents.process_file(
+                file.stream,
+                file_name=filename,
+                content_hash=getattr(file.stream, "sha256", None)
+            )
             
             return jsonify({
                 "success": True,
                 "data": result
             }), 200
         finally:
-            # Remove arquivo temporário
-            if temp_file_path.exists():
-                temp_file_path.unlink()
+            file.close()
                 
+    except (RequestEntityTooLarge, SandboxError):
+        raise
     except Exception as e:
         logger.error(f"Erro ao processar documento: {str(e)}\n{traceback.format_exc()}")
         return jsonify({
@@ -108,6 +220,287 @@ def process_document():
         }), 500
 
 
+def _extension_error(filename: str) -> Optional[str]:
+    """Mensagem de erro se a extensão do arquivo não é permitida"""
+    extension = filename.rsplit(".", 1)[1].lower() if "." in filename else ""
+    if extension not in settings.storage.allowed_extensions:
+        return f"Extensão não permitida. Permitidas: {', '.join(settings.storage.allowed_extensions)}"
+    return None
+
+
+def _process_batch_item(index: int, source, filename: Optional[str]) -> Dict:
+    """Processa um documento do lote; a falha é registrada no próprio item"""
+    item = {"indice": index, "nome_arquivo": filename}
+    try:
+        result = documents.process_file(
+            source,
+            file_name=filename,
+            content_hash=getattr(source, "sha256", None)
+        )
+        item.update(success=True, data=result)
+    except SandboxError as e:
+        item.update(success=False, status=e.http_status, **e.to_dict())
+    except FileNotFoundError as e:
+        item.update(success=False, status=404, error="Arquivo não encontrado", message=str(e))
+    except Exception as e:
+        logger.error(f"Erro ao processar documento do lote ({filename}): {str(e)}\n{traceback.format_exc()}")
+        item.update(success=False, status=500, error="Erro ao processar documento", message=str(e))
+    return item
+
+
+@app.route("/api/process-batch", methods=["POST"])
+def process_batch():
+    """
+    Processa vários documentos em paralelo e retorna cada resultado assim que fica pronto
+    POST /api/process-batch
+    Body: multipart/form-data com um ou mais arquivos 'files' (ou 'file'),
+          ou JSON com { "file_paths": ["...", ...] }
+    Resposta: application/x-ndjson, uma linha por documento na ordem em que
+    terminam ({"indice", "nome_arquivo", "success", "data"} ou, em caso de
+    falha, {"indice", "nome_arquivo", "success": false, "status", "error",
+    "message"}) e uma última linha {"resumo": {...}}
+    """
+    uploads = request.files.getlist("files") + request.files.getlist("file")
+    if uploads:
+        sources = [(upload.stream, secure_filename(upload.filename or "")) for upload in uploads]
+    else:
+        file_paths = (request.get_json(silent=True) or {}).get("file_paths") or []
+        if not isinstance(file_paths, list):
+            return jsonify({"error": "file_paths deve ser uma lista"}), 400
+        sources = [(str(file_path), Path(str(file_path)).name) for file_path in file_paths]
+    
+    if not sources:
+        return jsonify({"error": "Arquivos 'files' ou file_paths necessários"}), 400
+    if len(sources) > settings.api.batch_max_files:
+        for upload in uploads:
+            upload.close()
+        return jsonify({
+            "error": f"Máximo de {settings.api.batch_max_files} documentos por lote"
+        }), 400
+    
+    # Itens recusados na validação são respondidos de imediato; os demais vão para o pool
+    rejected = []
+    futures = []
+    for index, (source, filename) in enumerate(sources):
+        error = _extension_error(filename) if uploads else None
+        if uploads and not filename:
+            error = "Nome de arquivo vazio"
+        if error:
+            rejected.append({"indice": index, "nome_arquivo": filename, "success": False,
+                             "status": 400, "error": error})
+            continue
+        futures.append(batch_executor.submit(_process_batch_item, index, source, filename))
+    
+    def generate():
+        started = time.time()
+        succeeded = 0
+        try:
+            for item in rejected:
+                yield json.dumps(item, ensure_ascii=False, default=str) + "\n"
+            for future in as_completed(futures):
+                item = future.result()
+                succeeded += item["success"]
+                yield json.dumps(item, ensure_ascii=False, default=str) + "\n"
+            
+            summary = {
+                "total": len(sources),
+                "sucesso": succeeded,
+                "falhas": len(sources) - succeeded,
+                "tempo_segundos": round(time.time() - started, 3)
+            }
+            logger.info(f"Lote processado: {summary}")
+            yield json.dumps({"resumo": summary}) + "\n"
+        finally:
+            # Cliente desconectado: descarta o que não começou e aguarda o restante antes de fechar os uploads
+            for future in futures:
+                future.cancel()
+            wait(futures)
+            for upload in uploads:
+                upload.close()
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype="application/x-ndjson",
+        headers={"X-Accel-Buffering": "no"}
+    )
+
+
+@app.route("/api/jobs", methods=["POST"])
+def create_job():
+    """
+    Cria um job assíncrono de processamento de documento e retorna de imediato
+    POST /api/jobs
+    Body: multipart/form-data com arquivo 'file' ou JSON com { "file_path": "..." };
+    opcional: callback_url (URL ou caminho relativo a N8N_WEBHOOK_URL), chamada
+    com POST e o job finalizado
+    """
+    if job_queue is None:
+        return jsonify({"error": "Fila de jobs desabilitada (JOBS_ENABLED)"}), 503
+    
+    try:
+        if "file" in request.files:
+            file = request.files["file"]
+            if file.filename == "":
+                return jsonify({"error": "Nome de arquivo vazio"}), 400
+            
+            filename = secure_filename(file.filename)
+            error = _extension_error(filename)
+            if error:
+                return jsonify({"error": error}), 400
+            
+            try:
+                job, created = job_queue.submit(
+                    filename,
+                    stream=file.stream,
+                    content_hash=getattr(file.stream, "sha256", None),
+                    callback_url=request.form.get("callback_url")
+                )
+            finally:
+                file.close()
+        else:
+            data = request.get_json(silent=True) or {}
+            file_path = data.get("file_path", "")
+            if not file_path:
+                return jsonify({"error": "Arquivo 'file' ou file_path necessário"}), 400
+            if not os.path.isfile(file_path):
+                return jsonify({"error": f"Arquivo não encontrado: {file_path}"}), 404
+            
+            job, created = job_queue.submit(
+                Path(file_path).name,
+                file_path=file_path,
+                content_hash=ExtractionCache.hash_file(file_path),
+                callback_url=data.get("callback_url")
+            )
+        
+        job["status_url"] = f"/api/jobs/{job['job_id']}"
+        return jsonify({
+            "success": True,
+            "data": job
+        }), 202 if created else 200
+        
+    except RequestEntityTooLarge:
+        raise
+    except Exception as e:
+        logger.error(f"Erro ao criar job: {str(e)}\n{traceback.format_exc()}")
+        return jsonify({
+            "error": "Erro ao criar job",
+            "message": str(e)
+        }), 500
+
+
+@app.route("/api/jobs/<job_id>", methods=["GET"])
+def get_job(job_id):
+    """
+    Status, progresso (páginas processadas) e, ao final, resultado ou erro de um job
+    GET /api/jobs/<job_id>
+    """
+    if job_queue is None:
+        return jsonify({"error": "Fila de jobs desabilitada (JOBS_ENABLED)"}), 503
+    
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job não encontrado"}), 404
+    
+    return jsonify({
+        "success": True,
+        "data": job
+    }), 200
+
+
+@app.route("/api/classify-document", methods=["POST"])
+def classify_document():
+    """
+    Classificação rápida do tipo de documento (primeiras páginas), para roteamento
+    POST /api/classify-document
+    Body: multipart/form-data com arquivo 'file' ou JSON com { "file_path": "..." }
+    Parâmetros opcionais (form ou JSON): max_pages, max_chars e process_full
+    (agenda o processamento completo em segundo plano; o resultado fica no cache
+    e é retornado de imediato por /api/process-document)
+    """
+    try:
+        params = request.form if request.files else (request.get_json(silent=True) or {})
+        max_pages = int(params.get("max_pages", DocumentProcessor.QUICK_MAX_PAGES))
+        max_chars = int(params.get("max_chars", DocumentProcessor.QUICK_MAX_CHARS))
+        process_full = str(params.get("process_full", "false")).lower() in ("1", "true", "yes", "sim")
+        
+        upload = None
+        filename = None
+        if "file" in request.files:
+            upload = request.files["file"]
+            if upload.filename == "":
+                return jsonify({"error": "Nome de arquivo vazio"}), 400
+            
+            filename = secure_filename(upload.filename)
+            extension = filename.rsplit(".", 1)[1].lower() if "." in filename else ""
+            if extension not in settings.storage.allowed_extensions:
+                return jsonify({
+                    "error": f"Extensão não permitida. Permitidas: {', '.join(settings.storage.allowed_extensions)}"
+                }), 400
+            source = upload.stream
+        else:
+            source = params.get("file_path", "")
+            if not source:
+                return jsonify({"error": "Arquivo 'file' ou file_path necessário"}), 400
+        
+        try:
+            result = documents.classify_quick(
+                source, max_pages=max_pages, max_chars=max_chars,
+                file_name=filename, content_hash=getattr(source, "sha256", None)
+            )
+            
+            scheduled = False
+            if process_full and extraction_cache is not None and result["origem"] != "cache":
+                if upload is not None:
+                    # O processamento continua após a resposta: o upload é gravado com nome único
+                    upload_path = Path(settings.storage.uploads_path)
+                    upload_path.mkdir(parents=True, exist_ok=True)
+                    temp_file_path = upload_path / f"{uuid.uuid4().hex}_{filename}"
+                    upload.stream.seek(0)
+                    upload.save(str(temp_file_path))
+                    try:
+                        future = documents.schedule_processing(str(temp_file_path))
+                    except Exception:
+                        temp_file_path.unlink(missing_ok=True)
+                        raise
+                    future.add_done_callback(lambda _: temp_file_path.unlink(missing_ok=True))
+                else:
+                    documents.schedule_processing(source)
+                scheduled = True
+            result["processamento_completo"] = "agendado" if scheduled else None
+        finally:
+            if upload is not None:
+                upload.close()
+        
+        return jsonify({
+            "success": True,
+            "data": result
+        }), 200
+        
+    except (RequestEntityTooLarge, SandboxError):
+        raise
+    except Exception as e:
+        logger.error(f"Erro ao classificar documento: {str(e)}\n{traceback.format_exc()}")
+        return jsonify({
+            "error": "Erro ao classificar documento",
+            "message": str(e)
+        }), 500
+
+
+@app.route("/api/cache/stats", methods=["GET"])
+def cache_stats():
+    """
+    Retorna contadores do cache de extração
+    GET /api/cache/stats
+    """
+    if extraction_cache is None:
+        return jsonify({"success": True, "data": {"enabled": False}}), 200
+    
+    return jsonify({
+        "success": True,
+        "data": dict(extraction_cache.stats(), enabled=True)
+    }), 200
+
+
 @app.route("/api/classify-proof", methods=["POST"])
 def classify_proof():
     """
@@ -129,8 +522,8 @@ def classify_proof():
         
         if file_path:
             # Processa arquivo primeiro
-            doc_result = document_processor.process_file(file_path)
-            text = doc_result.get("text", "")
+            doc_result = documents.process_file(file_path)
+            text = doc_result.get("texto_extraido", "")
         
         # Classifica prova
         classification = proof_classifier.classify_proof(text)
@@ -140,6 +533,8 @@ def classify_proof():
             "data": classification
         }), 200
         
+    except (RequestEntityTooLarge, SandboxError):
+        raise
     except Exception as e:
         logger.error(f"Erro ao classificar prova: {str(e)}\n{traceback.format_exc()}")
         return jsonify({
@@ -184,11 +579,13 @@ def generate_summary():
 
 
 @app.route("/api/extract-deadlines", methods=["POST"])
+@app.route("/api/deadline/extract", methods=["POST"])
 def extract_deadlines():
     """
     Extrai prazos de documentos
     POST /api/extract-deadlines
-    Body: JSON com { "text": "...", "file_path": "..." }
+    Body: JSON com { "documento_info": {...}, "tipo_acao": "..." } ou
+          { "text": "...", "file_path": "...", "data_documento": "AAAA-MM-DD", "tipo_acao": "..." }
     """
     try:
         data = request.get_json()
@@ -196,24 +593,32 @@ def extract_deadlines():
         if not data:
             return jsonify({"error": "Body JSON necessário"}), 400
         
+        documento_info = data.get("documento_info")
         text = data.get("text", "")
         file_path = data.get("file_path", "")
         
-        if not text and not file_path:
-            return jsonify({"error": "text ou file_path necessário"}), 400
+        if not documento_info and not text and not file_path:
+            return jsonify({"error": "documento_info, text ou file_path necessário"}), 400
+        if documento_info is not None and not isinstance(documento_info, dict):
+            return jsonify({"error": "documento_info deve ser um objeto"}), 400
         
-        if file_path:
-            doc_result = document_processor.process_file(file_path)
-            text = doc_result.get("text", "")
+        if not documento_info:
+            # Texto ou arquivo: data do documento e calendário informados no body
+            documento_info = documents.process_file(file_path) if file_path else {"texto_extraido": text}
+            for field in ("data_documento", "tribunal", "comarca"):
+                if data.get(field):
+                    documento_info[field] = data[field]
         
         # Extrai prazos
-        deadlines = deadline_extractor.extract_deadlines(text)
+        deadlines = deadline_extractor.extract_deadlines(documento_info, data.get("tipo_acao"))
         
         return jsonify({
             "success": True,
             "data": deadlines
         }), 200
         
+    except SandboxError:
+        raise
     except Exception as e:
         logger.error(f"Erro ao extrair prazos: {str(e)}\n{traceback.format_exc()}")
         return jsonify({
@@ -222,6 +627,55 @@ def extract_deadlines():
         }), 500
 
 
+@app.route("/api/extract-deadlines/batch", methods=["POST"])
+def extract_deadlines_batch():
+    """
+    Extrai prazos de muitos documentos em processos paralelos (ex: carga histórica)
+    POST /api/extract-deadlines/batch
+    Body: JSON com { "itens": [{ "documento_info": {...}, "tipo_acao": "..." }, ...] }
+    Resposta: um resultado por item, na ordem da entrada ({"success": true,
+    "data": [prazos]} ou {"success": false, "error", "message"}), e um resumo
+    """
+    try:
+        data = request.get_json()
+        
+        if not data:
+            return jsonify({"error": "Body JSON necessário"}), 400
+        
+        itens = data.get("itens")
+        if not isinstance(itens, list) or not itens:
+            return jsonify({"error": "itens deve ser uma lista não vazia"}), 400
+        if len(itens) > settings.api.deadline_max_items:
+            return jsonify({
+                "error": f"Máximo de {settings.api.deadline_max_items} itens por lote"
+            }), 400
+        
+        started = time.time()
+        resultados = deadline_batch.extract_many(itens)
+        succeeded = sum(resultado["success"] for resultado in resultados)
+        summary = {
+            "total": len(itens),
+            "sucesso": succeeded,
+            "falhas": len(itens) - succeeded,
+            "prazos": sum(len(resultado.get("data", [])) for resultado in resultados),
+            "tempo_segundos": round(time.time() - started, 3)
+        }
+        logger.info(f"Lote de prazos extraído: {summary}")
+        
+        return jsonify({
+            "success": True,
+            "data": resultados,
+            "resumo": summary
+        }), 200
+        
+    except Exception as e:
+        logger.error(f"Erro ao extrair prazos em lote: {str(e)}\n{traceback.format_exc()}")
+        return jsonify({
+            "error": "Erro ao extrair prazos em lote",
+            "message": str(e)
+        }), 500
+
+
 @app.route("/api/generate-checklist", methods=["POST"])
 def generate_checklist():
     """
@@ -0,0 +1,302 @@
+"""
+JurisPilot - Calendário Forense
+Contagem de prazos em dias úteis (CPC, art. 219) por tribunal e comarca:
+fins de semana, feriados nacionais, estaduais, do tribunal e da comarca,
+suspensões de expediente e o recesso forense de 20/12 a 20/01 (CPC, art. 220)
+"""
+
+import json
+import threading
+import unicodedata
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+import numpy as np
+from loguru import logger
+
+# Arquivo de feriados distribuído com o sistema
+DEFAULT_HOLIDAYS_PATH = Path(__file__).parent.parent / "data" / "feriados.json"
+
+# Segunda a sexta
+WEEKMASK = '1111100'
+
+DateLike = Union[date, datetime, str, np.datetime64]
+
+
+def easter(year: int) -> date:
+    """Domingo de Páscoa (algoritmo de Meeus/Jones/Butcher, calendário gregoriano)"""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def _key(nome: Optional[str]) -> str:
+    """Chave de tribunal ou comarca sem diferenciar maiúsculas nem acentos"""
+    if not nome:
+        return ''
+    decomposed = unicodedata.normalize('NFKD', nome.strip())
+    return ''.join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+
+
+def to_datetime64(value: DateLike) -> np.datetime64:
+    """Data (date, datetime, 'AAAA-MM-DD' ou datetime64) como datetime64[D]"""
+    if isinstance(value, datetime):
+        value = value.date()
+    if isinstance(value, str):
+        value = value[:10]
+    return np.datetime64(value, 'D')
+
+
+class BusinessCalendar:
+    """
+    Calendários de dias úteis forenses construídos a partir de um arquivo de feriados
+
+    Cada combinação tribunal/comarca tem um np.busdaycalendar (máscara semanal
+    e datas sem expediente pré-computadas para o intervalo de anos), criado na
+    primeira consulta e reaproveitado. As contagens usam np.busday_offset e
+    np.busday_count, que operam sobre arrays inteiros: milhares de prazos são
+    recalculados em uma chamada.
+    """
+
+    def __init__(self, holidays_path: Optional[str] = None, first_year: int = 2015, last_year: int = 2050):
+        """
+        Inicializa o calendário
+
+        Args:
+            holidays_path: Arquivo JSON de feriados (padrão: python/data/feriados.json)
+            first_year: Primeiro ano com feriados pré-computados
+            last_year: Último ano com feriados pré-computados
+        """
+        self.holidays_path = Path(holidays_path) if holidays_path else DEFAULT_HOLIDAYS_PATH
+        self.first_year = first_year
+        self.last_year = last_year
+        self._lock = threading.Lock()
+        self._calendars: Dict[Tuple[str, str], np.busdaycalendar] = {}
+        self._resolved: Dict[Tuple[Optional[str], Optional[str]], Tuple[str, str]] = {}
+        self._warned = set()
+
+        with open(self.holidays_path, 'r', encoding='utf-8') as file:
+            self._data = json.load(file)
+
+        self._tribunais = {_key(sigla): info for sigla, info in self._data.get('tribunais', {}).items()}
+        self._estados = {_key(uf): info for uf, info in self._data.get('estados', {}).items()}
+
+        logger.info(f"Calendário forense carregado de {self.holidays_path} "
+                    f"({len(self._tribunais)} tribunal(is), anos {first_year}-{last_year})")
+
+    def calendar(self, tribunal: Optional[str] = None, comarca: Optional[str] = None) -> np.busdaycalendar:
+        """
+        Calendário de dias úteis de um tribunal e comarca
+
+        Tribunal ou comarca ausentes do arquivo usam os feriados do nível acima
+        (o tribunal, ou apenas os nacionais e o recesso).
+        """
+        chave = self._resolve(tribunal, comarca)
+        calendar = self._calendars.get(chave)
+        if calendar is None:
+            with self._lock:
+                calendar = self._calendars.get(chave)
+                if calendar is None:
+                    calendar = np.busdaycalendar(weekmask=WEEKMASK, holidays=self.holidays(*chave))
+                    self._calendars[chave] = calendar
+        return calendar
+
+    def holidays(self, tribunal: Optional[str] = None, comarca: Optional[str] = None) -> np.ndarray:
+        """Datas sem expediente (exceto fins de semana) de um tribunal e comarca, ordenadas"""
+        tribunal_key, comarca_key = self._resolve(tribunal, comarca)
+        fontes = [self._data.get('nacionais', {})]
+        info = self._tribunais.get(tribunal_key, {})
+        if info:
+            estado = self._estados.get(_key(info.get('estado')))
+            if estado:
+                fontes.append(estado)
+            fontes.append(info)
+            comarcas = {_key(nome): dados for nome, dados in info.get('comarcas', {}).items()}
+            if comarca_key in comarcas:
+                fontes.append(comarcas[comarca_key])
+
+        dias: List[date] = self._recess_days()
+        for year in range(self.first_year, self.last_year + 1):
+            pascoa = easter(year)
+            for fonte in fontes:
+                dias.extend(self._fixed_days(fonte.get('fixos', {}), year))
+                dias.extend(pascoa + timedelta(days=offset) for offset in fonte.get('moveis', {}).values())
+        for fonte in fontes:
+            dias.extend(self._suspension_days(fonte.get('suspensoes', [])))
+
+        return np.unique(np.array(dias, dtype='datetime64[D]'))
+
+    def is_business_day(self, dia: DateLike, tribunal: Optional[str] = None, comarca: Optional[str] = None) -> bool:
+        """O dia tem expediente forense"""
+        return bool(np.is_busday(to_datetime64(dia), busdaycal=self.calendar(tribunal, comarca)))
+
+    def add_business_days(self, inicio: DateLike, dias: int, tribunal: Optional[str] = None,
+                          comarca: Optional[str] = None) -> date:
+        """
+        Vencimento de um prazo em dias úteis (CPC, arts. 219 e 224)
+
+        Exclui o dia do começo e inclui o do vencimento; um começo sem
+        expediente é considerado no primeiro dia útil seguinte.
+        """
+        vencimento = np.busday_offset(to_datetime64(inicio), dias, roll='forward',
+                                      busdaycal=self.calendar(tribunal, comarca))
+        return vencimento.astype(date)
+
+    def add_calendar_days(self, inicio: DateLike, dias: int, tribunal: Optional[str] = None,
+                          comarca: Optional[str] = None) -> date:
+        """Vencimento de um prazo em dias corridos, prorrogado para o primeiro dia útil (CPC, art. 224, § 1º)"""
+        vencimento = np.busday_offset(to_datetime64(inicio) + np.timedelta64(dias, 'D'), 0, roll='forward',
+                                      busdaycal=self.calendar(tribunal, comarca))
+        return vencimento.astype(date)
+
+    def business_days_between(self, inicio: DateLike, fim: DateLike, tribunal: Optional[str] = None,
+                              comarca: Optional[str] = None) -> int:
+        """Dias úteis no intervalo [inicio, fim)"""
+        return int(np.busday_count(to_datetime64(inicio), to_datetime64(fim),
+                                   busdaycal=self.calendar(tribunal, comarca)))
+
+    def add_business_days_bulk(self, inicios: Sequence[DateLike], dias: Sequence[int],
+                               tribunais: Optional[Sequence[Optional[str]]] = None,
+                               comarcas: Optional[Sequence[Optional[str]]] = None,
+                               corridos: Optional[Sequence[bool]] = None) -> np.ndarray:
+        """
+        Vencimentos de muitos prazos de uma vez
+
+        Os prazos são agrupados por calendário (tribunal/comarca) e cada grupo
+        é calculado com uma chamada a np.busday_offset.
+
+        Args:
+            inicios: Datas de começo (date, 'AAAA-MM-DD' ou um array datetime64[D])
+            dias: Número de dias de cada prazo
+            tribunais: Tribunal de cada prazo (None = apenas feriados nacionais)
+            comarcas: Comarca de cada prazo
+            corridos: Prazos em dias corridos (prorrogados para o primeiro dia útil)
+
+        Returns:
+            Array datetime64[D] com os vencimentos, na ordem da entrada
+        """
+        inicios = self._as_dates(inicios)
+        dias = np.asarray(dias, dtype=np.int64)
+        total = len(inicios)
+        tribunais = [None] * total if tribunais is None else list(tribunais)
+        comarcas = [None] * total if comarcas is None else list(comarcas)
+        corridos = np.zeros(total, dtype=bool) if corridos is None else np.asarray(corridos, dtype=bool)
+
+        # Dias corridos: soma direta e prorrogação (deslocamento 0 com roll='forward')
+        offsets = np.where(corridos, 0, dias)
+        bases = np.where(corridos, inicios + dias.astype('timedelta64[D]'), inicios)
+
+        grupos: Dict[Tuple[str, str], List[int]] = {}
+        for index, chave in enumerate(zip(tribunais, comarcas)):
+            grupos.setdefault(self._resolve(*chave), []).append(index)
+
+        vencimentos = np.empty(total, dtype='datetime64[D]')
+        for (tribunal, comarca), indices in grupos.items():
+            indices = np.asarray(indices)
+            vencimentos[indices] = np.busday_offset(bases[indices], offsets[indices], roll='forward',
+                                                    busdaycal=self.calendar(tribunal, comarca))
+        return vencimentos
+
+    def tribunais(self) -> List[str]:
+        """Tribunais com feriados próprios no arquivo"""
+        return sorted(self._data.get('tribunais', {}))
+
+    def _resolve(self, tribunal: Optional[str], comarca: Optional[str]) -> Tuple[str, str]:
+        """Chave (tribunal, comarca) normalizada; desconhecidos caem para o nível acima"""
+        chave = self._resolved.get((tribunal, comarca))
+        if chave is None:
+            chave = self._resolved[(tribunal, comarca)] = self._resolve_uncached(tribunal, comarca)
+        return chave
+
+    def _resolve_uncached(self, tribunal: Optional[str], comarca: Optional[str]) -> Tuple[str, str]:
+        tribunal_key = _key(tribunal)
+        if tribunal_key and tribunal_key not in self._tribunais:
+            self._warn(f"Tribunal sem calendário próprio em {self.holidays_path.name}: {tribunal} "
+                       f"(usando feriados nacionais)")
+            return '', ''
+        comarca_key = _key(comarca)
+        if comarca_key:
+            comarcas = {_key(nome) for nome in self._tribunais.get(tribunal_key, {}).get('comarcas', {})}
+            if comarca_key not in comarcas:
+                # Comarca sem feriados próprios: mesmo calendário do tribunal
+                return tribunal_key, ''
+        return tribunal_key, comarca_key
+
+    def _warn(self, message: str):
+        """Avisa uma única vez por mensagem"""
+        if message not in self._warned:
+            self._warned.add(message)
+            logger.warning(message)
+
+    def _recess_days(self) -> List[date]:
+        """Dias do recesso forense em todos os anos (ex: 20/12 a 20/01)"""
+        recesso = self._data.get('recesso')
+        if not recesso:
+            return []
+        inicio_mes, inicio_dia = (int(part) for part in recesso['inicio'].split('-'))
+        fim_mes, fim_dia = (int(part) for part in recesso['fim'].split('-'))
+        dias = []
+        for year in range(self.first_year - 1, self.last_year + 1):
+            inicio = date(year, inicio_mes, inicio_dia)
+            fim = date(year + 1 if (fim_mes, fim_dia) < (inicio_mes, inicio_dia) else year, fim_mes, fim_dia)
+            dias.extend(inicio + timedelta(days=offset) for offset in range((fim - inicio).days + 1))
+        return dias
+
+    @staticmethod
+    def _fixed_days(fixos: Dict, year: int) -> Iterable[date]:
+        """Feriados de data fixa de um ano ({"MM-DD": nome} ou {"MM-DD": {"nome", "desde", "ate"}})"""
+        for mes_dia, info in fixos.items():
+            if isinstance(info, dict) and not info.get('desde', year) <= year <= info.get('ate', year):
+                continue
+            mes, dia = (int(part) for part in mes_dia.split('-'))
+            yield date(year, mes, dia)
+
+    @staticmethod
+    def _suspension_days(suspensoes: List[Dict]) -> Iterable[date]:
+        """Dias das suspensões de expediente (intervalos inclusivos)"""
+        for suspensao in suspensoes:
+            inicio = date.fromisoformat(suspensao['inicio'])
+            fim = date.fromisoformat(suspensao.get('fim', suspensao['inicio']))
+            for offset in range((fim - inicio).days + 1):
+                yield inicio + timedelta(days=offset)
+
+    @staticmethod
+    def _as_dates(values: Sequence[DateLike]) -> np.ndarray:
+        """Sequência de datas como array datetime64[D]"""
+        return np.asarray(values, dtype='datetime64[D]')
+
+
+_shared_calendar: Optional[BusinessCalendar] = None
+_shared_lock = threading.Lock()
+
+
+def get_business_calendar() -> BusinessCalendar:
+    """Instância compartilhada do calendário forense (configurada por CALENDAR_*)"""
+    global _shared_calendar
+    with _shared_lock:
+        if _shared_calendar is None:
+            from config import get_settings
+            calendar_settings = get_settings().calendar
+            _shared_calendar = BusinessCalendar(
+                holidays_path=calendar_settings.holidays_path or None,
+                first_year=calendar_settings.first_year,
+                last_year=calendar_settings.last_year
+            )
+        return _shared_calendar
+
+
+if __name__ == "__main__":
+    # Exemplo de uso
+    calendario = BusinessCalendar()
+    print(f"Páscoa 2025: {easter(2025)}")
+    print(f"15 dias úteis a partir de 10/12/2024 (TJSP/São Paulo): "
+          f"{calendario.add_business_days('2024-12-10', 15, 'TJSP', 'São Paulo')}")
+    print(f"5 dias úteis a partir de 14/04/2025 (TRF3): {calendario.add_business_days('2025-04-14', 5, 'TRF3')}")
@@ -6,6 +6,7 @@ Gera checklists jurídicos baseados no tipo de ação e regras configuradas
 from typing import Dict, List, Optional
 from loguru import logger
 import json
+from keyword_automaton import KeywordAutomaton
 
 
 class ChecklistGenerator:
@@ -195,6 +196,23 @@ class ChecklistGenerator:
         }
     }
     
+    # Palavras-chave do tipo de ação -> template (sem diferenciar acentos)
+    ACTION_TYPE_KEYWORDS = {
+        'gratuidade_justica': ['gratuidade', 'gratuidade de justiça'],
+        'relacao_consumo': ['consumidor', 'relação de consumo'],
+        'acao_companhia_aerea': ['companhia aérea', 'aérea'],
+        'cobranca_indevida': ['cobrança indevida'],
+        'negativacao_indevida': ['negativação'],
+        'pensao_alimenticia': ['pensão', 'alimentícia'],
+        'divorcio_litigioso': ['divórcio'],  # Default para litigioso
+        'guarda': ['guarda'],
+        'rescisao_indireta': ['rescisão'],
+        'horas_extras': ['horas extras', 'horas extra'],
+        'descumprimento_contratual': ['descumprimento', 'contratual'],
+        'cobranca_empresarial': ['cobrança empresarial']
+    }
+    ACTION_TYPE_AUTOMATON = KeywordAutomaton(ACTION_TYPE_KEYWORDS)
+    
     def __init__(self):
         """Inicializa o gerador de checklists"""
         logger.info("ChecklistGenerator inicializado")
@@ -240,42 +258,11 @@ class ChecklistGenerator:
     
     def _normalize_action_type(self, tipo_acao: str) -> str:
         """Normaliza tipo de ação para buscar template"""
-        tipo_lower = tipo_acao.lower()
-        
-        # Mapeamento de tipos para templates
-        mappings = {
-            'gratuidade': 'gratuidade_justica',
-            'gratuidade de justiça': 'gratuidade_justica',
-            'consumidor': 'relacao_consumo',
-            'relação de consumo': 'relacao_consumo',
-            'companhia aérea': 'acao_companhia_aerea',
-            'aérea': 'acao_companhia_aerea',
-            'cobrança indevida': 'cobranca_indevida',
-            'cobranca indevida': 'cobranca_indevida',
-            'negativação': 'negativacao_indevida',
-            'negativacao': 'negativacao_indevida',
-            'pensão': 'pensao_alimenticia',
-            'pensao': 'pensao_alimenticia',
-            'alimentícia': 'pensao_alimenticia',
-            'alimenticia': 'pensao_alimenticia',
-            'divórcio': 'divorcio_litigioso',  # Default para litigioso
-            'divorcio': 'divorcio_litigioso',
-            'guarda': 'guarda',
-            'rescisão': 'rescisao_indireta',
-            'rescisao': 'rescisao_indireta',
-            'horas extras': 'horas_extras',
-            'horas extra': 'horas_extras',
-            'descumprimento': 'descumprimento_contratual',
-            'contratual': 'descumprimento_contratual',
-            'cobrança empresarial': 'cobranca_empresarial',
-            'cobranca empresarial': 'cobranca_empresarial'
-        }
-        
-        for key, value in mappings.items():
-            if key in tipo_lower:
-                return value
+        template = self.ACTION_TYPE_AUTOMATON.best(tipo_acao)
+        if template:
+            return template
         
-        return tipo_lower.replace(' ', '_').replace('ç', 'c').replace('ã', 'a')
+        return tipo_acao.lower().replace(' ', '_').replace('ç', 'c').replace('ã', 'a')
     
     def _generate_generic_checklist(self, tipo_acao: str) -> Dict:
         """Gera checklist genérico quando não há template específico"""
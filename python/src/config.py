@@ -58,6 +58,13 @@ class APISettings(BaseSettings):
     workers: int = Field(default=4, env="PYTHON_API_WORKERS")
     reload: bool = Field(default=True, env="PYTHON_API_RELOAD")
     debug: bool = Field(default=False, env="PYTHON_API_DEBUG")
+    # POST /api/process-batch: documentos processados ao mesmo tempo e documentos por lote
+    batch_workers: int = Field(default=4, env="PYTHON_API_BATCH_WORKERS")
+    batch_max_files: int = Field(default=50, env="PYTHON_API_BATCH_MAX_FILES")
+    # POST /api/extract-deadlines/batch: processos (0 = CPUs), itens por bloco (0 = automático) e por lote
+    deadline_workers: int = Field(default=0, env="PYTHON_API_DEADLINE_WORKERS")
+    deadline_chunksize: int = Field(default=0, env="PYTHON_API_DEADLINE_CHUNKSIZE")
+    deadline_max_items: int = Field(default=5000, env="PYTHON_API_DEADLINE_MAX_ITEMS")
 
     class Config:
         env_prefix = "PYTHON_API_"
@@ -70,8 +77,9 @@ class StorageSettings(BaseSettings):
     documents_path: str = Field(default="./storage/documents", env="STORAGE_DOCUMENTS_PATH")
     uploads_path: str = Field(default="./storage/uploads", env="STORAGE_UPLOADS_PATH")
     max_file_size: int = Field(default=10485760, env="STORAGE_MAX_FILE_SIZE")  # 10MB
+    spool_size: int = Field(default=5242880, env="STORAGE_SPOOL_SIZE")  # 5MB processados em memória
     allowed_extensions: List[str] = Field(
-        default=["pdf", "doc", "docx", "jpg", "jpeg", "png", "txt"],
+        default=["pdf", "doc", "docx", "jpg", "jpeg", "png", "tif", "tiff", "txt"],
         env="STORAGE_ALLOWED_EXTENSIONS"
     )
 
@@ -86,6 +94,122 @@ class StorageSettings(BaseSettings):
         case_sensitive = False
 
 
+class OCRSettings(BaseSettings):
+    """Configurações de OCR (Tesseract)"""
+    workers: int = Field(default=0, env="OCR_WORKERS")  # 0 = número de CPUs
+    dpi: int = Field(default=150, env="OCR_DPI")
+    adaptive_dpi: bool = Field(default=True, env="OCR_ADAPTIVE_DPI")
+    dpi_high: int = Field(default=300, env="OCR_DPI_HIGH")
+    confidence_threshold: float = Field(default=75.0, env="OCR_CONFIDENCE_THRESHOLD")  # 0-100
+    grayscale: bool = Field(default=True, env="OCR_GRAYSCALE")
+    memory_budget_mb: int = Field(default=512, env="OCR_MEMORY_BUDGET_MB")
+    engine: str = Field(default="auto", env="OCR_ENGINE")  # auto, tesserocr, pytesseract
+    max_jobs_per_worker: int = Field(default=200, env="OCR_MAX_JOBS_PER_WORKER")
+    job_timeout: int = Field(default=300, env="OCR_JOB_TIMEOUT")  # segundos
+    # Imagens maiores que isso (em pixels) passam pelo OCR em faixas horizontais (0 = nunca)
+    tile_max_pixels: int = Field(default=50000000, env="OCR_TILE_MAX_PIXELS")
+    # Limite de pixels de um quadro decodificado inteiro (JPEG, PNG, TIFF comprimido); 0 = sem limite
+    max_image_pixels: int = Field(default=100000000, env="OCR_MAX_IMAGE_PIXELS")
+    
+    # Pré-processamento das imagens antes do OCR (OpenCV)
+    preprocess: bool = Field(default=True, env="OCR_PREPROCESS")
+    preprocess_target_dpi: int = Field(default=300, env="OCR_PREPROCESS_TARGET_DPI")
+    preprocess_downscale: bool = Field(default=True, env="OCR_PREPROCESS_DOWNSCALE")
+    preprocess_grayscale: bool = Field(default=True, env="OCR_PREPROCESS_GRAYSCALE")
+    preprocess_binarize: bool = Field(default=True, env="OCR_PREPROCESS_BINARIZE")
+    preprocess_deskew: bool = Field(default=True, env="OCR_PREPROCESS_DESKEW")
+    preprocess_crop_borders: bool = Field(default=True, env="OCR_PREPROCESS_CROP_BORDERS")
+
+    class Config:
+        env_prefix = "OCR_"
+        case_sensitive = False
+
+
+class PDFSettings(BaseSettings):
+    """Configurações da extração da camada de texto de PDFs"""
+    # auto (backend calibrado por perfil, PyPDF2 nos demais), pypdf2, pypdfium2, pdfminer ou pdftotext
+    backend: str = Field(default="auto", env="PDF_BACKEND")
+    # Gravado por: python src/pdf_backends.py <corpus>
+    calibration_path: str = Field(default="./storage/config/pdf_backends.json", env="PDF_CALIBRATION_PATH")
+
+    class Config:
+        env_prefix = "PDF_"
+        case_sensitive = False
+
+
+class SandboxSettings(BaseSettings):
+    """Processamento de documentos em processos isolados (tempo, memória e páginas limitados)"""
+    enabled: bool = Field(default=True, env="SANDBOX_ENABLED")
+    workers: int = Field(default=2, env="SANDBOX_WORKERS")
+    timeout: int = Field(default=300, env="SANDBOX_TIMEOUT")  # segundos por documento
+    memory_limit_mb: int = Field(default=4096, env="SANDBOX_MEMORY_LIMIT_MB")  # 0 = sem limite
+    max_pages: int = Field(default=2000, env="SANDBOX_MAX_PAGES")  # 0 = sem limite
+    max_jobs_per_worker: int = Field(default=50, env="SANDBOX_MAX_JOBS_PER_WORKER")
+
+    class Config:
+        env_prefix = "SANDBOX_"
+        case_sensitive = False
+
+
+class JobSettings(BaseSettings):
+    """Fila persistente de processamento assíncrono de documentos (/api/jobs)"""
+    enabled: bool = Field(default=True, env="JOBS_ENABLED")
+    path: str = Field(default="./storage/jobs/jobs.db", env="JOBS_PATH")
+    files_path: str = Field(default="./storage/jobs/arquivos", env="JOBS_FILES_PATH")
+    workers: int = Field(default=2, env="JOBS_WORKERS")
+    timeout: int = Field(default=3600, env="JOBS_TIMEOUT")  # segundos por documento, 0 = sem limite
+    max_attempts: int = Field(default=3, env="JOBS_MAX_ATTEMPTS")
+    # URL chamada ao concluir quando o job não informa callback_url (vazio = nenhuma)
+    callback_url: str = Field(default="", env="JOBS_CALLBACK_URL")
+    callback_timeout: int = Field(default=10, env="JOBS_CALLBACK_TIMEOUT")
+    retention_days: int = Field(default=7, env="JOBS_RETENTION_DAYS")
+
+    class Config:
+        env_prefix = "JOBS_"
+        case_sensitive = False
+
+
+class CalendarSettings(BaseSettings):
+    """Calendário forense para contagem de prazos em dias úteis"""
+    # Arquivo JSON de feriados e suspensões (vazio = python/data/feriados.json)
+    holidays_path: str = Field(default="", env="CALENDAR_HOLIDAYS_PATH")
+    first_year: int = Field(default=2015, env="CALENDAR_FIRST_YEAR")
+    last_year: int = Field(default=2050, env="CALENDAR_LAST_YEAR")
+
+    class Config:
+        env_prefix = "CALENDAR_"
+        case_sensitive = False
+
+
+class SchedulerSettings(BaseSettings):
+    """Agendador de prazos (deadline_scheduler.py): lembretes e vencimentos no horário certo"""
+    # Canal LISTEN/NOTIFY do trigger notify_prazos_alterados: o mesmo do argumento do trigger (database/schema.sql)
+    channel: str = Field(default="prazos_alterados", env="SCHEDULER_CHANNEL")
+    # Webhook avisado a cada prazo lembrado ou vencido; relativo a N8N_WEBHOOK_URL (vazio = nenhum)
+    alert_url: str = Field(default="prazos-alerta", env="SCHEDULER_ALERT_URL")
+    alert_timeout: int = Field(default=10, env="SCHEDULER_ALERT_TIMEOUT")
+    reminder_days: int = Field(default=3, env="SCHEDULER_REMINDER_DAYS")  # prazos sem data_lembrete
+    batch_size: int = Field(default=500, env="SCHEDULER_BATCH_SIZE")
+    max_wait: int = Field(default=60, env="SCHEDULER_MAX_WAIT")  # segundos entre verificações sem avisos
+    reconnect_delay: int = Field(default=10, env="SCHEDULER_RECONNECT_DELAY")
+
+    class Config:
+        env_prefix = "SCHEDULER_"
+        case_sensitive = False
+
+
+class CacheSettings(BaseSettings):
+    """Configurações do cache de extração de documentos"""
+    enabled: bool = Field(default=True, env="CACHE_ENABLED")
+    path: str = Field(default="./storage/cache/extracao.db", env="CACHE_PATH")
+    max_size: int = Field(default=536870912, env="CACHE_MAX_SIZE")  # 512MB
+    max_age_days: int = Field(default=30, env="CACHE_MAX_AGE_DAYS")
+
+    class Config:
+        env_prefix = "CACHE_"
+        case_sensitive = False
+
+
 class WhatsAppSettings(BaseSettings):
     """Configurações do WhatsApp"""
     api_type: str = Field(default="evolution", env="WHATSAPP_API_TYPE")
@@ -161,6 +285,13 @@ class Settings(BaseSettings):
     n8n: N8NSettings = Field(default_factory=N8NSettings)
     api: APISettings = Field(default_factory=APISettings)
     storage: StorageSettings = Field(default_factory=StorageSettings)
+    ocr: OCRSettings = Field(default_factory=OCRSettings)
+    pdf: PDFSettings = Field(default_factory=PDFSettings)
+    sandbox: SandboxSettings = Field(default_factory=SandboxSettings)
+    jobs: JobSettings = Field(default_factory=JobSettings)
+    cache: CacheSettings = Field(default_factory=CacheSettings)
+    calendar: CalendarSettings = Field(default_factory=CalendarSettings)
+    scheduler: SchedulerSettings = Field(default_factory=SchedulerSettings)
     whatsapp: WhatsAppSettings = Field(default_factory=WhatsAppSettings)
     google_calendar: GoogleCalendarSettings = Field(default_factory=GoogleCalendarSettings)
     email: EmailSettings = Field(default_factory=EmailSettings)
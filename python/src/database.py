@@ -0,0 +1,44 @@
+"""
+JurisPilot - Banco de Dados
+Conexões com o PostgreSQL (psycopg2) a partir das configurações DB_*
+"""
+
+from contextlib import contextmanager
+from typing import Iterator, Optional
+import psycopg2
+from loguru import logger
+
+from config import DatabaseSettings, get_settings
+
+
+def connect(database: Optional[DatabaseSettings] = None, **kwargs):
+    """
+    Abre uma conexão com o PostgreSQL
+
+    Args:
+        database: Configurações do banco (padrão: settings.database)
+        **kwargs: Parâmetros adicionais de psycopg2.connect
+    """
+    database = database or get_settings().database
+    return psycopg2.connect(database.connection_string, **kwargs)
+
+
+@contextmanager
+def transaction(database: Optional[DatabaseSettings] = None) -> Iterator:
+    """
+    Cursor em uma transação: confirmada ao final do bloco, desfeita em caso de erro
+
+    Exemplo:
+        with transaction() as cursor:
+            cursor.execute("UPDATE prazos SET status = %s WHERE id = %s", (status, prazo_id))
+    """
+    conn = connect(database)
+    try:
+        with conn:
+            with conn.cursor() as cursor:
+                yield cursor
+    except psycopg2.Error as e:
+        logger.error(f"Erro no banco de dados: {str(e)}")
+        raise
+    finally:
+        conn.close()
@@ -0,0 +1,160 @@
+"""
+JurisPilot - Motor de Datas
+Interpreta datas em dd/mm/aaaa, ISO e por extenso ("12 de março de 2024") com
+parsers próprios; o dateparser é usado apenas em trechos curtos que esses
+formatos não reconhecem
+"""
+
+import re
+import threading
+import unicodedata
+from datetime import datetime
+from functools import lru_cache
+from typing import List, Optional, Tuple
+import dateparser
+from loguru import logger
+
+
+class DateEngine:
+    """Extração e interpretação de datas em textos jurídicos"""
+
+    # Trechos maiores que isto nunca são enviados ao dateparser
+    MAX_SPAN_CHARS = 64
+
+    MONTHS = {
+        'janeiro': 1, 'fevereiro': 2, 'marco': 3, 'abril': 4, 'maio': 5, 'junho': 6,
+        'julho': 7, 'agosto': 8, 'setembro': 9, 'outubro': 10, 'novembro': 11, 'dezembro': 12,
+        'jan': 1, 'fev': 2, 'mar': 3, 'abr': 4, 'mai': 5, 'jun': 6,
+        'jul': 7, 'ago': 8, 'set': 9, 'out': 10, 'nov': 11, 'dez': 12
+    }
+
+    # Formatos reconhecidos pelos parsers próprios (trecho inteiro)
+    NUMERIC_PATTERN = re.compile(r'(\d{1,2})[/.-](\d{1,2})[/.-](\d{4}|\d{2})')
+    ISO_PATTERN = re.compile(
+        r'(\d{4})-(\d{2})-(\d{2})(?:[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?)?'
+    )
+    EXTENSO_PATTERN = re.compile(r'(\d{1,2})\s*[ºª°o]?\s+de\s+(\w+)\.?\s+de\s+(\d{4})', re.IGNORECASE)
+
+    # Candidatos a data procurados no texto
+    CANDIDATE_PATTERN = re.compile(
+        r'\b\d{4}-\d{2}-\d{2}\b'
+        r'|\b\d{1,2}[/.-]\d{1,2}[/.-](?:\d{4}|\d{2})\b'
+        r'|\b\d{1,2}\s*[ºª°o]?\s+de\s+\w+\.?\s+de\s+\d{4}\b',
+        re.IGNORECASE
+    )
+
+    def __init__(self, cache_size: int = 4096):
+        """
+        Inicializa o motor
+
+        Args:
+            cache_size: Número de trechos interpretados mantidos em cache (LRU)
+        """
+        self._parse_span = lru_cache(maxsize=cache_size)(self._parse_span_uncached)
+
+    def parse(self, value) -> Optional[datetime]:
+        """
+        Interpreta uma data
+
+        Args:
+            value: Trecho com a data (str) ou datetime
+
+        Returns:
+            datetime (meia-noite para datas sem hora) ou None se não reconhecida
+        """
+        if isinstance(value, datetime):
+            return value
+        if not isinstance(value, str):
+            return None
+
+        span = ' '.join(value.split())
+        if not span or len(span) > self.MAX_SPAN_CHARS:
+            return None
+        return self._parse_span(span)
+
+    def to_iso(self, value) -> Optional[str]:
+        """Interpreta uma data e retorna no formato AAAA-MM-DD"""
+        parsed = self.parse(value)
+        return parsed.strftime('%Y-%m-%d') if parsed else None
+
+    def find_dates(self, text: str, limit: Optional[int] = None) -> List[Tuple[datetime, int, int]]:
+        """
+        Procura datas no texto interpretando apenas os trechos candidatos
+
+        Args:
+            text: Texto completo
+            limit: Número máximo de datas retornadas
+
+        Returns:
+            Lista de (data, início, fim) na ordem do texto
+        """
+        dates = []
+        for match in self.CANDIDATE_PATTERN.finditer(text):
+            parsed = self.parse(match.group())
+            if parsed:
+                dates.append((parsed, match.start(), match.end()))
+                if limit and len(dates) >= limit:
+                    break
+        return dates
+
+    def find_first(self, text: str) -> Optional[datetime]:
+        """Primeira data reconhecida no texto"""
+        dates = self.find_dates(text, limit=1)
+        return dates[0][0] if dates else None
+
+    def cache_info(self):
+        """Estatísticas do cache de trechos interpretados"""
+        return self._parse_span.cache_info()
+
+    def _parse_span_uncached(self, span: str) -> Optional[datetime]:
+        """Interpreta um trecho curto: parsers próprios e, se nenhum reconhecer, dateparser"""
+        match = self.NUMERIC_PATTERN.fullmatch(span)
+        if match:
+            day, month, year = (int(group) for group in match.groups())
+            if len(match.group(3)) == 2:
+                year += 2000 if year < 70 else 1900
+            return self._build(year, month, day)
+
+        match = self.ISO_PATTERN.fullmatch(span)
+        if match:
+            year, month, day = (int(group) for group in match.groups())
+            return self._build(year, month, day)
+
+        match = self.EXTENSO_PATTERN.fullmatch(span)
+        if match:
+            month = self.MONTHS.get(self._fold(match.group(2)))
+            if month:
+                return self._build(int(match.group(3)), month, int(match.group(1)))
+
+        try:
+            return dateparser.parse(span, languages=['pt'])
+        except Exception as e:
+            logger.debug(f"Erro ao interpretar data '{span}': {e}")
+            return None
+
+    @staticmethod
+    def _build(year: int, month: int, day: int) -> Optional[datetime]:
+        """Cria a data, descartando valores inválidos (ex: 31/02)"""
+        try:
+            return datetime(year, month, day)
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _fold(word: str) -> str:
+        """Minúsculas sem acentos (março -> marco)"""
+        normalized = unicodedata.normalize('NFKD', word.lower())
+        return ''.join(char for char in normalized if not unicodedata.combining(char))
+
+
+_shared_engine: Optional[DateEngine] = None
+_shared_lock = threading.Lock()
+
+
+def get_date_engine() -> DateEngine:
+    """Instância compartilhada do motor de datas (e do seu cache)"""
+    global _shared_engine
+    with _shared_lock:
+        if _shared_engine is None:
+            _shared_engine = DateEngine()
+        return _shared_engine
@@ -0,0 +1,125 @@
+"""
+JurisPilot - Extração de Prazos em Lote
+Distribui a extração de prazos de muitos documentos (ex: carga histórica de
+prazos dos casos) entre processos, em blocos, mantendo a ordem da entrada
+"""
+
+import os
+import math
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterable, List, Optional
+from loguru import logger
+
+from deadline_extractor import DeadlineExtractor
+
+# Extrator de cada processo do pool (criado uma vez por processo)
+_worker_extractor: Optional[DeadlineExtractor] = None
+
+
+def _init_worker():
+    """Inicializa o extrator do processo"""
+    global _worker_extractor
+    _worker_extractor = DeadlineExtractor()
+
+
+def extract_item(item: Dict, extractor: Optional[DeadlineExtractor] = None) -> Dict:
+    """
+    Prazos de um item do lote
+
+    Args:
+        item: { "documento_info": {...}, "tipo_acao": "..." }
+        extractor: Extrator usado (padrão: o do processo do pool)
+
+    Returns:
+        {"success": true, "data": [prazos]} ou, em caso de falha,
+        {"success": false, "error", "message"}
+    """
+    extractor = extractor or _worker_extractor or DeadlineExtractor()
+    documento_info = item.get('documento_info') if isinstance(item, dict) else None
+    if not isinstance(documento_info, dict):
+        return {'success': False, 'error': 'documento_info necessário'}
+    try:
+        return {'success': True, 'data': extractor.extract_deadlines(documento_info, item.get('tipo_acao'))}
+    except Exception as e:
+        return {'success': False, 'error': 'Erro ao extrair prazos', 'message': str(e)}
+
+
+class DeadlineBatchExtractor:
+    """
+    Pool de processos para extrair prazos de muitos documentos
+
+    Os itens são enviados aos processos em blocos de chunksize (uma troca de
+    mensagens por bloco, e não por documento) e os resultados voltam na ordem
+    da entrada. Lotes pequenos são processados no próprio processo.
+    """
+
+    # Blocos por processo quando chunksize é automático (equilibra textos de tamanhos diferentes)
+    CHUNKS_PER_WORKER = 4
+    MAX_CHUNKSIZE = 64
+
+    def __init__(self, workers: int = 0, chunksize: int = 0,
+                 extractor: Optional[DeadlineExtractor] = None):
+        """
+        Inicializa o pool
+
+        Args:
+            workers: Número de processos (0 = número de CPUs)
+            chunksize: Itens por bloco enviado a um processo (0 = automático)
+            extractor: Extrator dos lotes processados no próprio processo
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.chunksize = chunksize
+        self.extractor = extractor or DeadlineExtractor()
+
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        logger.info(f"DeadlineBatchExtractor inicializado com {self.workers} processo(s)")
+
+    def _pool(self) -> ProcessPoolExecutor:
+        """Inicia os processos sob demanda e os reaproveita entre lotes"""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+            return self._executor
+
+    def _chunksize(self, total: int) -> int:
+        """Itens por bloco"""
+        if self.chunksize:
+            return self.chunksize
+        return max(1, min(self.MAX_CHUNKSIZE, math.ceil(total / (self.workers * self.CHUNKS_PER_WORKER))))
+
+    def extract_many(self, items: Iterable[Dict]) -> List[Dict]:
+        """
+        Prazos de cada item, na ordem da entrada
+
+        Args:
+            items: [{ "documento_info": {...}, "tipo_acao": "..." }, ...]
+
+        Returns:
+            Lista com o resultado de extract_item de cada item
+        """
+        items = list(items)
+        chunksize = self._chunksize(len(items))
+        if self.workers <= 1 or len(items) <= chunksize:
+            return [extract_item(item, self.extractor) for item in items]
+
+        executor = self._pool()
+        try:
+            return list(executor.map(extract_item, items, chunksize=chunksize))
+        except BrokenProcessPool:
+            # Processo morto (ex: falta de memória): os blocos pendentes já falharam
+            # junto com o pool e o próximo lote recria o pool
+            with self._lock:
+                if self._executor is executor:
+                    self._executor = None
+            executor.shutdown(wait=False)
+            raise
+
+    def close(self):
+        """Encerra os processos (após os lotes em andamento)"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
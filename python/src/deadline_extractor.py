@@ -3,11 +3,64 @@ JurisPilot - Extrator de Prazos
 Extrai e identifica prazos processuais e administrativos de documentos
 """
 
-from typing import Dict, List, Optional
-from datetime import datetime, timedelta
+from typing import Dict, List, NamedTuple, Optional, Pattern, Set, Tuple
+from datetime import date, datetime, timedelta
 import re
-import dateparser
 from loguru import logger
+from business_calendar import BusinessCalendar, get_business_calendar
+from date_engine import DateEngine, get_date_engine
+from keyword_automaton import KeywordAutomaton
+
+
+class DeadlineCandidate(NamedTuple):
+    """Ocorrência de uma regra de prazo no texto"""
+    origem: str          # data_explicita, prazo_processual ou palavra_chave
+    regra: int           # índice da regra em DeadlineExtractor.RULES
+    inicio: int          # posição inicial no texto
+    fim: int             # posição final no texto
+    grupos: Tuple        # grupos capturados pelo padrão da regra
+
+
+class DeadlineScan(NamedTuple):
+    """Resultado da varredura de um texto pelo DeadlineExtractor"""
+    candidatos: Dict[str, List[DeadlineCandidate]]  # por origem, na ordem das regras
+    prazos_conhecidos: Set[str]                     # nomes de PRAZOS_PROCESSUAIS no texto
+
+
+# Início, no texto dobrado, das regras que começam por número: "15 dias ..." e "25/12/2024 é o prazo"
+DIGIT_ANCHOR = r'[0-9]+(?:\s+dia|/[0-9]{2}/[0-9]{4}\s+e)'
+
+
+def _anchor_index(rules: List[Tuple[str, Optional[str], Pattern]],
+                  prazos: Dict[str, int]) -> Tuple[Pattern, Dict[str, Tuple[List[int], List[Tuple[str, str]]]]]:
+    """
+    Expressão única com o início de todas as regras e dos prazos conhecidos
+    
+    A expressão percorre o texto dobrado (KeywordAutomaton.fold, que preserva
+    as posições) sem diferenciar maiúsculas nem acentos; o primeiro caractere
+    de cada ocorrência indica as regras e os prazos a conferir naquela posição.
+    
+    Returns:
+        (expressão compilada, primeiro caractere -> (índices das regras, [(prazo, prazo dobrado)]))
+    """
+    words = {}
+    families: Dict[str, Tuple[List[int], List[Tuple[str, str]]]] = {}
+    for index, (_, literal, _) in enumerate(rules):
+        if literal is None:
+            keys = '0123456789'
+        else:
+            folded = KeywordAutomaton.fold(literal)
+            words[folded] = [folded]
+            keys = folded[0]
+        for key in keys:
+            families.setdefault(key, ([], []))[0].append(index)
+    for nome in prazos:
+        folded = KeywordAutomaton.fold(nome)
+        words[folded] = [folded]
+        families.setdefault(folded[0], ([], []))[1].append((nome, folded))
+    
+    trie = KeywordAutomaton(words).pattern
+    return re.compile(f'{trie}|{DIGIT_ANCHOR}'), families
 
 
 class DeadlineExtractor:
@@ -37,8 +90,47 @@ class DeadlineExtractor:
         'deadline', 'due date', 'data limite'
     ]
     
-    def __init__(self):
-        """Inicializa o extrator de prazos"""
+    # Datas de vencimento explícitas: (literal inicial, padrão); None = começa por número
+    EXPLICIT_PATTERNS = [
+        ('vencimento', r'vencimento[:\s]+(\d{2}/\d{2}/\d{4})'),
+        ('vencer', r'vencer[áa]\s+em[:\s]+(\d{2}/\d{2}/\d{4})'),
+        ('prazo', r'prazo[:\s]+até[:\s]+(\d{2}/\d{2}/\d{4})'),
+        ('data', r'data\s+limite[:\s]+(\d{2}/\d{2}/\d{4})'),
+        ('até', r'até\s+o\s+dia[:\s]+(\d{2}/\d{2}/\d{4})'),
+        (None, r'(\d{2}/\d{2}/\d{4})\s+é\s+o\s+prazo'),
+    ]
+    
+    # Número + dias + tipo de prazo (ex: "15 dias para contestação")
+    PROCEDURAL_PATTERN = r'(\d+)\s+dias?\s+(?:para|de|para o|para a)?\s*([a-záàâãéêíóôõúç\s]+)'
+    # Forma de contagem logo após "dias" ("15 dias corridos para ..."), separada do tipo de prazo
+    COUNTING_PATTERN = re.compile(r'(corridos?|[úu]teis|[úu]til)(?:\s+|$)(?:(?:para|de)(?:\s+[oa])?\b\s*)?')
+    
+    # Regras na ordem em que seus prazos são considerados (a primeira ocorrência
+    # de cada data de vencimento prevalece): (origem, literal inicial, padrão)
+    RULES: List[Tuple[str, Optional[str], Pattern]] = (
+        [('data_explicita', literal, re.compile(pattern, re.IGNORECASE))
+         for literal, pattern in EXPLICIT_PATTERNS]
+        + [('prazo_processual', None, re.compile(PROCEDURAL_PATTERN, re.IGNORECASE))]
+        + [('palavra_chave', keyword, re.compile(rf'{keyword}[:\s]+([^\.\n]+)', re.IGNORECASE))
+           for keyword in PRAZO_KEYWORDS]
+    )
+    
+    # O texto é percorrido uma vez por esta expressão; as regras só são testadas onde ela casa
+    ANCHOR_PATTERN, ANCHOR_FAMILIES = _anchor_index(RULES, PRAZOS_PROCESSUAIS)
+    
+    DATE_PATTERN = re.compile(r'(\d{2}/\d{2}/\d{4})')
+    
+    def __init__(self, date_engine: Optional[DateEngine] = None,
+                 calendar: Optional[BusinessCalendar] = None):
+        """
+        Inicializa o extrator de prazos
+        
+        Args:
+            date_engine: Motor de datas (usa a instância compartilhada se omitido)
+            calendar: Calendário forense (usa a instância compartilhada se omitido)
+        """
+        self.date_engine = date_engine or get_date_engine()
+        self.calendar = calendar or get_business_calendar()
         logger.info("DeadlineExtractor inicializado")
     
     def extract_deadlines(self, documento_info: Dict, tipo_acao: Optional[str] = None) -> List[Dict]:
@@ -46,7 +138,8 @@ class DeadlineExtractor:
         Extrai prazos de um documento
         
         Args:
-            documento_info: Informações do documento (texto_extraido, data_documento, etc)
+            documento_info: Informações do documento (texto_extraido, data_documento,
+                tribunal e comarca para os feriados, etc)
             tipo_acao: Tipo de ação jurídica (opcional)
             
         Returns:
@@ -60,16 +153,23 @@ class DeadlineExtractor:
         
         logger.info(f"Extraindo prazos do documento: {documento_info.get('nome_arquivo', 'N/A')}")
         
+        # Uma passada pelo texto para todas as regras
+        varredura = self.scan(texto)
+        candidatos = varredura.candidatos
+        
         prazos = []
         
         # Extrai prazos explícitos (datas de vencimento)
-        prazos.extend(self._extract_explicit_deadlines(texto, data_documento))
+        prazos.extend(self._extract_explicit_deadlines(candidatos['data_explicita'], data_documento))
         
         # Extrai prazos processuais (texto como "15 dias")
-        prazos.extend(self._extract_procedural_deadlines(texto, data_documento, tipo_acao))
+        prazos.extend(self._extract_procedural_deadlines(
+            candidatos['prazo_processual'], varredura.prazos_conhecidos, data_documento, tipo_acao,
+            documento_info.get('tribunal'), documento_info.get('comarca')
+        ))
         
         # Extrai prazos por palavras-chave
-        prazos.extend(self._extract_keyword_deadlines(texto, data_documento))
+        prazos.extend(self._extract_keyword_deadlines(candidatos['palavra_chave'], data_documento))
         
         # Remove duplicatas e valida
         prazos = self._deduplicate_and_validate(prazos)
@@ -78,90 +178,107 @@ class DeadlineExtractor:
         
         return prazos
     
-    def _extract_explicit_deadlines(self, texto: str, data_base: Optional[str]) -> List[Dict]:
+    def scan(self, texto: str) -> DeadlineScan:
+        """
+        Candidatos a prazo de todas as regras em uma única passada pelo texto
+        
+        Cada regra recebe as mesmas ocorrências de uma busca própria no texto
+        inteiro: ocorrências de regras diferentes podem se sobrepor (em
+        "prazo: até 25/12/2024" casam a data explícita e as palavras-chave
+        "prazo" e "até"), e as de uma mesma regra não se sobrepõem.
+        """
+        rules = self.RULES
+        found: List[List[re.Match]] = [[] for _ in rules]
+        # Posição a partir da qual cada regra volta a ser testada (fim da última ocorrência)
+        resume = [0] * len(rules)
+        conhecidos = set()
+        
+        # Fora do Latin-1 o texto dobrado perde caracteres que os padrões aceitam
+        # sem diferenciar maiúsculas (ex: ı por "i"); cada regra percorre então o texto
+        latin1 = self._is_latin1(texto)
+        if not latin1:
+            for index, (_, _, pattern) in enumerate(rules):
+                found[index] = list(pattern.finditer(texto))
+        
+        folded = KeywordAutomaton.fold(texto)
+        families = self.ANCHOR_FAMILIES
+        search = self.ANCHOR_PATTERN.search
+        anchor = search(folded)
+        while anchor is not None:
+            pos = anchor.start()
+            indices, nomes = families[folded[pos]]
+            if latin1:
+                for index in indices:
+                    if pos >= resume[index]:
+                        match = rules[index][2].match(texto, pos)
+                        if match is not None:
+                            found[index].append(match)
+                            resume[index] = match.end()
+            for nome, palavra in nomes:
+                if folded.startswith(palavra, pos):
+                    conhecidos.add(nome)
+            anchor = search(folded, pos + 1)
+        
+        candidatos = {'data_explicita': [], 'prazo_processual': [], 'palavra_chave': []}
+        for index, (origem, _, _) in enumerate(rules):
+            candidatos[origem].extend(
+                DeadlineCandidate(origem, index, match.start(), match.end(), match.groups())
+                for match in found[index]
+            )
+        return DeadlineScan(candidatos, conhecidos)
+    
+    @staticmethod
+    def _is_latin1(texto: str) -> bool:
+        """O texto só tem caracteres do Latin-1"""
+        if texto.isascii():
+            return True
+        try:
+            texto.encode('latin-1')
+        except UnicodeEncodeError:
+            return False
+        return True
+    
+    def _extract_explicit_deadlines(self, candidatos: List[DeadlineCandidate],
+                                    data_base: Optional[str]) -> List[Dict]:
         """Extrai prazos explícitos (datas de vencimento)"""
         prazos = []
         
-        # Padrões de data
-        date_patterns = [
-            r'vencimento[:\s]+(\d{2}/\d{2}/\d{4})',
-            r'vencer[áa]\s+em[:\s]+(\d{2}/\d{2}/\d{4})',
-            r'prazo[:\s]+até[:\s]+(\d{2}/\d{2}/\d{4})',
-            r'data\s+limite[:\s]+(\d{2}/\d{2}/\d{4})',
-            r'até\s+o\s+dia[:\s]+(\d{2}/\d{2}/\d{4})',
-            r'(\d{2}/\d{2}/\d{4})\s+é\s+o\s+prazo',
-        ]
-        
-        for pattern in date_patterns:
-            matches = re.finditer(pattern, texto, re.IGNORECASE)
-            for match in matches:
-                data_str = match.group(1)
-                try:
-                    parsed_date = dateparser.parse(data_str, languages=['pt'], date_formats=['%d/%m/%Y'])
-                    if parsed_date:
-                        prazos.append({
-                            'tipo_prazo': 'processual',
-                            'data_vencimento': parsed_date.strftime('%Y-%m-%d'),
-                            'descricao': f"Prazo identificado: {data_str}",
-                            'origem': 'data_explicita',
-                            'confianca': 'alta'
-                        })
-                except Exception as e:
-                    logger.debug(f"Erro ao parsear data: {e}")
+        for candidato in candidatos:
+            data_str = candidato.grupos[0]
+            try:
+                parsed_date = self.date_engine.parse(data_str)
+                if parsed_date:
+                    prazos.append({
+                        'tipo_prazo': 'processual',
+                        'data_vencimento': parsed_date.strftime('%Y-%m-%d'),
+                        'descricao': f"Prazo identificado: {data_str}",
+                        'origem': 'data_explicita',
+                        'confianca': 'alta'
+                    })
+            except Exception as e:
+                logger.debug(f"Erro ao parsear data: {e}")
         
         return prazos
     
-    def _extract_procedural_deadlines(self, texto: str, data_base: Optional[str], 
-                                     tipo_acao: Optional[str]) -> List[Dict]:
+    def _extract_procedural_deadlines(self, candidatos: List[DeadlineCandidate], encontrados: Set[str],
+                                      data_base: Optional[str], tipo_acao: Optional[str],
+                                      tribunal: Optional[str] = None, comarca: Optional[str] = None) -> List[Dict]:
         """Extrai prazos processuais (ex: "15 dias para contestação")"""
         prazos = []
         
-        # Padrão: número + dias + tipo de prazo
-        pattern = r'(\d+)\s+dias?\s+(?:para|de|para o|para a)?\s*([a-záàâãéêíóôõúç\s]+)'
-        matches = re.finditer(pattern, texto, re.IGNORECASE)
-        
-        for match in matches:
-            dias = int(match.group(1))
-            tipo_texto = match.group(2).strip().lower()
-            
-            # Identifica tipo de prazo
-            tipo_prazo = self._identify_deadline_type(tipo_texto)
-            
-            # Calcula data de vencimento
-            if data_base:
-                try:
-                    base_date = datetime.strptime(data_base, '%Y-%m-%d')
-                    vencimento = base_date + timedelta(days=dias)
-                    
-                    prazos.append({
-                        'tipo_prazo': tipo_prazo,
-                        'data_vencimento': vencimento.strftime('%Y-%m-%d'),
-                        'descricao': f"{dias} dias para {tipo_texto}",
-                        'origem': 'prazo_processual',
-                        'dias': dias,
-                        'confianca': 'media'
-                    })
-                except Exception as e:
-                    logger.debug(f"Erro ao calcular vencimento: {e}")
-            else:
-                # Se não tem data base, usa data atual
-                vencimento = datetime.now() + timedelta(days=dias)
-                prazos.append({
-                    'tipo_prazo': tipo_prazo,
-                    'data_vencimento': vencimento.strftime('%Y-%m-%d'),
-                    'descricao': f"{dias} dias para {tipo_texto} (a partir de hoje)",
-                    'origem': 'prazo_processual',
-                    'dias': dias,
-                    'confianca': 'baixa'
-                })
+        for candidato in candidatos:
+            prazo = self._procedural_deadline(int(candidato.grupos[0]), candidato.grupos[1].strip().lower(),
+                                              data_base, tribunal, comarca)
+            if prazo:
+                prazos.append(prazo)
         
-        # Verifica prazos conhecidos no texto
+        # Prazos conhecidos presentes no texto (sem diferenciar maiúsculas nem acentos)
         for prazo_nome, dias_padrao in self.PRAZOS_PROCESSUAIS.items():
-            if prazo_nome in texto.lower():
+            if prazo_nome in encontrados:
                 if data_base:
                     try:
                         base_date = datetime.strptime(data_base, '%Y-%m-%d')
-                        vencimento = base_date + timedelta(days=dias_padrao)
+                        vencimento = self._due_date(base_date, dias_padrao, False, tribunal, comarca)
                         
                         prazos.append({
                             'tipo_prazo': 'processual',
@@ -169,6 +286,8 @@ class DeadlineExtractor:
                             'descricao': f"Prazo padrão para {prazo_nome}: {dias_padrao} dias",
                             'origem': 'prazo_padrao',
                             'dias': dias_padrao,
+                            'contagem': 'dias_uteis',
+                            **self._derivation(base_date, tribunal, comarca),
                             'confianca': 'alta'
                         })
                     except Exception as e:
@@ -176,33 +295,91 @@ class DeadlineExtractor:
         
         return prazos
     
-    def _extract_keyword_deadlines(self, texto: str, data_base: Optional[str]) -> List[Dict]:
+    def _procedural_deadline(self, dias: int, tipo_texto: str, data_base: Optional[str],
+                             tribunal: Optional[str], comarca: Optional[str]) -> Optional[Dict]:
+        """Prazo de "N dias para ..." contado da data do documento (ou de hoje)"""
+        # "15 dias corridos para ..."; sem indicação, dias úteis (CPC, art. 219)
+        contagem_match = self.COUNTING_PATTERN.match(tipo_texto)
+        corridos = bool(contagem_match) and contagem_match.group(1).startswith('corrido')
+        if contagem_match:
+            tipo_texto = tipo_texto[contagem_match.end():]
+        contagem = 'dias_corridos' if corridos else 'dias_uteis'
+        # Identifica tipo de prazo
+        tipo_prazo = self._identify_deadline_type(tipo_texto)
+        descricao = f"{dias} dias para {tipo_texto}" if tipo_texto else f"{dias} dias"
+        
+        # Calcula data de vencimento
+        if data_base:
+            try:
+                base_date = datetime.strptime(data_base, '%Y-%m-%d')
+                vencimento = self._due_date(base_date, dias, corridos, tribunal, comarca)
+                
+                return {
+                    'tipo_prazo': tipo_prazo,
+                    'data_vencimento': vencimento.strftime('%Y-%m-%d'),
+                    'descricao': descricao,
+                    'origem': 'prazo_processual',
+                    'dias': dias,
+                    'contagem': contagem,
+                    **self._derivation(base_date, tribunal, comarca),
+                    'confianca': 'media'
+                }
+            except Exception as e:
+                logger.debug(f"Erro ao calcular vencimento: {e}")
+                return None
+        
+        # Se não tem data base, usa data atual
+        hoje = datetime.now()
+        vencimento = self._due_date(hoje, dias, corridos, tribunal, comarca)
+        return {
+            'tipo_prazo': tipo_prazo,
+            'data_vencimento': vencimento.strftime('%Y-%m-%d'),
+            'descricao': f"{descricao} (a partir de hoje)",
+            'origem': 'prazo_processual',
+            'dias': dias,
+            'contagem': contagem,
+            **self._derivation(hoje, tribunal, comarca),
+            'confianca': 'baixa'
+        }
+    
+    @staticmethod
+    def _derivation(base_date: datetime, tribunal: Optional[str], comarca: Optional[str]) -> Dict:
+        """
+        Dados de que o vencimento depende, gravados com o prazo (colunas de
+        prazos) para recalculá-lo quando o calendário mudar (deadline_recompute.py)
+        """
+        return {'data_base': base_date.strftime('%Y-%m-%d'), 'tribunal': tribunal, 'comarca': comarca}
+    
+    def _due_date(self, base_date: datetime, dias: int, corridos: bool,
+                  tribunal: Optional[str], comarca: Optional[str]) -> date:
+        """Vencimento no calendário forense do tribunal/comarca"""
+        if corridos:
+            return self.calendar.add_calendar_days(base_date, dias, tribunal, comarca)
+        return self.calendar.add_business_days(base_date, dias, tribunal, comarca)
+    
+    def _extract_keyword_deadlines(self, candidatos: List[DeadlineCandidate],
+                                   data_base: Optional[str]) -> List[Dict]:
         """Extrai prazos usando palavras-chave"""
         prazos = []
         
-        for keyword in self.PRAZO_KEYWORDS:
-            # Procura por padrões próximos à palavra-chave
-            pattern = rf'{keyword}[:\s]+([^\.\n]+)'
-            matches = re.finditer(pattern, texto, re.IGNORECASE)
+        for candidato in candidatos:
+            contexto = candidato.grupos[0].strip()
             
-            for match in matches:
-                contexto = match.group(1).strip()
-                
-                # Tenta extrair data do contexto
-                data_match = re.search(r'(\d{2}/\d{2}/\d{4})', contexto)
-                if data_match:
-                    try:
-                        parsed_date = dateparser.parse(data_match.group(1), languages=['pt'])
-                        if parsed_date:
-                            prazos.append({
-                                'tipo_prazo': 'processual',
-                                'data_vencimento': parsed_date.strftime('%Y-%m-%d'),
-                                'descricao': f"Prazo encontrado: {contexto[:100]}",
-                                'origem': 'palavra_chave',
-                                'confianca': 'media'
-                            })
-                    except Exception as e:
-                        logger.debug(f"Erro ao parsear data do contexto: {e}")
+            # Tenta extrair data do contexto
+            data_match = self.DATE_PATTERN.search(contexto)
+            if data_match:
+                try:
+                    parsed_date = self.date_engine.parse(data_match.group(1))
+                    if parsed_date:
+                        prazos.append({
+                            'tipo_prazo': 'processual',
+                            'data_vencimento': parsed_date.strftime('%Y-%m-%d'),
+                            'descricao': f"Prazo encontrado: {contexto[:100]}",
+                            'origem': 'palavra_chave',
+                            'confianca': 'media'
+                        })
+                except Exception as e:
+                    logger.debug(f"Erro ao parsear data do contexto: {e}")
         
         return prazos
     
@@ -0,0 +1,150 @@
+"""
+JurisPilot - Recálculo de Prazos
+Recalcula o vencimento dos prazos em aberto afetados por uma mudança no
+calendário forense (novo feriado, suspensão de expediente) a partir da
+derivação gravada com cada prazo (data_base, dias, contagem, tribunal e
+comarca) e atualiza em lote apenas as linhas cujo vencimento mudou
+
+Uso:
+    python deadline_recompute.py --inicio 2025-03-10 [--fim 2025-03-12] [--tribunal TJSP] [--simular]
+
+Registre antes a suspensão ou o feriado em data/feriados.json.
+"""
+
+import sys
+import json
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+from psycopg2.extras import execute_values
+from loguru import logger
+
+from business_calendar import BusinessCalendar, DateLike, get_business_calendar, to_datetime64
+from database import transaction
+
+
+class DeadlineRecomputer:
+    """
+    Recalcula os prazos cuja contagem passa pelos dias alterados no calendário
+
+    Um prazo depende dos dias entre data_base e data_vencimento (inclusive):
+    o índice idx_prazos_janela_contagem (GiST sobre esse intervalo) localiza
+    os prazos cuja janela cruza os dias alterados, sem percorrer a tabela.
+    Os vencimentos são recalculados de uma vez por add_business_days_bulk.
+    """
+
+    STATUS_ABERTOS = ('pendente', 'lembrado')
+
+    SELECT_AFETADOS = """
+        SELECT id, data_base, dias, contagem, tribunal, comarca, data_vencimento
+        FROM prazos
+        WHERE data_base IS NOT NULL
+          AND dias IS NOT NULL
+          AND data_vencimento >= data_base
+          AND daterange(data_base, data_vencimento, '[]') && daterange(%(inicio)s, %(fim)s, '[]')
+          AND status IN %(status)s
+          {filtro_tribunal}
+        FOR UPDATE
+    """
+
+    # O lembrete mantém a antecedência que tinha em relação ao vencimento
+    UPDATE_VENCIMENTOS = """
+        UPDATE prazos AS p
+        SET data_vencimento = v.vencimento,
+            data_lembrete = v.vencimento - (p.data_vencimento - p.data_lembrete),
+            updated_at = CURRENT_TIMESTAMP
+        FROM (VALUES %s) AS v(id, vencimento)
+        WHERE p.id = v.id
+    """
+
+    def __init__(self, calendar: Optional[BusinessCalendar] = None):
+        """
+        Inicializa o recálculo
+
+        Args:
+            calendar: Calendário forense já com a mudança (padrão: o compartilhado)
+        """
+        self.calendar = calendar or get_business_calendar()
+
+    def recompute(self, inicio: DateLike, fim: Optional[DateLike] = None, tribunal: Optional[str] = None,
+                  simular: bool = False) -> Dict:
+        """
+        Recalcula os prazos em aberto afetados pelos dias de inicio a fim
+
+        Args:
+            inicio: Primeiro dia alterado no calendário
+            fim: Último dia alterado (padrão: inicio)
+            tribunal: Restringe aos prazos desse tribunal (mudança só dele)
+            simular: Calcula as alterações sem gravá-las
+
+        Returns:
+            Dicionário com prazos afetados (janela cruza os dias), alterados
+            e a lista de alterações (id, vencimento anterior e novo)
+        """
+        inicio = to_datetime64(inicio).astype(date)
+        fim = to_datetime64(fim).astype(date) if fim else inicio
+
+        with transaction() as cursor:
+            afetados = self._affected(cursor, inicio, fim, tribunal)
+            alteracoes = self._changes(afetados)
+            if alteracoes and not simular:
+                execute_values(cursor, self.UPDATE_VENCIMENTOS,
+                               [(prazo_id, novo) for prazo_id, _, novo in alteracoes],
+                               template='(%s::uuid, %s::date)', page_size=1000)
+
+        resultado = {
+            'inicio': inicio.isoformat(),
+            'fim': fim.isoformat(),
+            'tribunal': tribunal,
+            'simulado': simular,
+            'afetados': len(afetados),
+            'alterados': len(alteracoes),
+            'alteracoes': [
+                {'id': str(prazo_id), 'data_vencimento_anterior': antigo.isoformat(),
+                 'data_vencimento': novo.isoformat()}
+                for prazo_id, antigo, novo in alteracoes
+            ]
+        }
+        logger.info(f"Recálculo de prazos ({resultado['inicio']} a {resultado['fim']}"
+                    f"{', ' + tribunal if tribunal else ''}): {resultado['afetados']} afetados, "
+                    f"{resultado['alterados']} alterados{' (simulação)' if simular else ''}")
+        return resultado
+
+    def _affected(self, cursor, inicio: date, fim: date, tribunal: Optional[str]) -> List[Tuple]:
+        """Prazos em aberto cuja janela de contagem cruza os dias alterados (bloqueados até o fim)"""
+        filtro_tribunal = 'AND upper(tribunal) = upper(%(tribunal)s)' if tribunal else ''
+        cursor.execute(self.SELECT_AFETADOS.format(filtro_tribunal=filtro_tribunal),
+                       {'inicio': inicio, 'fim': fim, 'status': self.STATUS_ABERTOS, 'tribunal': tribunal})
+        return cursor.fetchall()
+
+    def _changes(self, afetados: List[Tuple]) -> List[Tuple]:
+        """Recalcula os vencimentos e devolve (id, anterior, novo) dos que mudaram"""
+        if not afetados:
+            return []
+        ids, bases, dias, contagens, tribunais, comarcas, vencimentos = zip(*afetados)
+        novos = self.calendar.add_business_days_bulk(
+            bases, dias, tribunais, comarcas,
+            corridos=[contagem == 'dias_corridos' for contagem in contagens]
+        ).astype(date).tolist()
+        return [
+            (prazo_id, antigo, novo)
+            for prazo_id, antigo, novo in zip(ids, vencimentos, novos)
+            if novo != antigo
+        ]
+
+
+def main():
+    args = sys.argv[1:]
+    if '--inicio' not in args:
+        print(__doc__)
+        sys.exit(1)
+
+    def option(name: str) -> Optional[str]:
+        return args[args.index(name) + 1] if name in args else None
+
+    resultado = DeadlineRecomputer().recompute(option('--inicio'), option('--fim'), option('--tribunal'),
+                                               simular='--simular' in args)
+    print(json.dumps(resultado, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,367 @@
+"""
+JurisPilot - Agendador de Prazos
+Mantém os prazos em aberto em memória e marca cada um como lembrado ou
+vencido no momento certo, em vez de consultar todos os prazos pendentes
+periodicamente
+
+Uso:
+    python deadline_scheduler.py
+
+Os prazos são carregados uma vez e acompanhados pelos avisos LISTEN/NOTIFY
+do trigger notify_prazos_alterados (database/schema.sql). Cada transição é
+gravada em lote em prazos.status e avisada ao webhook do workflow Controle
+de Prazos (alertas por WhatsApp e Google Calendar).
+"""
+
+import os
+import json
+import heapq
+import select
+import signal
+import threading
+from datetime import date, datetime, time as dtime, timedelta
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import urljoin
+import psycopg2
+import requests
+from psycopg2 import sql
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+from psycopg2.extras import execute_values
+from loguru import logger
+
+from config import get_settings
+from database import connect, transaction
+from deadline_extractor import DeadlineExtractor
+
+
+class Transition(NamedTuple):
+    """Mudança de status programada de um prazo"""
+    quando: datetime        # momento em que a mudança passa a valer
+    prazo_id: str
+    status: str             # novo status (lembrado ou vencido)
+    anterior: str           # status esperado no banco ao aplicar
+    data_vencimento: date
+    data_lembrete: date
+
+
+class DeadlineScheduler:
+    """
+    Agendador de lembretes e vencimentos dos prazos em aberto
+
+    Cada prazo em aberto tem uma única próxima transição em um heap ordenado
+    pelo momento em que ela vale: pendente -> lembrado no início do dia do
+    lembrete e lembrado -> vencido no dia seguinte ao vencimento. Avisos de
+    alteração reprogramam o prazo (as entradas antigas do heap são
+    descartadas quando chegam ao topo), de modo que o custo depende das
+    mudanças, e não do total de prazos em aberto.
+    """
+
+    PENDING = 'pendente'
+    REMINDED = 'lembrado'
+    EXPIRED = 'vencido'
+
+    SELECT_ABERTOS = """
+        SELECT id, status, data_vencimento, data_lembrete
+        FROM prazos
+        WHERE status IN ('pendente', 'lembrado')
+    """
+
+    # Só aplica a transição se o prazo não mudou desde que foi programada
+    UPDATE_STATUS = """
+        UPDATE prazos AS p
+        SET status = v.status,
+            data_lembrete = COALESCE(p.data_lembrete, v.data_lembrete)
+        FROM (VALUES %s) AS v(id, status, anterior, data_vencimento, data_lembrete)
+        WHERE p.id = v.id
+          AND p.status = v.anterior
+          AND p.data_vencimento = v.data_vencimento
+        RETURNING p.id, p.caso_id, p.tipo_prazo, p.descricao, p.status, p.data_vencimento, p.data_lembrete
+    """
+
+    def __init__(self, extractor: Optional[DeadlineExtractor] = None, channel: str = 'prazos_alterados',
+                 alert_url: Optional[str] = None, alert_timeout: int = 10, reminder_days: int = 3,
+                 batch_size: int = 500, max_wait: int = 60, reconnect_delay: int = 10):
+        """
+        Inicializa o agendador
+
+        Args:
+            extractor: Regras de lembrete e de prazo crítico
+            channel: Canal LISTEN/NOTIFY dos prazos alterados
+            alert_url: Webhook avisado a cada prazo lembrado ou vencido (None = nenhum)
+            alert_timeout: Tempo máximo de cada aviso em segundos
+            reminder_days: Antecedência do lembrete quando o prazo não tem data_lembrete
+            batch_size: Transições gravadas por UPDATE
+            max_wait: Espera máxima entre verificações sem avisos (segundos)
+            reconnect_delay: Espera antes de reconectar após um erro do banco (segundos)
+        """
+        self.extractor = extractor or DeadlineExtractor()
+        self.channel = channel
+        self.alert_url = alert_url or None
+        self.alert_timeout = alert_timeout
+        self.reminder_days = reminder_days
+        self.batch_size = max(1, batch_size)
+        self.max_wait = max_wait
+        self.reconnect_delay = reconnect_delay
+
+        self._heap: List[Tuple[datetime, int, Transition]] = []
+        self._current: Dict[str, int] = {}  # prazo -> sequência da transição válida
+        self._sequence = 0
+        self._conn = None
+        self._session = requests.Session()
+        self._stop = threading.Event()
+        self._wake_read, self._wake_write = os.pipe()
+
+    def __len__(self) -> int:
+        """Prazos em aberto acompanhados"""
+        return len(self._current)
+
+    # ------------------------------------------------------------------
+    # Programação
+    # ------------------------------------------------------------------
+
+    def schedule(self, prazo_id: str, status: str, data_vencimento, data_lembrete=None):
+        """
+        (Re)programa a próxima transição de um prazo a partir do seu estado
+
+        Prazos que não estão pendentes nem lembrados deixam de ser acompanhados.
+        """
+        prazo_id = str(prazo_id)
+        data_vencimento = self._as_date(data_vencimento)
+        if status not in (self.PENDING, self.REMINDED) or data_vencimento is None:
+            self.forget(prazo_id)
+            return
+
+        data_lembrete = self._as_date(data_lembrete) or date.fromisoformat(
+            self.extractor.calculate_reminder_date(data_vencimento.isoformat(), self.reminder_days)
+        )
+        vence = datetime.combine(data_vencimento + timedelta(days=1), dtime.min)
+        lembra = datetime.combine(data_lembrete, dtime.min)
+
+        # Prazo já vencido vai direto para vencido, sem lembrete
+        if status == self.PENDING and lembra < vence and vence > datetime.now():
+            transicao = Transition(lembra, prazo_id, self.REMINDED, status, data_vencimento, data_lembrete)
+        else:
+            transicao = Transition(vence, prazo_id, self.EXPIRED, status, data_vencimento, data_lembrete)
+
+        self._sequence += 1
+        self._current[prazo_id] = self._sequence
+        heapq.heappush(self._heap, (transicao.quando, self._sequence, transicao))
+
+    def forget(self, prazo_id: str):
+        """Deixa de acompanhar um prazo (cumprido, removido...)"""
+        self._current.pop(str(prazo_id), None)
+
+    def next_time(self) -> Optional[datetime]:
+        """Momento da próxima transição válida"""
+        while self._heap:
+            _, sequence, transicao = self._heap[0]
+            if self._current.get(transicao.prazo_id) == sequence:
+                return transicao.quando
+            heapq.heappop(self._heap)  # reprogramada ou esquecida
+        return None
+
+    def due(self, agora: Optional[datetime] = None, limite: Optional[int] = None) -> List[Transition]:
+        """Retira do heap as transições válidas que já venceram (até limite)"""
+        agora = agora or datetime.now()
+        vencidas = []
+        while self._heap and (limite is None or len(vencidas) < limite):
+            quando, sequence, transicao = self._heap[0]
+            if self._current.get(transicao.prazo_id) != sequence:
+                heapq.heappop(self._heap)
+                continue
+            if quando > agora:
+                break
+            heapq.heappop(self._heap)
+            del self._current[transicao.prazo_id]
+            vencidas.append(transicao)
+        return vencidas
+
+    # ------------------------------------------------------------------
+    # Banco de dados
+    # ------------------------------------------------------------------
+
+    def load(self):
+        """Escuta o canal de alterações e carrega os prazos em aberto"""
+        self._close()
+        self._conn = connect()
+        self._conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+        with self._conn.cursor() as cursor:
+            # LISTEN antes da carga: nenhuma alteração feita durante ela é perdida
+            cursor.execute(sql.SQL("LISTEN {}").format(sql.Identifier(self.channel)))
+            cursor.execute(self.SELECT_ABERTOS)
+            rows = cursor.fetchall()
+
+        self._heap = []
+        self._current = {}
+        for prazo_id, status, data_vencimento, data_lembrete in rows:
+            self.schedule(prazo_id, status, data_vencimento, data_lembrete)
+        logger.info(f"Agendador de prazos: {len(self)} prazos em aberto carregados")
+
+    def apply_notifications(self) -> int:
+        """Reprograma os prazos dos avisos recebidos; retorna quantos foram aplicados"""
+        self._conn.poll()
+        aplicados = 0
+        while self._conn.notifies:
+            aviso = self._conn.notifies.pop(0)
+            try:
+                prazo = json.loads(aviso.payload)
+            except ValueError:
+                logger.warning(f"Aviso de prazo inválido ignorado: {aviso.payload[:200]}")
+                continue
+            if prazo.get('operacao') == 'DELETE':
+                self.forget(prazo['id'])
+            else:
+                self.schedule(prazo['id'], prazo.get('status'), prazo.get('data_vencimento'),
+                              prazo.get('data_lembrete'))
+            aplicados += 1
+        return aplicados
+
+    def fire(self, transicoes: List[Transition]) -> List[Dict]:
+        """
+        Grava as transições em lote e avisa o webhook de alertas
+
+        Returns:
+            Prazos efetivamente alterados (os modificados por outra pessoa
+            desde a programação são ignorados e chegam de novo por aviso)
+        """
+        if not transicoes:
+            return []
+        with transaction() as cursor:
+            rows = execute_values(
+                cursor, self.UPDATE_STATUS,
+                [(t.prazo_id, t.status, t.anterior, t.data_vencimento, t.data_lembrete) for t in transicoes],
+                template='(%s::uuid, %s, %s, %s::date, %s::date)', page_size=self.batch_size, fetch=True
+            )
+
+        alterados = [self._alert_payload(row) for row in rows]
+        for prazo in alterados:
+            # Lembrados passam a aguardar o vencimento (o aviso do trigger repete isso)
+            self.schedule(prazo['id'], prazo['status'], prazo['data_vencimento'], prazo['data_lembrete'])
+        logger.info(f"Agendador de prazos: {len(alterados)} de {len(transicoes)} transições gravadas "
+                    f"({sum(p['status'] == self.EXPIRED for p in alterados)} vencidos)")
+        for prazo in alterados:
+            self._send_alert(prazo)
+        return alterados
+
+    def _alert_payload(self, row: Tuple) -> Dict:
+        """Prazo alterado com dias restantes, prioridade e criticidade"""
+        prazo_id, caso_id, tipo_prazo, descricao, status, data_vencimento, data_lembrete = row
+        prazo = {
+            'id': str(prazo_id),
+            'caso_id': str(caso_id),
+            'tipo_prazo': tipo_prazo,
+            'descricao': descricao,
+            'status': status,
+            'data_vencimento': data_vencimento.isoformat(),
+            'data_lembrete': data_lembrete.isoformat() if data_lembrete else None,
+        }
+        dias_restantes = (data_vencimento - date.today()).days
+        prazo.update({
+            'dias_restantes': dias_restantes,
+            'prioridade': self.priority(dias_restantes),
+            'critico': self.extractor.is_critical_deadline(prazo)
+        })
+        return prazo
+
+    @staticmethod
+    def priority(dias_restantes: int) -> str:
+        """Prioridade do alerta pelos dias que faltam para o vencimento"""
+        if dias_restantes <= 1:
+            return 'critico'
+        if dias_restantes <= 3:
+            return 'alta'
+        if dias_restantes <= 7:
+            return 'media'
+        return 'normal'
+
+    def _send_alert(self, prazo: Dict):
+        """Avisa o webhook de alertas (falhas são registradas e não interrompem o agendador)"""
+        if not self.alert_url:
+            return
+        try:
+            response = self._session.post(self.alert_url, json=prazo, timeout=self.alert_timeout)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            logger.error(f"Erro ao avisar prazo {prazo['id']} ({prazo['status']}): {str(e)}")
+
+    # ------------------------------------------------------------------
+    # Execução
+    # ------------------------------------------------------------------
+
+    def run(self):
+        """Executa até stop(): transições no horário e avisos assim que chegam"""
+        while not self._stop.is_set():
+            try:
+                self.load()
+                while not self._stop.is_set():
+                    transicoes = self.due(limite=self.batch_size)
+                    while transicoes:
+                        self.fire(transicoes)
+                        transicoes = self.due(limite=self.batch_size)
+                    self._wait()
+                    self.apply_notifications()
+            except psycopg2.Error as e:
+                logger.error(f"Agendador de prazos: erro no banco, reconectando em "
+                             f"{self.reconnect_delay}s: {str(e)}")
+                self._stop.wait(self.reconnect_delay)
+        self._close()
+        logger.info("Agendador de prazos encerrado")
+
+    def stop(self):
+        """Encerra run() (pode ser chamado de outra thread ou de um sinal)"""
+        self._stop.set()
+        os.write(self._wake_write, b'\0')
+
+    def _wait(self):
+        """Espera a próxima transição, um aviso do banco ou stop()"""
+        proxima = self.next_time()
+        espera = self.max_wait
+        if proxima is not None:
+            espera = min(espera, max(0.0, (proxima - datetime.now()).total_seconds()))
+        prontos, _, _ = select.select([self._conn, self._wake_read], [], [], espera)
+        if self._wake_read in prontos:
+            os.read(self._wake_read, 64)
+
+    def _close(self):
+        """Fecha a conexão de avisos"""
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except psycopg2.Error:
+                pass
+            self._conn = None
+
+    @staticmethod
+    def _as_date(value) -> Optional[date]:
+        """date, datetime ou 'AAAA-MM-DD' (avisos em JSON) como date"""
+        if value is None or value == '':
+            return None
+        if isinstance(value, datetime):
+            return value.date()
+        if isinstance(value, date):
+            return value
+        return date.fromisoformat(str(value)[:10])
+
+
+def create_scheduler() -> DeadlineScheduler:
+    """Agendador com as configurações SCHEDULER_*"""
+    settings = get_settings()
+    config = settings.scheduler
+    alert_url = config.alert_url
+    if alert_url and not alert_url.startswith(('http://', 'https://')):
+        alert_url = urljoin(settings.n8n.webhook_url.rstrip('/') + '/', alert_url.lstrip('/'))
+    return DeadlineScheduler(channel=config.channel, alert_url=alert_url, alert_timeout=config.alert_timeout,
+                             reminder_days=config.reminder_days, batch_size=config.batch_size,
+                             max_wait=config.max_wait, reconnect_delay=config.reconnect_delay)
+
+
+def main():
+    scheduler = create_scheduler()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: scheduler.stop())
+    logger.info(f"Agendador de prazos iniciado (canal {scheduler.channel}, alertas: {scheduler.alert_url or 'nenhum'})")
+    scheduler.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,23 +3,79 @@ JurisPilot - Processador de Documentos
 Extrai texto, metadados e identifica tipos de documentos jurídicos
 """
 
+import io
 import os
+import re
 import json
-from typing import Dict, Optional, List
+import shutil
+import tempfile
+import threading
+import zipfile
+import xml.etree.ElementTree as ET
+import numpy as np
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager, ExitStack
+from typing import Callable, Dict, Optional, List, Iterator, Tuple, Union, BinaryIO
 from pathlib import Path
 from datetime import datetime
-import PyPDF2
 from docx import Document
 from PIL import Image
 import pytesseract
-from pdf2image import convert_from_path
+from pdf2image import convert_from_path, pdfinfo_from_path
 from loguru import logger
-import dateparser
+from config import OCRSettings, PDFSettings
+from extraction_cache import ExtractionCache
+from ocr_engine import OCRPool
+from image_preprocessing import ImagePreprocessor
+from text_scanner import TextScanner, EntityMatch
+from date_engine import get_date_engine
+from keyword_automaton import KeywordAutomaton
+from docx_stream import DocxStreamReader
+from pdf_backends import A4_POINTS, PDFBackendSelector, PDFTextDocument
+
+
+# Origem do documento: caminho no disco, conteúdo em memória ou arquivo binário com seek
+Source = Union[str, os.PathLike, bytes, bytearray, memoryview, BinaryIO]
 
 
 class DocumentProcessor:
     """Processa documentos jurídicos extraindo texto, metadados e identificando tipos"""
     
+    # Versão do extrator (faz parte da chave do cache de extração)
+    EXTRACTOR_VERSION = "1.10.1"
+    
+    # Idioma usado pelo Tesseract
+    OCR_LANG = 'por'
+    
+    # Critérios para considerar a camada de texto de uma página aproveitável
+    MIN_TEXT_LAYER_CHARS = 16
+    MIN_TEXT_LAYER_RATIO = 0.8
+    TEXT_LAYER_PUNCTUATION = set('.,;:!?-–—/\\()[]{}"\'ºª°§$%&@#*+=<>_|')
+    CID_PATTERN = re.compile(r'\(cid:\d+\)|\ufffd')
+    
+    # Páginas de PDF tratadas por vez no mínimo (ver _page_window)
+    MIN_PAGE_WINDOW = 4
+    
+    # Informações de cada página registradas em metadados['paginas']
+    PAGE_METADATA_KEYS = ('pagina', 'origem', 'dpi', 'confianca', 'hash', 'reutilizada')
+    
+    # Resultado de uma página de PDF guardado no cache para reaproveitamento
+    PAGE_RESULT_KEYS = ('texto', 'origem', 'dpi', 'confianca')
+    
+    # Memória usada pelo OCR por página em relação ao bitmap (cópias internas do Tesseract)
+    OCR_MEMORY_FACTOR = 3
+    
+    # Extensões suportadas além de PDF
+    DOCX_EXTENSIONS = ['.doc', '.docx']
+    IMAGE_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.bmp', '.tif', '.tiff']
+    
+    # OCR em faixas de imagens grandes (OCR_TILE_MAX_PIXELS): proporção da faixa
+    # (altura/largura, como uma página A4), altura mínima e trecho final da faixa
+    # em que se procura a linha mais clara para o corte (evita cortar uma linha de texto)
+    TILE_ASPECT = 1.414
+    MIN_TILE_HEIGHT = 512
+    TILE_CUT_SEARCH = 0.15
+    
     # Tipos de documentos jurídicos conhecidos
     DOCUMENT_TYPES = {
         'cpf': ['cpf', 'cadastro', 'pessoa física'],
@@ -38,8 +94,57 @@ class DocumentProcessor:
         'comprovante': ['comprovante', 'recibo', 'comprovante de pagamento']
     }
     
-    def __init__(self, tesseract_path: Optional[str] = None):
-        """Inicializa o processador de documentos"""
+    # Siglas de DOCUMENT_TYPES que só contam como palavra inteira ("rg" não casa com
+    # "cargo"); as demais casam também em plurais e flexões ("contratos", "extratos")
+    DOCUMENT_TYPE_WHOLE_WORDS = ('rg', 'nf', 'nfe', 'cpf', 'cnpj')
+    
+    # Autômato das palavras-chave de DOCUMENT_TYPES
+    DOCUMENT_TYPE_AUTOMATON = KeywordAutomaton(DOCUMENT_TYPES, word_boundary=DOCUMENT_TYPE_WHOLE_WORDS)
+    
+    # Pontuação do tipo a partir da qual a evidência é considerada suficiente (confiança)
+    CLASSIFICATION_FULL_SCORE = 3.0
+    
+    # Limites padrão da classificação rápida (classify_quick)
+    QUICK_MAX_PAGES = 1
+    QUICK_MAX_CHARS = 8192
+    
+    def __init__(self, tesseract_path: Optional[str] = None,
+                 cache: Optional[ExtractionCache] = None,
+                 ocr_settings: Optional[OCRSettings] = None,
+                 pdf_settings: Optional[PDFSettings] = None,
+                 max_pages: Optional[int] = None):
+        """
+        Inicializa o processador de documentos
+        
+        Args:
+            tesseract_path: Caminho do executável do Tesseract (detectado se omitido)
+            cache: Cache de extração (opcional)
+            ocr_settings: Configurações de OCR (processos, DPI, memória)
+            pdf_settings: Backend da camada de texto de PDFs (padrão: PyPDF2)
+            max_pages: Páginas processadas no máximo por documento (None = todas)
+        """
+        self.cache = cache
+        self.max_pages = max_pages
+        self._background: Optional[ThreadPoolExecutor] = None
+        self._background_lock = threading.Lock()
+        self.scanner = TextScanner()
+        self.date_engine = get_date_engine()
+        self.ocr_settings = ocr_settings or OCRSettings(workers=1)
+        self.pdf_settings = pdf_settings or PDFSettings(backend=PDFBackendSelector.DEFAULT_BACKEND)
+        self.pdf_backends = PDFBackendSelector(self.pdf_settings.backend, self.pdf_settings.calibration_path)
+        self.preprocess_options = (
+            ImagePreprocessor.options_from_settings(self.ocr_settings)
+            if self.ocr_settings.preprocess else None
+        )
+        self.ocr_pool = OCRPool(
+            self.ocr_settings.workers,
+            lang=self.OCR_LANG,
+            engine=self.ocr_settings.engine,
+            max_jobs=self.ocr_settings.max_jobs_per_worker,
+            job_timeout=self.ocr_settings.job_timeout,
+            preprocess=self.preprocess_options
+        )
+        
         if tesseract_path:
             pytesseract.pytesseract.tesseract_cmd = tesseract_path
         else:
@@ -88,28 +193,42 @@ class DocumentProcessor:
         
         return None
     
-    def process_file(self, file_path: str) -> Dict:
+    def process_file(self, file_path: Source, use_cache: bool = True,
+                     file_name: Optional[str] = None, content_hash: Optional[str] = None,
+                     on_page: Optional[Callable[[int, Optional[int]], None]] = None) -> Dict:
         """
         Processa um arquivo e retorna informações extraídas
         
         Args:
-            file_path: Caminho do arquivo a processar
+            file_path: Caminho do arquivo a processar, ou o conteúdo já recebido
+                       (bytes ou arquivo binário com seek, ex: upload em memória)
+            use_cache: Consulta e alimenta o cache de extração (se configurado)
+            file_name: Nome do arquivo (obrigatório para conteúdo em memória)
+            content_hash: SHA-256 do conteúdo, se já calculado (evita reler o arquivo)
+            on_page: Chamado após cada página com (páginas processadas, total de
+                     páginas a processar ou None se desconhecido), para progresso
             
         Returns:
             Dict com texto, metadados e tipo de documento
         """
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"Arquivo não encontrado: {file_path}")
+        source, file_name = self._resolve_source(file_path, file_name)
+        file_ext = Path(file_name).suffix.lower()
+        file_path = str(source) if self._is_path(source) else None
         
-        file_ext = Path(file_path).suffix.lower()
-        file_name = Path(file_path).name
+        # Consulta o cache pelo conteúdo do arquivo
+        cache_key = None
+        if self.cache and use_cache:
+            cached, content_hash = self.lookup_cache(source, file_name, content_hash)
+            if cached is not None:
+                return cached
+            cache_key = self._cache_key(content_hash)
         
         logger.info(f"Processando arquivo: {file_name}")
         
         result = {
             'nome_arquivo': file_name,
             'caminho_arquivo': file_path,
-            'tamanho_arquivo': os.path.getsize(file_path),
+            'tamanho_arquivo': self._source_size(source),
             'mime_type': self._get_mime_type(file_ext),
             'tipo_documento': None,
             'texto_extraido': '',
@@ -119,13 +238,41 @@ class DocumentProcessor:
             'partes_envolvidas': []
         }
         
-        # Extrai texto baseado na extensão
-        if file_ext == '.pdf':
-            result.update(self._process_pdf(file_path))
-        elif file_ext in ['.doc', '.docx']:
-            result.update(self._process_docx(file_path))
-        elif file_ext in ['.jpg', '.jpeg', '.png', '.bmp', '.tiff']:
-            result.update(self._process_image(file_path))
+        # Extrai texto página a página
+        metadata = {}
+        extraction_error = None
+        if self._is_supported(file_ext):
+            try:
+                pages = []
+                for page in self.iter_pages(source, metadata, max_pages=self.max_pages, file_name=file_name,
+                                            reuse_pages=use_cache):
+                    if page.get('erro'):
+                        # Falhas de extração não são armazenadas no cache
+                        extraction_error = page['erro']
+                    pages.append(page)
+                    if on_page is not None:
+                        total = metadata.get('num_paginas')
+                        on_page(len(pages), min(total, self.max_pages) if total and self.max_pages else total)
+                
+                if self.max_pages and (metadata.get('num_paginas') or 0) > self.max_pages:
+                    logger.warning(
+                        f"{file_name}: {metadata['num_paginas']} páginas, processadas apenas as {self.max_pages} primeiras"
+                    )
+                    metadata['limite_paginas'] = self.max_pages
+                
+                metadata['paginas_ocr'] = [page['pagina'] for page in pages if page['origem'] == 'ocr']
+                metadata['paginas_reutilizadas'] = sum(1 for page in pages if page.get('reutilizada'))
+                if metadata['paginas_reutilizadas']:
+                    logger.info(f"{file_name}: {metadata['paginas_reutilizadas']} página(s) reaproveitada(s) de versões anteriores")
+                metadata['paginas'] = [
+                    {key: page[key] for key in self.PAGE_METADATA_KEYS if key in page}
+                    for page in pages
+                ]
+                result['texto_extraido'] = self._join_pages(pages, paginated='num_paginas' in metadata)
+            except Exception as e:
+                logger.error(f"Erro ao processar {file_name}: {e}")
+                result['texto_extraido'] = f"Erro ao processar documento: {str(e)}"
+                extraction_error = str(e)
         else:
             logger.warning(f"Tipo de arquivo não suportado: {file_ext}")
             result['texto_extraido'] = f"Tipo de arquivo {file_ext} não suportado para extração de texto"
@@ -133,102 +280,814 @@ class DocumentProcessor:
         # Identifica tipo de documento
         result['tipo_documento'] = self._identify_document_type(result['texto_extraido'])
         
-        # Extrai metadados adicionais
-        result['metadados'] = self._extract_metadata(result['texto_extraido'])
-        result['data_documento'] = self._extract_date(result['texto_extraido'])
-        result['valores_encontrados'] = self._extract_values(result['texto_extraido'])
+        # Extrai metadados adicionais com uma única varredura do texto
+        entities = self.scanner.scan(result['texto_extraido'])
+        result['metadados'] = {**metadata, **self._extract_metadata(result['texto_extraido'], entities)}
+        result['data_documento'] = self._extract_date(result['texto_extraido'], entities)
+        result['valores_encontrados'] = self._extract_values(entities)
         
         logger.info(f"Processamento concluído: {file_name} - Tipo: {result['tipo_documento']}")
         
+        if cache_key and not extraction_error:
+            self.cache.put(cache_key, content_hash, result)
+        
         return result
     
-    def _process_pdf(self, file_path: str) -> Dict:
-        """Processa arquivo PDF"""
-        text = ""
+    def lookup_cache(self, file_path: Source, file_name: Optional[str] = None,
+                     content_hash: Optional[str] = None) -> Tuple[Optional[Dict], Optional[str]]:
+        """
+        Resultado de process_file já armazenado no cache de extração
+        
+        Returns:
+            (resultado ou None, SHA-256 do conteúdo); (None, None) sem cache configurado
+        """
+        if not self.cache:
+            return None, None
+        
+        source, file_name = self._resolve_source(file_path, file_name)
+        content_hash = content_hash or self._hash_source(source)
+        cached = self.cache.get(self._cache_key(content_hash))
+        if cached is not None:
+            cached['nome_arquivo'] = file_name
+            cached['caminho_arquivo'] = str(source) if self._is_path(source) else None
+            logger.info(f"Resultado recuperado do cache: {file_name}")
+        return cached, content_hash
+    
+    def classify_quick(self, file_path: Source, max_pages: int = QUICK_MAX_PAGES,
+                       max_chars: int = QUICK_MAX_CHARS, use_cache: bool = True,
+                       file_name: Optional[str] = None, content_hash: Optional[str] = None) -> Dict:
+        """
+        Classificação rápida do tipo de documento a partir do início do arquivo
+        
+        Lê (ou aplica OCR) apenas nas primeiras páginas, até max_chars
+        caracteres, para rotear o documento sem esperar a extração completa.
+        Se o documento já foi processado, usa o texto completo do cache.
+        
+        Args:
+            file_path: Caminho do arquivo ou conteúdo em memória (ver process_file)
+            max_pages: Páginas lidas no máximo (PDF e DOCX)
+            max_chars: Caracteres de texto analisados no máximo
+            use_cache: Consulta o cache de extração (se configurado)
+            file_name: Nome do arquivo (obrigatório para conteúdo em memória)
+            content_hash: SHA-256 do conteúdo, se já calculado
+            
+        Returns:
+            Dict com tipo_documento, confianca (0-1), paginas_analisadas,
+            caracteres_analisados e origem ('parcial' ou 'cache')
+        """
+        source, file_name = self._resolve_source(file_path, file_name)
+        file_ext = Path(file_name).suffix.lower()
+        result = {
+            'nome_arquivo': file_name,
+            'tipo_documento': 'documento_generico',
+            'confianca': 0.0,
+            'paginas_analisadas': 0,
+            'num_paginas': None,
+            'caracteres_analisados': 0,
+            'origem': 'parcial'
+        }
+        
+        if self.cache and use_cache:
+            cached = self.cache.get(self._cache_key(content_hash or self._hash_source(source)))
+            if cached is not None:
+                text = cached['texto_extraido']
+                result['tipo_documento'], result['confianca'] = self._classify_text(text)
+                result['paginas_analisadas'] = len(cached['metadados'].get('paginas', []))
+                result['num_paginas'] = cached['metadados'].get('num_paginas')
+                result['caracteres_analisados'] = len(text)
+                result['origem'] = 'cache'
+                return result
+        
+        if not self._is_supported(file_ext):
+            logger.warning(f"Tipo de arquivo não suportado: {file_ext}")
+            return result
+        
+        # Lê só o início do documento; interromper o iterador evita o restante da extração/OCR
         metadata = {}
+        texts = []
+        chars = 0
+        for page in self.iter_pages(source, metadata, max_pages=max_pages, file_name=file_name,
+                                    reuse_pages=use_cache):
+            texts.append(page['texto'])
+            chars += len(page['texto'])
+            result['paginas_analisadas'] += 1
+            if result['paginas_analisadas'] >= max_pages or chars >= max_chars:
+                break
         
-        try:
-            with open(file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                metadata['num_paginas'] = len(pdf_reader.pages)
+        text = "\n".join(texts)[:max_chars]
+        result['tipo_documento'], result['confianca'] = self._classify_text(text)
+        result['num_paginas'] = metadata.get('num_paginas')
+        result['caracteres_analisados'] = len(text)
+        
+        logger.info(
+            f"Classificação rápida: {result['nome_arquivo']} - Tipo: {result['tipo_documento']} "
+            f"(confiança {result['confianca']}, {result['paginas_analisadas']} página(s))"
+        )
+        return result
+    
+    def schedule_processing(self, file_path: str) -> Future:
+        """
+        Agenda o processamento completo em segundo plano (um documento por vez)
+        
+        O resultado fica disponível no cache de extração para a próxima
+        chamada de process_file com o mesmo arquivo.
+        
+        Returns:
+            Future com o resultado de process_file
+        """
+        with self._background_lock:
+            if self._background is None:
+                self._background = ThreadPoolExecutor(max_workers=1, thread_name_prefix='processamento')
+            return self._background.submit(self.process_file, file_path)
+    
+    def close(self):
+        """Aguarda os processamentos agendados e libera os processos de OCR"""
+        with self._background_lock:
+            if self._background is not None:
+                self._background.shutdown(wait=True)
+                self._background = None
+        self.ocr_pool.shutdown()
+    
+    def _cache_key(self, content_hash: str) -> str:
+        """Chave do cache de extração para o conteúdo com as configurações atuais"""
+        return ExtractionCache.make_key(content_hash, self.EXTRACTOR_VERSION, self._ocr_settings())
+    
+    def _ocr_settings(self) -> Dict:
+        """Configurações de OCR e de backend de PDF que influenciam o resultado (parte da chave do cache)"""
+        return {
+            'lang': self.OCR_LANG,
+            'engine': self.ocr_settings.engine,
+            'dpi': self.ocr_settings.dpi,
+            'adaptive_dpi': self.ocr_settings.adaptive_dpi,
+            'dpi_high': self.ocr_settings.dpi_high,
+            'confidence_threshold': self.ocr_settings.confidence_threshold,
+            'grayscale': self.ocr_settings.grayscale,
+            'preprocess': self.preprocess_options,
+            'pdf_backend': self.pdf_backends.signature(),
+            'max_pages': self.max_pages
+        }
+    
+    def iter_pages(self, file_path: Source, metadata: Optional[Dict] = None,
+                   max_pages: Optional[int] = None, file_name: Optional[str] = None,
+                   reuse_pages: bool = False) -> Iterator[Dict]:
+        """
+        Itera sobre as páginas de um documento, uma de cada vez
+        
+        Cada página é entregue assim que extraída, sem acumular o texto do
+        documento inteiro; o consumidor pode interromper a iteração a qualquer
+        momento (ex: quando já encontrou o que procurava).
+        
+        Args:
+            file_path: Caminho do arquivo ou conteúdo em memória (ver process_file)
+            metadata: Dict opcional preenchido com metadados do documento
+                      (num_paginas, pdf_metadata, docx_metadata, ...)
+            max_pages: Lê apenas as primeiras páginas do PDF/DOCX/TIFF (None = todas)
+            file_name: Nome do arquivo (obrigatório para conteúdo em memória)
+            reuse_pages: Reaproveita do cache de extração as páginas de PDF já
+                         processadas (mesmo hash de conteúdo) e guarda as novas
+            
+        Yields:
+            Dict com 'pagina' (1..N), 'texto' e 'origem' ('texto' ou 'ocr');
+            'erro' é incluído quando o OCR da página falha; páginas de PDF
+            trazem 'hash' e, se vieram do cache, 'reutilizada'
+        """
+        if metadata is None:
+            metadata = {}
+        
+        source, file_name = self._resolve_source(file_path, file_name)
+        file_ext = Path(file_name).suffix.lower()
+        
+        if file_ext == '.pdf':
+            yield from self._iter_pdf_pages(source, metadata, max_pages, reuse_pages)
+        elif file_ext in self.DOCX_EXTENSIONS:
+            yield from self._iter_docx_pages(source, metadata, max_pages)
+        elif file_ext in self.IMAGE_EXTENSIONS:
+            yield from self._iter_image_pages(source, metadata, max_pages)
+        else:
+            raise ValueError(f"Tipo de arquivo não suportado: {file_ext}")
+    
+    @staticmethod
+    def _is_path(source: Source) -> bool:
+        """A origem é um caminho no disco (e não conteúdo em memória)"""
+        return isinstance(source, (str, os.PathLike))
+    
+    @classmethod
+    def _resolve_source(cls, source: Source, file_name: Optional[str]) -> Tuple[Source, str]:
+        """
+        Valida a origem do documento e determina o nome do arquivo
+        
+        Conteúdo em bytes é envolvido em um BytesIO (sem cópia para bytes);
+        arquivos binários são usados como estão, reposicionados a cada leitura.
+        """
+        if cls._is_path(source):
+            if not os.path.exists(source):
+                raise FileNotFoundError(f"Arquivo não encontrado: {source}")
+            return source, file_name or Path(source).name
+        
+        if not file_name:
+            raise ValueError("file_name é obrigatório para conteúdo em memória")
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            source = io.BytesIO(source)
+        return source, file_name
+    
+    @contextmanager
+    def _open_source(self, source: Source) -> Iterator[BinaryIO]:
+        """Fluxo binário no início do conteúdo (arquivos abertos aqui são fechados ao final)"""
+        if self._is_path(source):
+            with open(source, 'rb') as stream:
+                yield stream
+        else:
+            source.seek(0)
+            yield source
+    
+    @contextmanager
+    def _source_path(self, source: Source) -> Iterator[str]:
+        """
+        Caminho no disco para ferramentas externas (poppler); conteúdo em
+        memória é gravado uma única vez em um arquivo temporário
+        """
+        if self._is_path(source):
+            yield str(source)
+            return
+        with tempfile.TemporaryDirectory(prefix='jurispilot_') as folder:
+            temp_path = os.path.join(folder, 'documento.pdf')
+            with open(temp_path, 'wb') as temp_file:
+                source.seek(0)
+                shutil.copyfileobj(source, temp_file)
+            yield temp_path
+    
+    def _source_size(self, source: Source) -> int:
+        """Tamanho do conteúdo em bytes"""
+        if self._is_path(source):
+            return os.path.getsize(source)
+        return source.seek(0, io.SEEK_END)
+    
+    def _hash_source(self, source: Source) -> str:
+        """SHA-256 do conteúdo (chave do cache de extração)"""
+        if self._is_path(source):
+            return ExtractionCache.hash_file(source)
+        with self._open_source(source) as stream:
+            return ExtractionCache.hash_stream(stream)
+    
+    def _is_supported(self, file_ext: str) -> bool:
+        """Verifica se há extrator para a extensão"""
+        return file_ext == '.pdf' or file_ext in self.DOCX_EXTENSIONS or file_ext in self.IMAGE_EXTENSIONS
+    
+    @staticmethod
+    def _join_pages(pages: List[Dict], paginated: bool) -> str:
+        """Junta o texto das páginas (com marcadores de página para documentos paginados)"""
+        if paginated:
+            text = "".join(f"\n--- Página {page['pagina']} ---\n{page['texto']}" for page in pages)
+        else:
+            text = "\n".join(page['texto'] for page in pages)
+        return text.strip()
+    
+    def _iter_pdf_pages(self, source: Source, metadata: Dict,
+                        max_pages: Optional[int] = None, reuse_pages: bool = False) -> Iterator[Dict]:
+        """
+        Itera sobre as páginas de um PDF
+        
+        Usa a camada de texto de cada página e aplica OCR apenas nas páginas
+        em que ela está vazia ou ilegível (ex: anexos digitalizados). As páginas
+        são tratadas em janelas para que o OCR rode em paralelo sem manter o
+        documento inteiro rasterizado em memória. Com max_pages, apenas as
+        primeiras páginas são lidas (num_paginas continua sendo o total).
+        Com reuse_pages, as páginas cujo hash de conteúdo já está no cache não
+        são extraídas de novo.
+        """
+        window = self._page_window()
+        if max_pages:
+            window = min(window, max_pages)
+        
+        with self._open_source(source) as file, ExitStack() as stack:
+            # Caminho para o poppler, criado só se alguma página precisar de OCR
+            paths = []
+            
+            def pdf_path() -> str:
+                if not paths:
+                    paths.append(stack.enter_context(self._source_path(source)))
+                return paths[0]
+            
+            document = self._open_pdf_text(source, file, pdf_path, metadata)
+            
+            if document is None:
+                # Tenta OCR de todas as páginas se a leitura do PDF falhar
+                num_pages = pdfinfo_from_path(pdf_path())['Pages']
+                metadata['num_paginas'] = num_pages
+                read_pages = min(num_pages, max_pages) if max_pages else num_pages
+                for first_page in range(1, read_pages + 1, window):
+                    last_page = min(first_page + window - 1, read_pages)
+                    yield from self._ocr_pdf_pages(pdf_path(), list(range(first_page, last_page + 1)))
+                return
+            
+            stack.enter_context(document)
+            num_pages = document.num_pages
+            metadata['num_paginas'] = num_pages
+            
+            # Tenta extrair metadados do PDF
+            try:
+                pdf_metadata = document.metadata()
+                if any(pdf_metadata.values()):
+                    metadata['pdf_metadata'] = pdf_metadata
+            except Exception as e:
+                logger.warning(f"Erro ao ler metadados do PDF: {e}")
+            
+            try:
+                hasher = document.page_hasher(file)
+            except Exception as e:
+                logger.warning(f"Hashes das páginas indisponíveis: {e}")
+                hasher = None
+            page_settings = self._page_settings(metadata['pdf_backend'])
+            reuse_pages = reuse_pages and self.cache is not None and hasher is not None
+            
+            read_pages = min(num_pages, max_pages) if max_pages else num_pages
+            for first_page in range(1, read_pages + 1, window):
+                last_page = min(first_page + window - 1, read_pages)
+                
+                # Hash de conteúdo de cada página e as já processadas em outra versão do documento
+                hashes = {}
+                if hasher is not None:
+                    hashes = {
+                        page_num: hasher.page_hash(page_num - 1)
+                        for page_num in range(first_page, last_page + 1)
+                    }
+                stored = self._stored_pages(hashes, page_settings) if reuse_pages else {}
                 
-                # Extrai texto de todas as páginas
-                for page_num, page in enumerate(pdf_reader.pages, 1):
-                    page_text = page.extract_text()
-                    text += f"\n--- Página {page_num} ---\n{page_text}"
+                # Extrai a camada de texto das páginas novas da janela
+                page_texts = {}
+                for page_num in range(first_page, last_page + 1):
+                    if page_num in stored:
+                        continue
+                    try:
+                        page_texts[page_num] = document.page_text(page_num - 1)
+                    except Exception as page_error:
+                        logger.warning(f"Erro ao extrair texto da página {page_num}: {page_error}")
+                        page_texts[page_num] = ''
                 
-                # Tenta extrair metadados do PDF
-                if pdf_reader.metadata:
-                    metadata['pdf_metadata'] = {
-                        'title': pdf_reader.metadata.get('/Title', ''),
-                        'author': pdf_reader.metadata.get('/Author', ''),
-                        'subject': pdf_reader.metadata.get('/Subject', ''),
-                        'creator': pdf_reader.metadata.get('/Creator', '')
+                # OCR apenas das páginas sem camada de texto aproveitável
+                ocr_pages = [
+                    page_num for page_num, page_text in page_texts.items()
+                    if not self._has_usable_text_layer(page_text)
+                ]
+                ocr_results = {}
+                if ocr_pages:
+                    logger.info(f"OCR de {len(ocr_pages)} página(s) entre {first_page} e {last_page}")
+                    page_size = max(
+                        (document.page_size(page_num - 1) for page_num in ocr_pages),
+                        key=lambda size: size[0] * size[1]
+                    )
+                    ocr_results = {
+                        page['pagina']: page
+                        for page in self._ocr_pdf_pages(pdf_path(), ocr_pages, page_size)
                     }
-        except Exception as e:
-            logger.error(f"Erro ao processar PDF: {e}")
-            # Tenta OCR se a extração de texto falhar
+                
+                pages = []
+                for page_num in range(first_page, last_page + 1):
+                    if page_num in stored:
+                        page = stored[page_num]
+                    elif page_num in ocr_results:
+                        page = ocr_results[page_num]
+                    else:
+                        page = {'pagina': page_num, 'texto': page_texts[page_num], 'origem': 'texto'}
+                    if hashes.get(page_num):
+                        page['hash'] = hashes[page_num]
+                    pages.append(page)
+                
+                if reuse_pages:
+                    self._store_pages(pages, page_settings)
+                yield from pages
+    
+    def _page_settings(self, pdf_backend: str) -> Dict:
+        """Configurações que influenciam o resultado de uma página (parte da chave da página no cache)"""
+        settings = self._ocr_settings()
+        del settings['max_pages']
+        settings['pdf_backend'] = pdf_backend
+        return settings
+    
+    def _stored_pages(self, hashes: Dict[int, Optional[str]], page_settings: Dict) -> Dict[int, Dict]:
+        """Páginas (por número) cujo resultado está no cache pelo hash de conteúdo"""
+        keys = {
+            page_num: ExtractionCache.make_key(page_hash, self.EXTRACTOR_VERSION, page_settings)
+            for page_num, page_hash in hashes.items() if page_hash
+        }
+        found = self.cache.get_pages(keys.values())
+        return {
+            page_num: {'pagina': page_num, **found[key], 'reutilizada': True}
+            for page_num, key in keys.items() if key in found
+        }
+    
+    def _store_pages(self, pages: List[Dict], page_settings: Dict):
+        """Guarda no cache as páginas extraídas agora (sem falhas de OCR) pelo hash de conteúdo"""
+        self.cache.put_pages({
+            ExtractionCache.make_key(page['hash'], self.EXTRACTOR_VERSION, page_settings):
+                {key: page[key] for key in self.PAGE_RESULT_KEYS if key in page}
+            for page in pages
+            if page.get('hash') and not page.get('reutilizada') and not page.get('erro')
+        })
+    
+    def _open_pdf_text(self, source: Source, stream: BinaryIO, pdf_path: Callable[[], str],
+                       metadata: Dict) -> Optional[PDFTextDocument]:
+        """
+        Abre a camada de texto do PDF com o backend escolhido para o documento
+        
+        Se o backend escolhido falhar, tenta o PyPDF2; retorna None quando
+        nenhum consegue ler o arquivo (o documento segue inteiro para OCR).
+        """
+        name = self.pdf_backends.name_for(self._source_size(source))
+        names = [name] if name == PDFBackendSelector.DEFAULT_BACKEND else [name, PDFBackendSelector.DEFAULT_BACKEND]
+        for name in names:
+            backend = self.pdf_backends.get(name)
+            try:
+                if backend.needs_path:
+                    document = backend.open(pdf_path())
+                else:
+                    stream.seek(0)
+                    document = backend.open(stream)
+            except Exception as e:
+                logger.error(f"Erro ao processar PDF ({name}): {e}")
+                continue
+            metadata['pdf_backend'] = name
+            return document
+        return None
+    
+    def _ocr_pdf_pages(self, file_path: str, pages: List[int],
+                       page_size: tuple = A4_POINTS) -> List[Dict]:
+        """
+        Rasteriza e executa OCR de páginas de um PDF, mantendo a ordem
+        
+        O OCR roda primeiro no DPI base (OCR_DPI); com OCR_ADAPTIVE_DPI, apenas
+        as páginas cuja confiança média fica abaixo de OCR_CONFIDENCE_THRESHOLD
+        são rasterizadas de novo em OCR_DPI_HIGH, mantendo o melhor resultado.
+        """
+        results = self._ocr_pdf_pages_at(file_path, pages, page_size, self.ocr_settings.dpi)
+        
+        if not self.ocr_settings.adaptive_dpi or self.ocr_settings.dpi_high <= self.ocr_settings.dpi:
+            return results
+        
+        low_confidence = [
+            page['pagina'] for page in results
+            if page['confianca'] is not None and page['confianca'] < self.ocr_settings.confidence_threshold
+        ]
+        if not low_confidence:
+            return results
+        
+        logger.info(f"Refazendo OCR de {len(low_confidence)} página(s) em {self.ocr_settings.dpi_high} DPI")
+        retried = {
+            page['pagina']: page
+            for page in self._ocr_pdf_pages_at(file_path, low_confidence, page_size, self.ocr_settings.dpi_high)
+            if not page.get('erro')
+        }
+        
+        return [
+            retried[page['pagina']]
+            if page['pagina'] in retried and (retried[page['pagina']]['confianca'] or 0) >= page['confianca']
+            else page
+            for page in results
+        ]
+    
+    def _ocr_pdf_pages_at(self, file_path: str, pages: List[int], page_size: tuple,
+                          dpi: int) -> List[Dict]:
+        """
+        Rasteriza páginas de um PDF em um DPI e executa o OCR
+        
+        As páginas são rasterizadas em blocos (intervalos first_page/last_page
+        do pdf2image) direto para arquivos temporários; o tamanho do bloco é
+        limitado pelo orçamento de memória de OCR (OCR_MEMORY_BUDGET_MB), de modo
+        que o pico de memória não depende do número de páginas do documento.
+        """
+        chunk_size = self._ocr_chunk_size(page_size, dpi)
+        results = []
+        
+        for start in range(0, len(pages), chunk_size):
+            chunk = pages[start:start + chunk_size]
             try:
-                images = convert_from_path(file_path)
-                text = ""
-                for img in images:
-                    text += pytesseract.image_to_string(img, lang='por') + "\n"
+                with tempfile.TemporaryDirectory(prefix='jurispilot_ocr_') as output_folder:
+                    image_paths = []
+                    for first_page, last_page in self._page_ranges(chunk):
+                        image_paths.extend(
+                            self._rasterize_pdf(file_path, first_page, last_page, output_folder, dpi)
+                        )
+                    ocr_results = self.ocr_pool.map(image_paths)
             except Exception as ocr_error:
                 logger.error(f"Erro no OCR: {ocr_error}")
-                text = f"Erro ao processar PDF: {str(e)}"
+                results.extend(
+                    {'pagina': page_num, 'texto': '', 'origem': 'ocr', 'dpi': dpi,
+                     'confianca': None, 'erro': str(ocr_error)}
+                    for page_num in chunk
+                )
+                continue
+            
+            results.extend(
+                {'pagina': page_num, 'texto': ocr['texto'], 'origem': 'ocr', 'dpi': dpi,
+                 'confianca': ocr['confianca']}
+                for page_num, ocr in zip(chunk, ocr_results)
+            )
         
-        return {'texto_extraido': text.strip(), 'metadados': metadata}
+        return results
     
-    def _process_docx(self, file_path: str) -> Dict:
-        """Processa arquivo Word"""
-        text = ""
-        metadata = {}
+    def _rasterize_pdf(self, file_path: str, first_page: int, last_page: int,
+                       output_folder: str, dpi: int) -> List[str]:
+        """Rasteriza um intervalo de páginas para arquivos em output_folder e retorna os caminhos"""
+        return convert_from_path(
+            file_path,
+            dpi=dpi,
+            grayscale=self.ocr_settings.grayscale,
+            first_page=first_page,
+            last_page=last_page,
+            output_folder=output_folder,
+            paths_only=True
+        )
+    
+    def _ocr_chunk_size(self, page_size: tuple, dpi: int) -> int:
+        """Páginas rasterizadas por bloco sem ultrapassar o orçamento de memória de OCR"""
+        budget = self.ocr_settings.memory_budget_mb * 1024 * 1024
+        page_bytes = self._estimate_page_bytes(page_size, dpi) * self.OCR_MEMORY_FACTOR
+        return max(1, min(self.ocr_pool.workers, budget // page_bytes))
+    
+    def _image_chunk_size(self, pixels: int) -> int:
+        """Imagens (quadros ou faixas) em OCR simultâneo sem ultrapassar o orçamento de memória"""
+        budget = self.ocr_settings.memory_budget_mb * 1024 * 1024
+        channels = 1 if self.ocr_settings.grayscale else 3
+        return max(1, min(self.ocr_pool.workers, budget // (pixels * channels * self.OCR_MEMORY_FACTOR)))
+    
+    def _estimate_page_bytes(self, page_size: tuple, dpi: int) -> int:
+        """Estima o tamanho em memória de uma página rasterizada"""
+        width_pt, height_pt = page_size
+        channels = 1 if self.ocr_settings.grayscale else 3
+        return int(width_pt / 72 * dpi) * int(height_pt / 72 * dpi) * channels
+    
+    def _page_window(self) -> int:
+        """Quantidade de páginas tratadas por vez (suficiente para ocupar o pool de OCR)"""
+        return max(self.MIN_PAGE_WINDOW, 2 * self.ocr_pool.workers)
+    
+    @classmethod
+    def _has_usable_text_layer(cls, page_text: str) -> bool:
+        """Verifica se a camada de texto da página é aproveitável (não vazia nem ilegível)"""
+        chars = [c for c in page_text if not c.isspace()]
+        if len(chars) < cls.MIN_TEXT_LAYER_CHARS:
+            return False
         
-        try:
-            doc = Document(file_path)
-            
-            # Extrai texto de todos os parágrafos
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
-            
-            # Extrai texto de tabelas
-            for table in doc.tables:
-                for row in table.rows:
-                    for cell in row.cells:
-                        text += cell.text + " "
-                    text += "\n"
-            
-            # Metadados do documento
-            if doc.core_properties:
-                metadata['docx_metadata'] = {
-                    'title': doc.core_properties.title or '',
-                    'author': doc.core_properties.author or '',
-                    'created': str(doc.core_properties.created) if doc.core_properties.created else '',
-                    'modified': str(doc.core_properties.modified) if doc.core_properties.modified else ''
-                }
-        except Exception as e:
-            logger.error(f"Erro ao processar DOCX: {e}")
-            text = f"Erro ao processar documento Word: {str(e)}"
-        
-        return {'texto_extraido': text.strip(), 'metadados': metadata}
-    
-    def _process_image(self, file_path: str) -> Dict:
-        """Processa imagem usando OCR"""
-        text = ""
-        metadata = {}
+        # Glifos sem mapeamento Unicode aparecem como (cid:NN) ou caracteres de substituição
+        if cls.CID_PATTERN.search(page_text):
+            return False
         
+        valid = sum(1 for c in chars if c.isalnum() or c in cls.TEXT_LAYER_PUNCTUATION)
+        return valid / len(chars) >= cls.MIN_TEXT_LAYER_RATIO
+    
+    @staticmethod
+    def _page_ranges(pages: List[int]) -> List[tuple]:
+        """Agrupa números de página em intervalos contínuos [(primeira, última), ...]"""
+        ranges = []
+        for page_num in pages:
+            if ranges and ranges[-1][1] == page_num - 1:
+                ranges[-1] = (ranges[-1][0], page_num)
+            else:
+                ranges.append((page_num, page_num))
+        return ranges
+    
+    def _iter_docx_pages(self, source: Source, metadata: Dict,
+                         max_pages: Optional[int] = None) -> Iterator[Dict]:
+        """
+        Extrai o texto de um arquivo Word em fluxo
+        
+        Parágrafos e linhas de tabela são lidos na ordem do documento e
+        agrupados pelas quebras de página gravadas no arquivo. Arquivos que
+        não são DOCX válidos (ex: .doc) seguem pelo python-docx.
+        """
+        reader = DocxStreamReader(source)
+        lines: List[str] = []
+        page_num = 1
+        yielded = False
         try:
-            image = Image.open(file_path)
+            metadata['docx_metadata'] = reader.core_properties()
+            for block in reader.iter_blocks():
+                if block.pagina != page_num:
+                    yield {'pagina': page_num, 'texto': '\n'.join(lines), 'origem': 'texto'}
+                    yielded = True
+                    if max_pages and page_num >= max_pages:
+                        return
+                    lines = []
+                    page_num = block.pagina
+                lines.append(block.texto)
+        except (zipfile.BadZipFile, KeyError, ET.ParseError) as e:
+            if yielded:
+                raise
+            logger.debug(f"Leitura em fluxo do DOCX indisponível: {e}")
+            yield from self._iter_docx_pages_legacy(source, metadata)
+            return
+        
+        yield {'pagina': page_num, 'texto': '\n'.join(lines), 'origem': 'texto'}
+    
+    def _iter_docx_pages_legacy(self, source: Source, metadata: Dict) -> Iterator[Dict]:
+        """Extrai o texto com o python-docx (entregue como página única)"""
+        with self._open_source(source) as stream:
+            doc = Document(stream)
+        
+        lines = [paragraph.text for paragraph in doc.paragraphs]
+        for table in doc.tables:
+            for row in table.rows:
+                lines.append(" ".join(cell.text for cell in row.cells))
+        
+        # Metadados do documento
+        if doc.core_properties:
+            metadata['docx_metadata'] = {
+                'title': doc.core_properties.title or '',
+                'author': doc.core_properties.author or '',
+                'created': str(doc.core_properties.created) if doc.core_properties.created else '',
+                'modified': str(doc.core_properties.modified) if doc.core_properties.modified else ''
+            }
+        
+        yield {'pagina': 1, 'texto': "\n".join(lines), 'origem': 'texto'}
+    
+    def _iter_image_pages(self, source: Source, metadata: Dict,
+                          max_pages: Optional[int] = None) -> Iterator[Dict]:
+        """
+        Extrai o texto de uma imagem usando OCR
+        
+        TIFFs com vários quadros (digitalizações de várias páginas) são
+        entregues página a página, como um PDF; imagens acima de
+        OCR_TILE_MAX_PIXELS passam pelo OCR em faixas. Nos dois casos cada
+        quadro é decodificado e gravado em arquivo temporário um de cada vez.
+        Demais imagens são entregues como página única. Quadros que precisariam
+        ser decodificados inteiros acima de OCR_MAX_IMAGE_PIXELS são recusados.
+        """
+        with self._open_source(source) as stream, Image.open(stream) as image:
             metadata['image_size'] = image.size
             metadata['image_format'] = image.format
+            frames = getattr(image, 'n_frames', 1)
+            if frames > 1 or self._needs_tiling(image.size):
+                if frames > 1:
+                    metadata['num_paginas'] = frames
+                read_frames = min(frames, max_pages) if max_pages else frames
+                yield from self._ocr_image_frames(image, read_frames)
+                return
             
-            # OCR
-            text = pytesseract.image_to_string(image, lang='por')
-        except Exception as e:
-            logger.error(f"Erro ao processar imagem: {e}")
-            text = f"Erro ao processar imagem: {str(e)}"
+            self._check_image_pixels(image)
+            if self._is_path(source):
+                # Os processos de OCR abrem o arquivo pelo caminho
+                job = str(source)
+            else:
+                # Conteúdo em memória: a imagem decodificada é enviada ao processo de OCR
+                image.load()
+                job = image
+        
+        # OCR no pool (o motor já está carregado nos processos de OCR)
+        ocr = self.ocr_pool.map([job])[0]
+        
+        yield {'pagina': 1, 'texto': ocr['texto'], 'origem': 'ocr', 'confianca': ocr['confianca']}
+    
+    def _ocr_image_frames(self, image: Image.Image, num_frames: int) -> Iterator[Dict]:
+        """
+        OCR dos primeiros num_frames quadros de uma imagem, em ordem
+        
+        Os quadros são gravados em blocos de arquivos temporários (faixas, se
+        grandes) e enviados juntos ao pool de OCR; o tamanho do bloco segue o
+        orçamento de memória de OCR (OCR_MEMORY_BUDGET_MB).
+        """
+        frame_num = 0
+        while frame_num < num_frames:
+            with tempfile.TemporaryDirectory(prefix='jurispilot_ocr_') as output_folder:
+                # (número da página, arquivo) de cada quadro ou faixa do bloco
+                jobs = []
+                first_frame = frame_num
+                chunk_size = None
+                while frame_num < num_frames and (chunk_size is None or len(jobs) < chunk_size):
+                    image.seek(frame_num)
+                    frame_num += 1
+                    for tile_num, tile in enumerate(self._image_tiles(image)):
+                        if chunk_size is None:
+                            chunk_size = self._image_chunk_size(tile.width * tile.height)
+                        if tile.mode not in ('1', 'L', 'RGB'):
+                            tile = tile.convert('L' if self.ocr_settings.grayscale else 'RGB')
+                        tile_path = os.path.join(output_folder, f'{frame_num:05d}_{tile_num:03d}.png')
+                        tile.save(tile_path)
+                        jobs.append((frame_num, tile_path))
+                
+                try:
+                    ocr_results = self.ocr_pool.map([tile_path for _, tile_path in jobs])
+                except Exception as ocr_error:
+                    logger.error(f"Erro no OCR: {ocr_error}")
+                    for page_num in range(first_frame + 1, frame_num + 1):
+                        yield {'pagina': page_num, 'texto': '', 'origem': 'ocr',
+                               'confianca': None, 'erro': str(ocr_error)}
+                    continue
+            
+            # Junta as faixas de cada página
+            for page_num in range(first_frame + 1, frame_num + 1):
+                tiles = [ocr for (job_page, _), ocr in zip(jobs, ocr_results) if job_page == page_num]
+                yield {'pagina': page_num, 'origem': 'ocr', **self._merge_tiles(tiles)}
+    
+    def _needs_tiling(self, size: Tuple[int, int]) -> bool:
+        """A imagem é grande demais para um único OCR (OCR_TILE_MAX_PIXELS)"""
+        max_pixels = self.ocr_settings.tile_max_pixels
+        return bool(max_pixels) and size[0] * size[1] > max_pixels
+    
+    def _check_image_pixels(self, image: Image.Image):
+        """Recusa, antes de decodificar, quadros maiores que OCR_MAX_IMAGE_PIXELS"""
+        max_pixels = self.ocr_settings.max_image_pixels
+        if max_pixels and image.width * image.height > max_pixels:
+            raise ValueError(
+                f"Imagem grande demais para OCR: {image.width}x{image.height} pixels "
+                f"(OCR_MAX_IMAGE_PIXELS={max_pixels}); reduza a resolução ou salve como TIFF sem compressão"
+            )
+    
+    def _image_tiles(self, image: Image.Image) -> Iterator[Image.Image]:
+        """
+        O quadro atual inteiro ou, se grande demais, em faixas horizontais de cima para baixo
+        
+        Faixas de imagens sem compressão (TIFF, BMP, PPM) são lidas do arquivo
+        uma a uma; nos demais formatos (JPEG, PNG, TIFF comprimido) o Pillow só
+        decodifica o quadro inteiro, que por isso fica limitado a OCR_MAX_IMAGE_PIXELS.
+        """
+        if not self._needs_tiling(image.size):
+            self._check_image_pixels(image)
+            yield image
+            return
+        
+        strips = self._raw_strips(image)
+        if strips is None:
+            self._check_image_pixels(image)
         
-        return {'texto_extraido': text.strip(), 'metadados': metadata}
+        width, height = image.size
+        tile_height = max(
+            self.MIN_TILE_HEIGHT,
+            min(int(width * self.TILE_ASPECT), self.ocr_settings.tile_max_pixels // width)
+        )
+        top = 0
+        while top < height:
+            bottom = top + tile_height
+            if height - bottom < self.MIN_TILE_HEIGHT:
+                # O restante é pequeno demais para uma faixa própria
+                bottom = height
+            else:
+                bottom = self._tile_cut(image, strips, top, bottom)
+            yield self._image_band(image, strips, top, bottom)
+            top = bottom
+    
+    @staticmethod
+    def _raw_strips(image: Image.Image) -> Optional[List[Tuple[int, int, int, str, int, int]]]:
+        """
+        Blocos de linhas sem compressão do quadro atual no arquivo
+        
+        Returns:
+            (primeira linha, linha final, posição no arquivo, rawmode, bytes por
+            linha, orientação) de cada bloco, ou None se o quadro só pode ser
+            decodificado inteiro (formato comprimido, ladrilhos, paleta ou já carregado)
+        """
+        tiles = getattr(image, 'tile', None)
+        if not tiles or image.mode in ('P', 'PA') or getattr(image, 'fp', None) is None:
+            return None
+        
+        strips = []
+        for decoder, (x0, y0, x1, y1), offset, args in tiles:
+            if decoder != 'raw' or (x0, x1) != (0, image.width):
+                return None
+            args = (args,) if isinstance(args, str) else tuple(args)
+            rawmode = args[0]
+            stride = args[1] if len(args) > 1 else 0
+            orientation = args[2] if len(args) > 2 else 1
+            if not stride:
+                stride = len(Image.new(image.mode, (image.width, 1)).tobytes('raw', rawmode))
+            strips.append((y0, y1, offset, rawmode, stride, orientation or 1))
+        return strips
+    
+    @staticmethod
+    def _image_band(image: Image.Image, strips: Optional[List], top: int, bottom: int) -> Image.Image:
+        """Linhas [top, bottom) do quadro atual, lidas do arquivo quando não comprimidas"""
+        if strips is None:
+            return image.crop((0, top, image.width, bottom))
+        
+        band = Image.new(image.mode, (image.width, bottom - top))
+        for y0, y1, offset, rawmode, stride, orientation in strips:
+            first, last = max(top, y0), min(bottom, y1)
+            if first >= last:
+                continue
+            # Com orientação negativa (BMP) as linhas estão gravadas de baixo para cima
+            row = first - y0 if orientation > 0 else y1 - last
+            image.fp.seek(offset + row * stride)
+            data = image.fp.read((last - first) * stride)
+            block = Image.frombytes(image.mode, (image.width, last - first), data,
+                                    'raw', rawmode, stride, orientation)
+            band.paste(block, (0, first - top))
+        return band
+    
+    def _tile_cut(self, image: Image.Image, strips: Optional[List], top: int, bottom: int) -> int:
+        """Linha de corte da faixa: a linha mais clara do trecho final (entre linhas de texto)"""
+        search_top = bottom - max(1, int((bottom - top) * self.TILE_CUT_SEARCH))
+        region = self._image_band(image, strips, search_top, bottom).convert('L')
+        rows = np.asarray(region, dtype=np.float32).mean(axis=1)
+        # Entre linhas igualmente claras, a mais próxima do fim da faixa
+        return bottom - int(rows[::-1].argmax())
+    
+    @staticmethod
+    def _merge_tiles(tiles: List[Dict]) -> Dict:
+        """Texto das faixas em ordem e confiança média ponderada pelo tamanho do texto"""
+        text = '\n'.join(tile['texto'] for tile in tiles if tile['texto'])
+        weighted = [(tile['confianca'], len(tile['texto'])) for tile in tiles
+                    if tile['confianca'] is not None and tile['texto']]
+        total = sum(chars for _, chars in weighted)
+        confidence = round(sum(conf * chars for conf, chars in weighted) / total, 2) if total else None
+        return {'texto': text, 'confianca': confidence}
     
     def _get_mime_type(self, file_ext: str) -> str:
         """Retorna MIME type baseado na extensão"""
@@ -240,111 +1099,70 @@ class DocumentProcessor:
             '.jpeg': 'image/jpeg',
             '.png': 'image/png',
             '.bmp': 'image/bmp',
+            '.tif': 'image/tiff',
             '.tiff': 'image/tiff'
         }
         return mime_types.get(file_ext, 'application/octet-stream')
     
     def _identify_document_type(self, text: str) -> Optional[str]:
-        """Identifica o tipo de documento baseado no texto"""
-        text_lower = text.lower()
+        """Identifica o tipo de documento pela pontuação das palavras-chave encontradas no texto"""
+        return self._classify_text(text)[0]
+    
+    def _classify_text(self, text: str) -> Tuple[str, float]:
+        """
+        Tipo de documento e confiança (0-1)
         
-        for doc_type, keywords in self.DOCUMENT_TYPES.items():
-            for keyword in keywords:
-                if keyword in text_lower:
-                    return doc_type
+        A confiança combina a fatia do tipo escolhido na pontuação total (tipos
+        concorrentes a reduzem) com a quantidade de evidência encontrada.
+        """
+        automaton = self.DOCUMENT_TYPE_AUTOMATON
+        hits = automaton.find_all(text, longest_only=True)
+        if not hits:
+            return 'documento_generico', 0.0
         
-        return 'documento_generico'
+        scores = automaton.scores(text, hits)
+        doc_type = automaton.best(text, hits)
+        share = scores[doc_type] / sum(scores.values())
+        evidence = min(1.0, scores[doc_type] / self.CLASSIFICATION_FULL_SCORE)
+        return doc_type, round(share * evidence, 2)
     
-    def _extract_metadata(self, text: str) -> Dict:
-        """Extrai metadados do texto"""
+    def _extract_metadata(self, text: str, entities: List[EntityMatch]) -> Dict:
+        """Extrai metadados do texto a partir das entidades encontradas na varredura"""
+        found = {entity.tipo for entity in entities}
         metadata = {
             'num_palavras': len(text.split()),
-            'num_linhas': len(text.split('\n')),
-            'tem_cpf': self._has_cpf(text),
-            'tem_cnpj': self._has_cnpj(text),
-            'tem_email': self._has_email(text),
-            'tem_telefone': self._has_phone(text)
+            'num_linhas': text.count('\n') + 1,
+            'tem_cpf': 'cpf' in found,
+            'tem_cnpj': 'cnpj' in found,
+            'tem_email': 'email' in found,
+            'tem_telefone': 'telefone' in found
         }
         return metadata
     
-    def _extract_date(self, text: str) -> Optional[str]:
+    def _extract_date(self, text: str, entities: List[EntityMatch]) -> Optional[str]:
         """Extrai data do documento"""
-        # Usa dateparser para encontrar datas no texto
-        try:
-            # Procura por padrões de data comuns
-            date_patterns = [
-                r'\d{2}/\d{2}/\d{4}',
-                r'\d{2}-\d{2}-\d{4}',
-                r'\d{4}-\d{2}-\d{2}',
-                r'\d{1,2}\s+de\s+\w+\s+de\s+\d{4}'
-            ]
-            
-            import re
-            for pattern in date_patterns:
-                matches = re.findall(pattern, text)
-                if matches:
-                    parsed_date = dateparser.parse(matches[0], languages=['pt'])
-                    if parsed_date:
-                        return parsed_date.strftime('%Y-%m-%d')
-            
-            # Tenta parsear qualquer data no texto
-            parsed = dateparser.parse(text, languages=['pt'])
-            if parsed:
-                return parsed.strftime('%Y-%m-%d')
-        except Exception as e:
-            logger.debug(f"Erro ao extrair data: {e}")
+        # Primeira data de cada formato encontrada na varredura, na ordem de preferência
+        for date in TextScanner.preferred_dates(entities):
+            parsed_date = self.date_engine.to_iso(date.valor)
+            if parsed_date:
+                return parsed_date
+        
+        # Outros formatos (ex: 05.03.2024, 1º de março de 2024), sempre em trechos curtos
+        parsed = self.date_engine.find_first(text)
+        if parsed:
+            return parsed.strftime('%Y-%m-%d')
         
         return None
     
-    def _extract_values(self, text: str) -> List[float]:
-        """Extrai valores monetários do texto"""
-        import re
+    def _extract_values(self, entities: List[EntityMatch]) -> List[float]:
+        """Extrai valores monetários (R$ 1.234,56 ou 1.234,56 reais) das entidades"""
         values = []
+        for entity in TextScanner.of_type(entities, 'valor'):
+            value = TextScanner.parse_money(entity.valor)
+            if value is not None:
+                values.append(value)
         
-        # Padrões para valores monetários (R$ 1.234,56 ou 1234.56)
-        patterns = [
-            r'R\$\s*(\d{1,3}(?:\.\d{3})*(?:,\d{2})?)',
-            r'(\d{1,3}(?:\.\d{3})*(?:,\d{2})?)\s*reais',
-            r'valor[:\s]+R\$\s*(\d{1,3}(?:\.\d{3})*(?:,\d{2})?)'
-        ]
-        
-        for pattern in patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches:
-                try:
-                    # Converte formato brasileiro para float
-                    value_str = match.replace('.', '').replace(',', '.')
-                    value = float(value_str)
-                    values.append(value)
-                except:
-                    pass
-        
-        return list(set(values))  # Remove duplicatas
-    
-    def _has_cpf(self, text: str) -> bool:
-        """Verifica se o texto contém CPF"""
-        import re
-        cpf_pattern = r'\d{3}\.?\d{3}\.?\d{3}-?\d{2}'
-        return bool(re.search(cpf_pattern, text))
-    
-    def _has_cnpj(self, text: str) -> bool:
-        """Verifica se o texto contém CNPJ"""
-        import re
-        cnpj_pattern = r'\d{2}\.?\d{3}\.?\d{3}/?\d{4}-?\d{2}'
-        return bool(re.search(cnpj_pattern, text))
-    
-    def _has_email(self, text: str) -> bool:
-        """Verifica se o texto contém email"""
-        import re
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        return bool(re.search(email_pattern, text))
-    
-    def _has_phone(self, text: str) -> bool:
-        """Verifica se o texto contém telefone"""
-        import re
-        phone_pattern = r'\(?\d{2}\)?\s?\d{4,5}-?\d{4}'
-        return bool(re.search(phone_pattern, text))
-
+        return list(dict.fromkeys(values))  # Remove duplicatas mantendo a ordem
 
 if __name__ == "__main__":
     # Exemplo de uso
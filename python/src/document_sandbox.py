@@ -0,0 +1,372 @@
+"""
+JurisPilot - Processamento Isolado de Documentos
+Executa a extração de documentos em processos supervisionados, com tempo
+máximo por documento, limite de memória e de páginas, para que um arquivo
+patológico não trave o servidor
+"""
+
+import os
+import time
+import atexit
+import queue
+import signal
+import threading
+import multiprocessing
+# Importado já: o atexit que aguarda os filhos é registrado antes dos shutdown()
+# abaixo e, por isso, roda depois deles (atexit executa na ordem inversa)
+import multiprocessing.util
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+import pytesseract
+from loguru import logger
+from document_processor import DocumentProcessor, Source
+from extraction_cache import ExtractionCache
+
+try:
+    import resource
+except ImportError:  # Windows: sem limite de memória por processo
+    resource = None
+
+
+class SandboxError(Exception):
+    """Falha do processamento isolado (código e status HTTP para a API)"""
+
+    code = 'erro_processamento'
+    http_status = 500
+    error = 'Erro ao processar documento'
+
+    def __init__(self, message: str, **details):
+        super().__init__(message)
+        self.details = details
+
+    def to_dict(self) -> Dict:
+        return {'error': self.error, 'code': self.code, 'message': str(self), **self.details}
+
+
+class DocumentTimeoutError(SandboxError):
+    """O documento não foi processado dentro do tempo máximo"""
+
+    code = 'tempo_esgotado'
+    http_status = 504
+    error = 'Tempo de processamento esgotado'
+
+
+class DocumentMemoryError(SandboxError):
+    """O processamento ultrapassou o limite de memória"""
+
+    code = 'memoria_excedida'
+    http_status = 422
+    error = 'Limite de memória excedido'
+
+
+class WorkerCrashedError(SandboxError):
+    """O processo terminou durante o processamento (ex: falha no leitor de PDF)"""
+
+    code = 'processo_encerrado'
+    http_status = 500
+    error = 'Processamento interrompido'
+
+
+def _sandbox_main(conn, options: Dict):
+    """Laço de um processo isolado: cria o DocumentProcessor uma vez e atende pedidos pelo pipe"""
+    # Grupo de processos próprio: ao encerrar, os filhos (OCR, poppler, tesseract) vão junto
+    if hasattr(os, 'setpgrp'):
+        os.setpgrp()
+    if resource is not None and options['memory_limit_mb']:
+        limit = options['memory_limit_mb'] * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+    cache = options['cache']
+    processor = DocumentProcessor(
+        tesseract_path=options['tesseract_path'],
+        cache=ExtractionCache(**cache) if cache else None,
+        ocr_settings=options['ocr_settings'],
+        pdf_settings=options['pdf_settings'],
+        max_pages=options['max_pages']
+    )
+
+    try:
+        while True:
+            try:
+                message = conn.recv()
+            except (EOFError, KeyboardInterrupt):
+                break
+            if message is None:
+                break
+
+            kind, payload = message
+            if kind == 'ping':
+                conn.send(('pong', os.getpid()))
+                continue
+
+            try:
+                if kind == 'processar':
+                    if payload.pop('progress', False):
+                        payload['on_page'] = lambda done, total: conn.send(('progresso', (done, total)))
+                    conn.send(('ok', processor.process_file(**payload)))
+                else:
+                    conn.send(('ok', processor.classify_quick(**payload)))
+            except MemoryError:
+                conn.send(('memoria', None))
+            except Exception as e:
+                conn.send(('erro', (type(e).__name__, str(e))))
+    finally:
+        processor.close()
+
+
+class _SandboxWorker:
+    """Processo isolado e a ponta do pipe usada para conversar com ele"""
+
+    def __init__(self, options: Dict):
+        self.conn, child_conn = multiprocessing.Pipe()
+        # Não é daemon: o processo cria os próprios processos de OCR
+        self.process = multiprocessing.Process(target=_sandbox_main, args=(child_conn, options))
+        self.process.start()
+        child_conn.close()
+        self.jobs = 0
+
+    def request(self, message, timeout: Optional[float],
+                on_progress: Optional[Callable[[int, Optional[int]], None]] = None):
+        """Envia um pedido e aguarda a resposta (repassando as mensagens de progresso)"""
+        self.conn.send(message)
+        deadline = time.monotonic() + timeout if timeout else None
+        while True:
+            remaining = max(0, deadline - time.monotonic()) if deadline else None
+            if not self.conn.poll(remaining):
+                raise TimeoutError(f"Processo {self.process.pid} não respondeu em {timeout}s")
+            response = self.conn.recv()
+            if response[0] != 'progresso':
+                return response
+            if on_progress is not None:
+                on_progress(*response[1])
+
+    def kill(self):
+        """Encerra à força o processo e todo o seu grupo"""
+        try:
+            if hasattr(os, 'killpg'):
+                os.killpg(self.process.pid, signal.SIGKILL)
+            else:
+                self.process.kill()
+        except (ProcessLookupError, PermissionError):
+            pass
+        self.process.join()
+        self.conn.close()
+
+    def stop(self, timeout: float = 5):
+        """Encerra o processo (educadamente e, se preciso, à força)"""
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.kill()
+        else:
+            self.conn.close()
+
+
+class DocumentSandbox:
+    """
+    Pool de processos isolados para process_file e classify_quick
+
+    Cada documento roda em um processo com limite de memória (RLIMIT_AS) e
+    tempo máximo; o processo que estoura o tempo é encerrado junto com os
+    filhos e substituído, e quem chamou recebe DocumentTimeoutError. Os
+    processos são reiniciados após max_jobs documentos.
+    """
+
+    # Exceções do processo repassadas com o mesmo tipo (as demais viram RuntimeError)
+    ERRORS = {'FileNotFoundError': FileNotFoundError, 'ValueError': ValueError}
+
+    def __init__(self, processor: DocumentProcessor, workers: int = 2,
+                 timeout: Optional[float] = 300, memory_limit_mb: int = 4096,
+                 max_jobs: int = 50, ocr_workers: int = 0):
+        """
+        Inicializa o pool
+
+        Args:
+            processor: DocumentProcessor do servidor; os processos usam as mesmas
+                       configurações (OCR, backend de PDF, limite de páginas, cache)
+                       e as consultas ao cache são feitas nele, sem ocupar um processo
+            workers: Número de processos (documentos processados ao mesmo tempo)
+            timeout: Tempo máximo por documento em segundos (None = sem limite)
+            memory_limit_mb: Memória virtual máxima de cada processo (0 = sem limite)
+            max_jobs: Documentos por processo antes de reiniciá-lo
+            ocr_workers: Processos de OCR de cada processo isolado (0 = CPUs
+                         divididas entre os processos isolados)
+        """
+        self.processor = processor
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self.max_jobs = max_jobs
+        cache = processor.cache
+        # Cada processo isolado tem o próprio pool de OCR: OCR_WORKERS (0 = CPUs) em
+        # cada um multiplicaria os processos pelo número de processos isolados
+        self.ocr_workers = ocr_workers or max(1, (os.cpu_count() or 1) // self.workers)
+        self.options = {
+            'memory_limit_mb': memory_limit_mb,
+            'max_pages': processor.max_pages,
+            'tesseract_path': pytesseract.pytesseract.tesseract_cmd,
+            'cache': {
+                'path': str(cache.path),
+                'max_size': cache.max_size,
+                'max_age_days': cache.max_age // 86400
+            } if cache else None,
+            'ocr_settings': processor.ocr_settings.model_copy(update={'workers': self.ocr_workers}),
+            'pdf_settings': processor.pdf_settings
+        }
+
+        self._lock = threading.Lock()
+        self._all: List[_SandboxWorker] = []
+        self._idle: Optional[queue.Queue] = None
+        self._background: Optional[ThreadPoolExecutor] = None
+        # Os processos não são daemon: sem encerrá-los, a saída do interpretador
+        # ficaria esperando por eles (multiprocessing aguarda os filhos)
+        atexit.register(self.shutdown)
+        logger.info(f"DocumentSandbox inicializado com {self.workers} processo(s) "
+                    f"de {self.ocr_workers} processo(s) de OCR cada, "
+                    f"tempo máximo {timeout}s, memória {memory_limit_mb} MB")
+
+    def _start(self):
+        """Inicia os processos sob demanda"""
+        with self._lock:
+            if self._idle is not None:
+                return
+            self._idle = queue.Queue()
+            for _ in range(self.workers):
+                worker = _SandboxWorker(self.options)
+                self._all.append(worker)
+                self._idle.put(worker)
+
+    def _replace(self, worker: _SandboxWorker, kill: bool = False) -> _SandboxWorker:
+        """Substitui um processo por um novo"""
+        if kill:
+            worker.kill()
+        else:
+            worker.stop(timeout=1)
+        new_worker = _SandboxWorker(self.options)
+        with self._lock:
+            if worker in self._all:
+                self._all.remove(worker)
+            self._all.append(new_worker)
+        return new_worker
+
+    def _run(self, kind: str, payload: Dict, file_name: str,
+             on_progress: Optional[Callable[[int, Optional[int]], None]] = None) -> Dict:
+        """Executa um pedido em um processo livre"""
+        self._start()
+        worker = self._idle.get()
+        try:
+            status, result = worker.request((kind, payload), self.timeout, on_progress)
+        except TimeoutError:
+            logger.error(f"Tempo esgotado ({self.timeout}s) processando {file_name}; "
+                         f"encerrando processo {worker.process.pid}")
+            self._idle.put(self._replace(worker, kill=True))
+            raise DocumentTimeoutError(
+                f"Processamento de {file_name} excedeu {self.timeout}s",
+                timeout=self.timeout, nome_arquivo=file_name
+            )
+        except (EOFError, OSError) as e:
+            # Processo morreu durante o documento (ex: falha no leitor ou morto pelo sistema)
+            logger.error(f"Processo {worker.process.pid} terminou processando {file_name}: {e}")
+            self._idle.put(self._replace(worker, kill=True))
+            raise WorkerCrashedError(
+                f"O processo terminou durante o processamento de {file_name}",
+                nome_arquivo=file_name
+            )
+        except Exception:
+            # Pedido não enviado (ex: argumento que não pode ser serializado)
+            self._idle.put(worker)
+            raise
+
+        worker.jobs += 1
+        if status == 'memoria':
+            # Após MemoryError o processo pode estar em estado inconsistente
+            self._idle.put(self._replace(worker, kill=True))
+            raise DocumentMemoryError(
+                f"Processamento de {file_name} excedeu o limite de {self.options['memory_limit_mb']} MB",
+                limite_mb=self.options['memory_limit_mb'], nome_arquivo=file_name
+            )
+        if worker.jobs >= self.max_jobs:
+            worker = self._replace(worker)
+        self._idle.put(worker)
+
+        if status == 'erro':
+            name, message = result
+            raise self.ERRORS.get(name, RuntimeError)(message if name in self.ERRORS else f"{name}: {message}")
+        return result
+
+    @staticmethod
+    def _payload(file_path: Source, file_name: Optional[str], **kwargs) -> Dict:
+        """Argumentos enviados ao processo (conteúdo em memória vai como bytes)"""
+        if not isinstance(file_path, (str, os.PathLike, bytes)):
+            if isinstance(file_path, (bytearray, memoryview)):
+                file_path = bytes(file_path)
+            else:
+                file_path.seek(0)
+                file_path = file_path.read()
+        return {'file_path': file_path, 'file_name': file_name, **kwargs}
+
+    def process_file(self, file_path: Source, use_cache: bool = True,
+                     file_name: Optional[str] = None, content_hash: Optional[str] = None,
+                     on_page: Optional[Callable[[int, Optional[int]], None]] = None) -> Dict:
+        """DocumentProcessor.process_file em um processo isolado (acertos do cache não ocupam processo)"""
+        if use_cache:
+            cached, content_hash = self.processor.lookup_cache(file_path, file_name, content_hash)
+            if cached is not None:
+                return cached
+        payload = self._payload(file_path, file_name, use_cache=use_cache, content_hash=content_hash,
+                                progress=on_page is not None)
+        return self._run('processar', payload, file_name or os.path.basename(str(file_path)), on_page)
+
+    def classify_quick(self, file_path: Source, max_pages: int = DocumentProcessor.QUICK_MAX_PAGES,
+                       max_chars: int = DocumentProcessor.QUICK_MAX_CHARS, use_cache: bool = True,
+                       file_name: Optional[str] = None, content_hash: Optional[str] = None) -> Dict:
+        """DocumentProcessor.classify_quick em um processo isolado"""
+        payload = self._payload(file_path, file_name, max_pages=max_pages, max_chars=max_chars,
+                                use_cache=use_cache, content_hash=content_hash)
+        return self._run('classificar', payload, file_name or os.path.basename(str(file_path)))
+
+    def schedule_processing(self, file_path: str) -> Future:
+        """Agenda process_file em segundo plano (um documento por vez)"""
+        with self._lock:
+            if self._background is None:
+                self._background = ThreadPoolExecutor(max_workers=1, thread_name_prefix='processamento')
+            return self._background.submit(self.process_file, file_path)
+
+    def health_check(self, timeout: float = 5) -> List[Dict]:
+        """Verifica os processos livres (ping) e substitui os que não respondem"""
+        if self._idle is None:
+            return []
+
+        status = []
+        busy = self.workers
+        for _ in range(self.workers):
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            busy -= 1
+            try:
+                worker.request(('ping', None), timeout)
+                status.append({'pid': worker.process.pid, 'documentos': worker.jobs, 'saudavel': True})
+            except (TimeoutError, EOFError, OSError):
+                logger.warning(f"Processo {worker.process.pid} não respondeu, substituindo")
+                status.append({'pid': worker.process.pid, 'documentos': worker.jobs, 'saudavel': False})
+                worker = self._replace(worker, kill=True)
+            self._idle.put(worker)
+
+        status.extend({'ocupado': True} for _ in range(busy))
+        return status
+
+    def shutdown(self):
+        """Aguarda os processamentos agendados e encerra os processos"""
+        with self._lock:
+            background, self._background = self._background, None
+        if background is not None:
+            background.shutdown(wait=True)
+        with self._lock:
+            for worker in self._all:
+                worker.stop()
+            self._all = []
+            self._idle = None
@@ -0,0 +1,164 @@
+"""
+JurisPilot - Leitura de DOCX em fluxo
+Extrai parágrafos e tabelas de word/document.xml com parsing XML incremental,
+na ordem do documento e sem montar o modelo de objetos do python-docx
+"""
+
+import zipfile
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from typing import BinaryIO, Dict, Iterator, NamedTuple, Optional, Union
+
+W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+MC = '{http://schemas.openxmlformats.org/markup-compatibility/2006}'
+DC = '{http://purl.org/dc/elements/1.1/}'
+DCTERMS = '{http://purl.org/dc/terms/}'
+
+
+class DocxBlock(NamedTuple):
+    """Parágrafo ou linha de tabela do documento"""
+    tipo: str      # 'paragrafo' ou 'tabela' (uma linha, células separadas por espaço)
+    texto: str
+    pagina: int    # 1..N, conforme as quebras de página gravadas no arquivo
+
+
+class DocxStreamReader:
+    """
+    Leitor de DOCX em fluxo
+
+    O XML é percorrido com iterparse e cada parágrafo/linha de tabela é
+    removido da árvore assim que emitido, de modo que a memória fica limitada
+    ao bloco atual. Tabelas aninhadas são incorporadas à célula que as contém.
+    """
+
+    # Elementos cujo conteúdo é descartado (mc:Fallback repete o conteúdo de mc:Choice)
+    SKIPPED = {MC + 'Fallback'}
+
+    def __init__(self, file_path: Union[str, BinaryIO]):
+        """
+        Args:
+            file_path: Caminho do arquivo ou arquivo binário com seek (ex: BytesIO)
+        """
+        self.file_path = file_path
+
+    def iter_blocks(self) -> Iterator[DocxBlock]:
+        """Parágrafos e linhas de tabela na ordem do documento"""
+        with zipfile.ZipFile(self.file_path) as archive, archive.open('word/document.xml') as xml:
+            elements = []        # caminho da raiz até o elemento atual
+            paragraphs = []      # textos dos parágrafos abertos (caixas de texto aninham parágrafos)
+            tables = []          # por tabela aberta: células da linha atual e parágrafos da célula atual
+            skipped = 0
+            page = 1
+            page_break = False   # quebra encontrada no meio do bloco: vale a partir do próximo
+            just_broke = False   # página acabou de mudar (o Word grava a mesma quebra duas vezes)
+
+            for event, elem in ET.iterparse(xml, events=('start', 'end')):
+                tag = elem.tag
+                if event == 'start':
+                    elements.append(elem)
+                    if tag in self.SKIPPED:
+                        skipped += 1
+                    elif skipped:
+                        pass
+                    elif tag == W + 'p':
+                        paragraphs.append([])
+                    elif tag == W + 'tbl':
+                        tables.append({'linha': None, 'celula': None})
+                    elif tag == W + 'tr':
+                        tables[-1]['linha'] = []
+                    elif tag == W + 'tc':
+                        tables[-1]['celula'] = []
+                    continue
+
+                elements.pop()
+                if tag in self.SKIPPED:
+                    skipped -= 1
+                    self._detach(elements, elem)
+                    continue
+                if skipped:
+                    continue
+
+                if tag == W + 't':
+                    if paragraphs:
+                        paragraphs[-1].append(elem.text or '')
+                elif tag == W + 'tab' or tag == W + 'cr' or (tag == W + 'br' and elem.get(W + 'type') != 'page'):
+                    if paragraphs:
+                        paragraphs[-1].append('\t' if tag == W + 'tab' else '\n')
+                elif tag == W + 'br' or tag == W + 'lastRenderedPageBreak':
+                    if not tables and len(paragraphs) == 1 and not ''.join(paragraphs[0]).strip():
+                        # Quebra antes do texto: o parágrafo já pertence à nova página
+                        if not just_broke:
+                            page += 1
+                        just_broke = True
+                    else:
+                        page_break = True
+                elif tag == W + 'p':
+                    text = ''.join(paragraphs.pop())
+                    if paragraphs:
+                        # Parágrafo de caixa de texto: incorporado ao parágrafo que a contém
+                        paragraphs[-1].append('\n' + text)
+                    elif tables and tables[-1]['celula'] is not None:
+                        tables[-1]['celula'].append(text)
+                    else:
+                        yield DocxBlock('paragrafo', text, page)
+                        page, page_break, just_broke = self._next_page(page, page_break, just_broke, text)
+                    self._detach(elements, elem)
+                elif tag == W + 'tc':
+                    table = tables[-1]
+                    table['linha'].append('\n'.join(table['celula']))
+                    table['celula'] = None
+                elif tag == W + 'tr':
+                    table = tables[-1]
+                    text = ' '.join(table['linha'])
+                    table['linha'] = None
+                    if len(tables) > 1:
+                        # Tabela aninhada: a linha vira um parágrafo da célula externa
+                        tables[-2]['celula'].append(text)
+                    else:
+                        yield DocxBlock('tabela', text, page)
+                        page, page_break, just_broke = self._next_page(page, page_break, just_broke, text)
+                    self._detach(elements, elem)
+                elif tag == W + 'tbl':
+                    tables.pop()
+                    self._detach(elements, elem)
+
+    @staticmethod
+    def _next_page(page: int, page_break: bool, just_broke: bool, text: str):
+        """Aplica a quebra de página pendente após um bloco emitido"""
+        if page_break:
+            return page + 1, False, True
+        return page, False, just_broke and not text.strip()
+
+    @staticmethod
+    def _detach(elements, elem):
+        """Remove o elemento já tratado da árvore para liberar memória"""
+        if elements:
+            elements[-1].remove(elem)
+
+    def core_properties(self) -> Dict:
+        """Título, autor e datas de docProps/core.xml"""
+        properties = {'title': '', 'author': '', 'created': '', 'modified': ''}
+        with zipfile.ZipFile(self.file_path) as archive:
+            try:
+                root = ET.fromstring(archive.read('docProps/core.xml'))
+            except KeyError:
+                return properties
+
+        properties['title'] = root.findtext(DC + 'title') or ''
+        properties['author'] = root.findtext(DC + 'creator') or ''
+        properties['created'] = self._format_date(root.findtext(DCTERMS + 'created'))
+        properties['modified'] = self._format_date(root.findtext(DCTERMS + 'modified'))
+        return properties
+
+    @staticmethod
+    def _format_date(value: Optional[str]) -> str:
+        """Data W3CDTF (2024-03-12T10:00:00Z) no formato AAAA-MM-DD HH:MM:SS"""
+        if not value:
+            return ''
+        value = value.strip()
+        for fmt in ('%Y-%m-%dT%H:%M:%SZ', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%dT%H:%M:%S.%fZ', '%Y-%m-%d'):
+            try:
+                return str(datetime.strptime(value, fmt))
+            except ValueError:
+                continue
+        return value
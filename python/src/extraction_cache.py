@@ -0,0 +1,259 @@
+"""
+JurisPilot - Cache de Extração
+Cache persistente de resultados de extração endereçado pelo conteúdo do arquivo
+e das páginas
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import BinaryIO, Dict, Iterable, Optional
+from pathlib import Path
+from loguru import logger
+
+
+class ExtractionCache:
+    """
+    Cache persistente (SQLite) de resultados do DocumentProcessor
+
+    A chave é derivada do SHA-256 do conteúdo do arquivo, da versão do
+    extrator e das configurações de OCR, de modo que o mesmo arquivo
+    reenviado com outro nome ou caminho reaproveita o resultado anterior.
+    Os resultados de cada página de PDF também são guardados pelo hash do
+    conteúdo da página, para que uma nova versão do documento (ex: extrato
+    com uma página a mais) reaproveite as páginas que não mudaram.
+    """
+
+    CHUNK_SIZE = 1024 * 1024  # 1MB
+
+    def __init__(self, path: str, max_size: int = 536870912, max_age_days: int = 30):
+        """
+        Inicializa o cache
+
+        Args:
+            path: Caminho do arquivo SQLite do cache
+            max_size: Tamanho máximo total das entradas em bytes
+            max_age_days: Idade máxima de uma entrada em dias
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_size = max_size
+        self.max_age = max_age_days * 86400
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.page_hits = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False,
+                                     isolation_level=None)
+        self._init_db()
+        logger.info(f"ExtractionCache inicializado: {self.path}")
+
+    def _init_db(self):
+        """Cria as tabelas do cache se não existirem"""
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS extracoes (
+                    chave TEXT PRIMARY KEY,
+                    sha256 TEXT NOT NULL,
+                    resultado TEXT NOT NULL,
+                    tamanho INTEGER NOT NULL,
+                    criado_em REAL NOT NULL,
+                    acessado_em REAL NOT NULL
+                )
+            """)
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_extracoes_acessado_em ON extracoes(acessado_em)"
+            )
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS paginas (
+                    chave TEXT PRIMARY KEY,
+                    resultado TEXT NOT NULL,
+                    tamanho INTEGER NOT NULL,
+                    criado_em REAL NOT NULL,
+                    acessado_em REAL NOT NULL
+                )
+            """)
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_paginas_acessado_em ON paginas(acessado_em)"
+            )
+
+    @classmethod
+    def hash_file(cls, file_path: str) -> str:
+        """Calcula o SHA-256 do conteúdo de um arquivo"""
+        with open(file_path, 'rb') as file:
+            return cls.hash_stream(file)
+
+    @classmethod
+    def hash_stream(cls, stream: BinaryIO) -> str:
+        """Calcula o SHA-256 do conteúdo restante de um arquivo binário já aberto"""
+        sha256 = hashlib.sha256()
+        for chunk in iter(lambda: stream.read(cls.CHUNK_SIZE), b''):
+            sha256.update(chunk)
+        return sha256.hexdigest()
+
+    @staticmethod
+    def make_key(content_hash: str, extractor_version: str, ocr_settings: Dict) -> str:
+        """Gera a chave do cache a partir do conteúdo, versão do extrator e configurações de OCR"""
+        raw = f"{content_hash}:{extractor_version}:{json.dumps(ocr_settings, sort_keys=True)}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Retorna o resultado armazenado para a chave ou None"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT resultado, criado_em FROM extracoes WHERE chave = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            resultado, criado_em = row
+            if now - criado_em > self.max_age:
+                self._conn.execute("DELETE FROM extracoes WHERE chave = ?", (key,))
+                self.evictions += 1
+                self.misses += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE extracoes SET acessado_em = ? WHERE chave = ?", (now, key)
+            )
+            self.hits += 1
+
+        return json.loads(resultado)
+
+    def put(self, key: str, content_hash: str, result: Dict):
+        """Armazena um resultado e aplica a política de remoção"""
+        now = time.time()
+        payload = json.dumps(result, ensure_ascii=False, default=str)
+        size = len(payload.encode('utf-8'))
+
+        if size > self.max_size:
+            logger.debug(f"Resultado maior que o cache ({size} bytes), não armazenado")
+            return
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO extracoes (chave, sha256, resultado, tamanho, criado_em, acessado_em) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, content_hash, payload, size, now, now)
+            )
+            self._evict(now)
+
+    def get_pages(self, keys: Iterable[str]) -> Dict[str, Dict]:
+        """Resultados de páginas armazenados, por chave (chaves ausentes ou expiradas são omitidas)"""
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return {}
+
+        now = time.time()
+        placeholders = ','.join('?' * len(keys))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT chave, resultado FROM paginas WHERE chave IN ({placeholders}) AND criado_em >= ?",
+                (*keys, now - self.max_age)
+            ).fetchall()
+            if rows:
+                self._conn.executemany(
+                    "UPDATE paginas SET acessado_em = ? WHERE chave = ?", [(now, chave) for chave, _ in rows]
+                )
+            self.page_hits += len(rows)
+
+        return {chave: json.loads(resultado) for chave, resultado in rows}
+
+    def put_pages(self, pages: Dict[str, Dict]):
+        """Armazena resultados de páginas por chave e aplica a política de remoção"""
+        if not pages:
+            return
+
+        now = time.time()
+        rows = []
+        for key, page in pages.items():
+            payload = json.dumps(page, ensure_ascii=False, default=str)
+            rows.append((key, payload, len(payload.encode('utf-8')), now, now))
+
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO paginas (chave, resultado, tamanho, criado_em, acessado_em) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            self._evict(now)
+
+    def _evict(self, now: float):
+        """Remove entradas expiradas e, se necessário, as menos acessadas até caber no limite"""
+        for table in ('extracoes', 'paginas'):
+            cursor = self._conn.execute(
+                f"DELETE FROM {table} WHERE criado_em < ?", (now - self.max_age,)
+            )
+            self.evictions += max(cursor.rowcount, 0)
+
+        total = self._conn.execute(
+            "SELECT (SELECT COALESCE(SUM(tamanho), 0) FROM extracoes) + "
+            "(SELECT COALESCE(SUM(tamanho), 0) FROM paginas)"
+        ).fetchone()[0]
+        if total <= self.max_size:
+            return
+
+        # Documentos e páginas disputam o mesmo limite: saem os menos acessados
+        removidas = {'extracoes': [], 'paginas': []}
+        for table, chave, tamanho in self._conn.execute(
+            "SELECT 'extracoes', chave, tamanho, acessado_em FROM extracoes "
+            "UNION ALL SELECT 'paginas', chave, tamanho, acessado_em FROM paginas "
+            "ORDER BY acessado_em ASC"
+        ).fetchall():
+            if total <= self.max_size:
+                break
+            removidas[table].append((chave,))
+            total -= tamanho
+
+        for table, chaves in removidas.items():
+            self._conn.executemany(f"DELETE FROM {table} WHERE chave = ?", chaves)
+            self.evictions += len(chaves)
+
+    def clear(self):
+        """Remove todas as entradas do cache"""
+        with self._lock:
+            self._conn.execute("DELETE FROM extracoes")
+            self._conn.execute("DELETE FROM paginas")
+
+    def stats(self) -> Dict:
+        """Retorna contadores de acertos, falhas e ocupação do cache"""
+        with self._lock:
+            entradas, tamanho = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(tamanho), 0) FROM extracoes"
+            ).fetchone()
+            paginas, tamanho_paginas = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(tamanho), 0) FROM paginas"
+            ).fetchone()
+
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'taxa_acerto': round(self.hits / total, 4) if total else 0.0,
+            'entradas': entradas,
+            'paginas': paginas,
+            'paginas_reutilizadas': self.page_hits,
+            'tamanho_total': tamanho + tamanho_paginas,
+            'tamanho_maximo': self.max_size,
+            'idade_maxima_dias': self.max_age // 86400
+        }
+
+
+if __name__ == "__main__":
+    # Exemplo de uso
+    import sys
+    cache = ExtractionCache(os.getenv("CACHE_PATH", "./storage/cache/extracao.db"))
+    if len(sys.argv) > 1 and sys.argv[1] == "clear":
+        cache.clear()
+    print(json.dumps(cache.stats(), indent=2, ensure_ascii=False))
@@ -0,0 +1,174 @@
+"""
+JurisPilot - Pré-processamento de Imagens para OCR
+Reduz, converte para tons de cinza, binariza, corrige inclinação e recorta
+bordas de imagens (ex: fotos de documentos) antes do OCR usando OpenCV
+"""
+
+import os
+from typing import Dict
+import cv2
+import numpy as np
+from PIL import Image
+
+
+class ImagePreprocessor:
+    """Pipeline de pré-processamento de imagens para OCR (cada etapa pode ser desligada)"""
+
+    # Lado maior de uma página A4 em polegadas (referência para o DPI alvo)
+    A4_LONG_SIDE_INCHES = 11.69
+
+    # Inclinações fora deste intervalo (graus) não são corrigidas
+    MIN_SKEW_ANGLE = 0.3
+    MAX_SKEW_ANGLE = 15.0
+
+    # Janela e constante da binarização adaptativa
+    BINARIZE_BLOCK_SIZE = 31
+    BINARIZE_C = 15
+
+    # Linhas/colunas da borda com mais tinta que isto são tratadas como moldura
+    BORDER_INK_RATIO = 0.5
+    CROP_MARGIN = 10
+
+    def __init__(self, target_dpi: int = 300, downscale: bool = True, grayscale: bool = True,
+                 binarize: bool = True, deskew: bool = True, crop_borders: bool = True):
+        """
+        Inicializa o pipeline
+
+        Args:
+            target_dpi: DPI alvo para a redução (considerando uma página A4)
+            downscale: Reduz imagens maiores que uma página A4 no DPI alvo
+            grayscale: Converte para tons de cinza
+            binarize: Aplica binarização adaptativa
+            deskew: Corrige a inclinação do texto
+            crop_borders: Remove bordas escuras e margens vazias
+        """
+        self.target_dpi = target_dpi
+        self.downscale = downscale
+        self.grayscale = grayscale
+        self.binarize = binarize
+        self.deskew = deskew
+        self.crop_borders = crop_borders
+
+    @staticmethod
+    def options_from_settings(ocr_settings) -> Dict:
+        """Opções do pipeline definidas em OCRSettings"""
+        return {
+            'target_dpi': ocr_settings.preprocess_target_dpi,
+            'downscale': ocr_settings.preprocess_downscale,
+            'grayscale': ocr_settings.preprocess_grayscale,
+            'binarize': ocr_settings.preprocess_binarize,
+            'deskew': ocr_settings.preprocess_deskew,
+            'crop_borders': ocr_settings.preprocess_crop_borders
+        }
+
+    def apply(self, image) -> Image.Image:
+        """
+        Aplica o pipeline
+
+        Args:
+            image: PIL.Image ou caminho de arquivo
+
+        Returns:
+            PIL.Image pronta para o OCR
+        """
+        array = self._load(image)
+
+        if self.downscale:
+            array = self._downscale(array)
+
+        needs_gray = self.grayscale or self.binarize or self.deskew or self.crop_borders
+        if needs_gray and array.ndim == 3:
+            array = cv2.cvtColor(array, cv2.COLOR_BGR2GRAY)
+
+        if self.deskew:
+            array = self._deskew(array)
+
+        if self.binarize:
+            array = cv2.adaptiveThreshold(
+                array, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY,
+                self.BINARIZE_BLOCK_SIZE, self.BINARIZE_C
+            )
+
+        if self.crop_borders:
+            array = self._crop_borders(array)
+
+        if array.ndim == 3:
+            return Image.fromarray(cv2.cvtColor(array, cv2.COLOR_BGR2RGB))
+        return Image.fromarray(array)
+
+    @staticmethod
+    def _load(image) -> np.ndarray:
+        """Carrega a imagem como array OpenCV (BGR ou tons de cinza)"""
+        if isinstance(image, (str, os.PathLike)):
+            array = cv2.imread(str(image), cv2.IMREAD_UNCHANGED)
+            if array is not None:
+                if array.ndim == 3 and array.shape[2] == 4:
+                    array = cv2.cvtColor(array, cv2.COLOR_BGRA2BGR)
+                if array.dtype != np.uint8:
+                    array = cv2.convertScaleAbs(array, alpha=255.0 / max(int(array.max()), 1))
+                return array
+            image = Image.open(image)
+
+        if image.mode == 'L':
+            return np.array(image)
+        return cv2.cvtColor(np.array(image.convert('RGB')), cv2.COLOR_RGB2BGR)
+
+    def _downscale(self, array: np.ndarray) -> np.ndarray:
+        """Reduz a imagem para o DPI alvo (ex: fotos de 12 MP)"""
+        max_side = int(self.target_dpi * self.A4_LONG_SIDE_INCHES)
+        height, width = array.shape[:2]
+        scale = max_side / max(height, width)
+        if scale >= 1:
+            return array
+        return cv2.resize(array, (int(width * scale), int(height * scale)), interpolation=cv2.INTER_AREA)
+
+    def _deskew(self, gray: np.ndarray) -> np.ndarray:
+        """Corrige a inclinação usando o retângulo mínimo que envolve o texto"""
+        _, ink = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV | cv2.THRESH_OTSU)
+        coords = cv2.findNonZero(ink)
+        if coords is None or len(coords) < 100:
+            return gray
+
+        angle = cv2.minAreaRect(coords)[-1]
+        if angle > 45:
+            angle -= 90
+        elif angle < -45:
+            angle += 90
+
+        if abs(angle) < self.MIN_SKEW_ANGLE or abs(angle) > self.MAX_SKEW_ANGLE:
+            return gray
+
+        height, width = gray.shape[:2]
+        matrix = cv2.getRotationMatrix2D((width / 2, height / 2), angle, 1.0)
+        return cv2.warpAffine(gray, matrix, (width, height), flags=cv2.INTER_CUBIC,
+                              borderMode=cv2.BORDER_REPLICATE)
+
+    def _crop_borders(self, gray: np.ndarray) -> np.ndarray:
+        """Remove molduras escuras (mesa, sombra do scanner) e margens vazias"""
+        ink = gray < 128
+        height, width = ink.shape
+
+        # Descarta faixas de borda dominadas por tinta (moldura)
+        row_ink = ink.mean(axis=1)
+        col_ink = ink.mean(axis=0)
+        top, bottom, left, right = 0, height, 0, width
+        while top < bottom - 1 and row_ink[top] > self.BORDER_INK_RATIO:
+            top += 1
+        while bottom > top + 1 and row_ink[bottom - 1] > self.BORDER_INK_RATIO:
+            bottom -= 1
+        while left < right - 1 and col_ink[left] > self.BORDER_INK_RATIO:
+            left += 1
+        while right > left + 1 and col_ink[right - 1] > self.BORDER_INK_RATIO:
+            right -= 1
+
+        # Recorta até o conteúdo, com uma pequena margem
+        content = cv2.findNonZero(ink[top:bottom, left:right].astype(np.uint8))
+        if content is None:
+            return gray[top:bottom, left:right]
+
+        x, y, w, h = cv2.boundingRect(content)
+        y0 = max(top + y - self.CROP_MARGIN, top)
+        y1 = min(top + y + h + self.CROP_MARGIN, bottom)
+        x0 = max(left + x - self.CROP_MARGIN, left)
+        x1 = min(left + x + w + self.CROP_MARGIN, right)
+        return gray[y0:y1, x0:x1]
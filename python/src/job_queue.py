@@ -0,0 +1,396 @@
+"""
+JurisPilot - Fila de Processamento Assíncrono
+Jobs de processamento de documentos gravados em SQLite (sobrevivem a
+reinícios da API), executados por um pool local, com progresso por página
+e aviso de conclusão por callback HTTP (ex: webhook do n8n)
+"""
+
+import os
+import json
+import time
+import uuid
+import shutil
+import sqlite3
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, Optional, Set, Tuple
+from urllib.parse import urljoin
+import requests
+from loguru import logger
+
+
+class JobQueue:
+    """
+    Fila persistente de processamento de documentos
+
+    Cada job é gravado antes de ser executado; uploads são copiados para
+    files_path e removidos ao final. Ao iniciar, jobs interrompidos por um
+    reinício voltam para a fila (até max_attempts execuções) e os pendentes
+    são retomados. Vários processos da API podem compartilhar o mesmo banco:
+    cada job é reservado atomicamente por quem o executa.
+    """
+
+    PENDING = 'pendente'
+    RUNNING = 'processando'
+    DONE = 'concluido'
+    FAILED = 'erro'
+
+    # Tentativas de entrega do callback e intervalo inicial entre elas (dobra a cada falha)
+    CALLBACK_ATTEMPTS = 3
+    CALLBACK_BACKOFF = 2.0
+
+    # Intervalo mínimo entre gravações do progresso no banco (segundos)
+    PROGRESS_INTERVAL = 1.0
+
+    def __init__(self, path: str, files_path: str, runner: Callable[..., Dict], workers: int = 2,
+                 max_attempts: int = 3, callback_url: Optional[str] = None,
+                 callback_base_url: Optional[str] = None, callback_timeout: int = 10,
+                 retention_days: int = 7):
+        """
+        Inicializa a fila
+
+        Args:
+            path: Caminho do arquivo SQLite da fila
+            files_path: Diretório dos arquivos enviados aguardando processamento
+            runner: Função de processamento com a assinatura de
+                    DocumentProcessor.process_file (file_name, content_hash, on_page)
+            workers: Jobs executados ao mesmo tempo
+            max_attempts: Execuções de um job interrompido por reinício antes de desistir
+            callback_url: Callback usado quando o job não informa um
+            callback_base_url: Base de callbacks relativos (ex: N8N_WEBHOOK_URL)
+            callback_timeout: Tempo máximo de cada chamada do callback em segundos
+            retention_days: Dias em que jobs finalizados ficam disponíveis para consulta
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.files_path = Path(files_path)
+        self.files_path.mkdir(parents=True, exist_ok=True)
+        self.runner = runner
+        self.workers = max(1, workers)
+        self.max_attempts = max_attempts
+        self.callback_url = callback_url or None
+        self.callback_base_url = callback_base_url
+        self.callback_timeout = callback_timeout
+        self.retention = retention_days * 86400
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False,
+                                     isolation_level=None)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._futures: Set[Future] = set()  # jobs entregues ao pool e ainda não concluídos
+        self._init_db()
+        logger.info(f"JobQueue inicializada: {self.path}")
+
+    def _init_db(self):
+        """Cria a tabela de jobs se não existir"""
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    nome_arquivo TEXT NOT NULL,
+                    caminho_arquivo TEXT NOT NULL,
+                    arquivo_temporario INTEGER NOT NULL,
+                    sha256 TEXT,
+                    callback_url TEXT,
+                    callback_status TEXT,
+                    tentativas INTEGER NOT NULL DEFAULT 0,
+                    paginas_processadas INTEGER NOT NULL DEFAULT 0,
+                    num_paginas INTEGER,
+                    resultado TEXT,
+                    erro TEXT,
+                    processo INTEGER,
+                    criado_em REAL NOT NULL,
+                    iniciado_em REAL,
+                    concluido_em REAL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, criado_em)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_sha256 ON jobs(sha256)")
+
+    def start(self):
+        """Remove jobs expirados, devolve à fila os interrompidos e retoma os pendentes"""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='job')
+        self.cleanup()
+        self._recover()
+        with self._lock:
+            pending = [row[0] for row in self._conn.execute(
+                "SELECT id FROM jobs WHERE status = ? ORDER BY criado_em", (self.PENDING,)
+            )]
+        for job_id in pending:
+            self._submit(job_id)
+        if pending:
+            logger.info(f"{len(pending)} job(s) pendente(s) retomado(s)")
+
+    def submit(self, file_name: str, stream: Optional[BinaryIO] = None, file_path: Optional[str] = None,
+               content_hash: Optional[str] = None, callback_url: Optional[str] = None) -> Tuple[Dict, bool]:
+        """
+        Cria um job para um arquivo enviado (stream) ou já no disco (file_path)
+
+        Um novo envio do mesmo conteúdo com o mesmo callback, enquanto o job
+        anterior está pendente, em andamento ou concluído, retorna esse job
+        em vez de processar o arquivo outra vez (ex: repetição da requisição
+        pelo n8n após um tempo esgotado).
+
+        Returns:
+            (job, criado): o job e se ele foi criado agora
+        """
+        callback_url = self._resolve_callback(callback_url or self.callback_url)
+        if content_hash:
+            existing = self._find(content_hash, callback_url)
+            if existing is not None:
+                logger.info(f"Job {existing['job_id']} reaproveitado para {file_name}")
+                return existing, False
+
+        job_id = uuid.uuid4().hex
+        temporary = stream is not None
+        if temporary:
+            file_path = str(self.files_path / f"{job_id}_{file_name}")
+            stream.seek(0)
+            with open(file_path, 'wb') as file:
+                shutil.copyfileobj(stream, file)
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, status, nome_arquivo, caminho_arquivo, arquivo_temporario, sha256, "
+                "callback_url, criado_em) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, self.PENDING, file_name, file_path, int(temporary), content_hash,
+                 callback_url, time.time())
+            )
+
+        if self._executor is None:
+            self.start()
+        else:
+            self._submit(job_id)
+        logger.info(f"Job {job_id} criado: {file_name}")
+        return self.get(job_id), True
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Status, progresso e (se finalizado) resultado ou erro do job"""
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.row_factory = sqlite3.Row
+            row = cursor.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row is not None else None
+
+    def stats(self) -> Dict[str, int]:
+        """Quantidade de jobs por status"""
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {**{status: 0 for status in (self.PENDING, self.RUNNING, self.DONE, self.FAILED)}, **dict(rows)}
+
+    def cleanup(self):
+        """Remove jobs finalizados há mais de retention_days (e arquivos que tenham ficado)"""
+        limit = time.time() - self.retention
+        with self._lock:
+            expired = self._conn.execute(
+                "SELECT id, caminho_arquivo, arquivo_temporario FROM jobs "
+                "WHERE status IN (?, ?) AND concluido_em < ?", (self.DONE, self.FAILED, limit)
+            ).fetchall()
+            self._conn.executemany("DELETE FROM jobs WHERE id = ?", [(job_id,) for job_id, _, _ in expired])
+        for _, file_path, temporary in expired:
+            if temporary:
+                Path(file_path).unlink(missing_ok=True)
+
+    def shutdown(self):
+        """Aguarda os jobs em execução; os pendentes ficam gravados para o próximo início"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            # Jobs ainda não iniciados continuam pendentes no banco
+            with self._lock:
+                futures, self._futures = self._futures, set()
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=True)
+
+    def _submit(self, job_id: str):
+        """Entrega um job ao pool"""
+        future = self._executor.submit(self._run, job_id)
+        with self._lock:
+            self._futures.add(future)
+        future.add_done_callback(self._discard_future)
+
+    def _discard_future(self, future: Future):
+        with self._lock:
+            self._futures.discard(future)
+
+    def _recover(self):
+        """Devolve à fila os jobs cujo processo terminou durante a execução"""
+        with self._lock:
+            running = self._conn.execute(
+                "SELECT id, tentativas, processo FROM jobs WHERE status = ?", (self.RUNNING,)
+            ).fetchall()
+        for job_id, attempts, pid in running:
+            if pid and pid != os.getpid() and self._process_alive(pid):
+                continue
+            if attempts >= self.max_attempts:
+                logger.error(f"Job {job_id} interrompido {attempts} vez(es), desistindo")
+                self._finish(job_id, self.FAILED, error={
+                    'error': 'Processamento interrompido',
+                    'message': f"O processamento foi interrompido {attempts} vez(es)"
+                })
+                continue
+            with self._lock:
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, processo = NULL WHERE id = ? AND status = ?",
+                    (self.PENDING, job_id, self.RUNNING)
+                )
+            logger.warning(f"Job {job_id} interrompido, devolvido à fila")
+
+    @staticmethod
+    def _process_alive(pid: int) -> bool:
+        """O processo (outra instância da API) ainda está em execução"""
+        if os.name == 'nt':
+            # No Windows os.kill encerraria o processo; considera encerrado
+            return False
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        return True
+
+    def _find(self, content_hash: str, callback_url: Optional[str]) -> Optional[Dict]:
+        """Job não falho mais recente para o mesmo conteúdo e callback"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id FROM jobs WHERE sha256 = ? AND callback_url IS ? AND status != ? "
+                "ORDER BY criado_em DESC LIMIT 1",
+                (content_hash, callback_url, self.FAILED)
+            ).fetchone()
+        return self.get(row[0]) if row else None
+
+    def _resolve_callback(self, callback_url: Optional[str]) -> Optional[str]:
+        """Callback relativo (ex: 'ocr-concluido') é resolvido a partir de callback_base_url"""
+        if not callback_url or callback_url.startswith(('http://', 'https://')) or not self.callback_base_url:
+            return callback_url or None
+        return urljoin(self.callback_base_url.rstrip('/') + '/', callback_url.lstrip('/'))
+
+    def _run(self, job_id: str):
+        """Executa um job se ainda estiver pendente (reservando-o para este processo)"""
+        now = time.time()
+        with self._lock:
+            claimed = self._conn.execute(
+                "UPDATE jobs SET status = ?, tentativas = tentativas + 1, processo = ?, iniciado_em = ? "
+                "WHERE id = ? AND status = ?",
+                (self.RUNNING, os.getpid(), now, job_id, self.PENDING)
+            ).rowcount
+            if not claimed:
+                return
+            file_name, file_path, content_hash = self._conn.execute(
+                "SELECT nome_arquivo, caminho_arquivo, sha256 FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+
+        logger.info(f"Executando job {job_id}: {file_name}")
+        last_write = [0.0]
+
+        def on_page(done: int, total: Optional[int]):
+            if time.monotonic() - last_write[0] < self.PROGRESS_INTERVAL and done != total:
+                return
+            last_write[0] = time.monotonic()
+            with self._lock:
+                self._conn.execute(
+                    "UPDATE jobs SET paginas_processadas = ?, num_paginas = ? WHERE id = ?",
+                    (done, total, job_id)
+                )
+
+        try:
+            result = self.runner(file_path, file_name=file_name, content_hash=content_hash, on_page=on_page)
+        except Exception as e:
+            logger.error(f"Job {job_id} falhou: {e}")
+            error = e.to_dict() if hasattr(e, 'to_dict') else {
+                'error': 'Erro ao processar documento', 'message': str(e)
+            }
+            self._finish(job_id, self.FAILED, error=error)
+        else:
+            self._finish(job_id, self.DONE, result=result)
+
+    def _finish(self, job_id: str, status: str, result: Optional[Dict] = None, error: Optional[Dict] = None):
+        """Grava o resultado, remove o arquivo da fila e chama o callback"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, resultado = ?, erro = ?, concluido_em = ?, processo = NULL, "
+                "paginas_processadas = CASE WHEN ? = ? THEN COALESCE(num_paginas, paginas_processadas) "
+                "ELSE paginas_processadas END WHERE id = ?",
+                (status,
+                 json.dumps(result, ensure_ascii=False, default=str) if result is not None else None,
+                 json.dumps(error, ensure_ascii=False, default=str) if error is not None else None,
+                 time.time(), status, self.DONE, job_id)
+            )
+            file_path, temporary, callback_url = self._conn.execute(
+                "SELECT caminho_arquivo, arquivo_temporario, callback_url FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+
+        if temporary:
+            Path(file_path).unlink(missing_ok=True)
+        logger.info(f"Job {job_id} finalizado: {status}")
+
+        if callback_url:
+            self._notify(job_id, callback_url)
+
+    def _notify(self, job_id: str, callback_url: str):
+        """Envia o job finalizado ao callback (POST JSON), com novas tentativas em caso de falha"""
+        payload = self.get(job_id)
+        delay = self.CALLBACK_BACKOFF
+        status = None
+        for attempt in range(1, self.CALLBACK_ATTEMPTS + 1):
+            try:
+                response = requests.post(callback_url, json=payload, timeout=self.callback_timeout)
+                response.raise_for_status()
+                status = f"enviado ({response.status_code})"
+                break
+            except requests.RequestException as e:
+                status = f"falhou: {e}"
+                logger.warning(f"Callback do job {job_id} falhou (tentativa {attempt}): {e}")
+                if attempt < self.CALLBACK_ATTEMPTS:
+                    time.sleep(delay)
+                    delay *= 2
+
+        with self._lock:
+            self._conn.execute("UPDATE jobs SET callback_status = ? WHERE id = ?", (status, job_id))
+
+    @staticmethod
+    def _timestamp(value: Optional[float]) -> Optional[str]:
+        return datetime.fromtimestamp(value).isoformat() if value else None
+
+    def _to_dict(self, row: sqlite3.Row) -> Dict:
+        """Representação do job para a API e o callback"""
+        done, total = row['paginas_processadas'], row['num_paginas']
+        job = {
+            'job_id': row['id'],
+            'status': row['status'],
+            'nome_arquivo': row['nome_arquivo'],
+            'tentativas': row['tentativas'],
+            'progresso': {
+                'paginas_processadas': done,
+                'num_paginas': total,
+                'percentual': round(100 * done / total, 1) if total else None
+            },
+            'criado_em': self._timestamp(row['criado_em']),
+            'iniciado_em': self._timestamp(row['iniciado_em']),
+            'concluido_em': self._timestamp(row['concluido_em']),
+            'callback': {'url': row['callback_url'], 'status': row['callback_status']}
+            if row['callback_url'] else None
+        }
+        if row['resultado'] is not None:
+            job['resultado'] = json.loads(row['resultado'])
+        if row['erro'] is not None:
+            job['erro'] = json.loads(row['erro'])
+        return job
+
+
+if __name__ == "__main__":
+    # Exemplo de uso: contagem de jobs por status
+    queue = JobQueue(
+        os.getenv("JOBS_PATH", "./storage/jobs/jobs.db"),
+        os.getenv("JOBS_FILES_PATH", "./storage/jobs/arquivos"),
+        runner=lambda *args, **kwargs: {}
+    )
+    print(json.dumps(queue.stats(), indent=2, ensure_ascii=False))
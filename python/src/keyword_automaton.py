@@ -0,0 +1,185 @@
+"""
+JurisPilot - Autômato de Palavras-chave
+Localiza todas as ocorrências de um conjunto de palavras-chave (sem diferenciar
+maiúsculas nem acentos) em uma única passada sobre o texto
+"""
+
+import re
+import unicodedata
+from typing import Dict, Iterable, List, NamedTuple, Optional, Union
+
+
+class KeywordHit(NamedTuple):
+    """Ocorrência de uma palavra-chave no texto"""
+    rotulo: str    # rótulo da tabela (ex: tipo de documento)
+    palavra: str   # palavra-chave como cadastrada
+    inicio: int    # posição inicial no texto
+    fim: int       # posição final no texto
+
+
+def _build_fold_table() -> bytes:
+    """Tabela Latin-1 -> Latin-1 que remove acentos (á -> a, ç -> c, º -> o)"""
+    table = bytearray(range(256))
+    for code in range(128, 256):
+        base = ''.join(
+            char for char in unicodedata.normalize('NFKD', chr(code))
+            if not unicodedata.combining(char)
+        )
+        if len(base) == 1 and ord(base) < 128:
+            table[code] = ord(base.lower())
+    return bytes(table)
+
+
+_FOLD_TABLE = _build_fold_table()
+_END = ''  # marca, no trie, os nós onde termina uma palavra-chave
+
+
+class KeywordAutomaton:
+    """
+    Autômato de múltiplas palavras-chave construído uma vez a partir de uma tabela
+
+    As palavras-chave formam um trie, compilado em uma única expressão regular
+    (ex: certid(?:ao(?: de (?:casamento|nascimento))?)) percorrida pelo motor
+    de regex em C. Cada posição onde alguma palavra começa é visitada uma vez;
+    o caminho reconhecido no trie fornece todas as palavras que começam ali,
+    inclusive as sobrepostas ("certidão" e "certidão de nascimento").
+    """
+
+    # Peso extra de uma ocorrência no início do texto (decai até 0 no fim)
+    POSITION_WEIGHT = 1.0
+
+    def __init__(self, keywords: Dict[str, Iterable[str]], word_boundary: Union[bool, Iterable[str]] = False):
+        """
+        Constrói o autômato
+
+        Args:
+            keywords: Rótulo -> palavras-chave (a ordem dos rótulos desempata a pontuação)
+            word_boundary: Só aceita ocorrências que sejam palavras inteiras; True
+                vale para todas as palavras-chave e uma coleção, só para as listadas
+                (ex: siglas curtas como "rg", que aparecem dentro de outras palavras)
+        """
+        if isinstance(word_boundary, bool):
+            bounded = None
+        else:
+            bounded = {self.fold(word) for word in word_boundary}
+        self.word_boundary = word_boundary
+        self.labels = list(keywords)
+        self._order = {label: index for index, label in enumerate(self.labels)}
+        self._trie: Dict = {}
+        for label, words in keywords.items():
+            for word in words:
+                folded = self.fold(word)
+                if not folded:
+                    continue
+                node = self._trie
+                for char in folded:
+                    node = node.setdefault(char, {})
+                whole_word = word_boundary if bounded is None else folded in bounded
+                node.setdefault(_END, []).append((label, word, whole_word))
+
+        self._pattern = re.compile(self._trie_regex(self._trie)) if self._trie else None
+
+    @staticmethod
+    def fold(text: str) -> str:
+        """Minúsculas sem acentos, preservando as posições dos caracteres"""
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            # Raros caracteres cuja minúscula tem outro tamanho (ex: İ) ficam como estão
+            lowered = ''.join(char.lower() if len(char.lower()) == 1 else char for char in text)
+        if lowered.isascii():
+            return lowered
+        # Um byte por caractere (fora do Latin-1 vira "?") e remoção de acentos em C
+        return lowered.encode('latin-1', 'replace').translate(_FOLD_TABLE).decode('latin-1')
+
+    @property
+    def pattern(self) -> str:
+        """Expressão regular do trie, para o texto dobrado por fold ('' sem palavras-chave)"""
+        return self._pattern.pattern if self._pattern else ''
+
+    @classmethod
+    def _trie_regex(cls, node: Dict) -> str:
+        """Converte um nó do trie em expressão regular (caminhos mais longos primeiro)"""
+        branches = [
+            re.escape(char) + cls._trie_regex(child)
+            for char, child in sorted(node.items()) if char != _END
+        ]
+        if not branches:
+            return ''
+        pattern = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if _END in node:
+            # Palavra mais curta termina aqui: o restante é opcional (guloso)
+            pattern = '(?:' + pattern + ')?'
+        return pattern
+
+    def find_all(self, text: str, longest_only: bool = False) -> List[KeywordHit]:
+        """
+        Todas as ocorrências das palavras-chave, na ordem do texto
+
+        Args:
+            text: Texto a examinar
+            longest_only: Descarta ocorrências contidas em outra mais longa
+                (ex: "pagamento" dentro de "comprovante de pagamento")
+        """
+        if not self._pattern or not text:
+            return []
+
+        folded = self.fold(text)
+        search = self._pattern.search
+        hits = []
+        pos = 0
+        match = search(folded, pos)
+        while match:
+            start = match.start()
+            node = self._trie
+            for offset, char in enumerate(match.group(), start + 1):
+                node = node[char]
+                for label, word, whole_word in node.get(_END, ()):
+                    if not whole_word or self._is_word(folded, start, offset):
+                        hits.append(KeywordHit(label, word, start, offset))
+            pos = start + 1
+            match = search(folded, pos)
+
+        if longest_only:
+            hits = self._longest(hits)
+        return hits
+
+    @staticmethod
+    def _is_word(folded: str, start: int, end: int) -> bool:
+        """A ocorrência não está colada a outras letras ou dígitos"""
+        return ((start == 0 or not folded[start - 1].isalnum())
+                and (end == len(folded) or not folded[end].isalnum()))
+
+    @staticmethod
+    def _longest(hits: List[KeywordHit]) -> List[KeywordHit]:
+        """Remove ocorrências contidas em outra mais longa"""
+        kept = []
+        max_end = -1
+        for hit in sorted(hits, key=lambda hit: (hit.inicio, -hit.fim)):
+            if hit.fim > max_end:
+                kept.append(hit)
+                max_end = hit.fim
+            elif kept and (hit.inicio, hit.fim) == (kept[-1].inicio, kept[-1].fim):
+                # Mesma palavra cadastrada em mais de um rótulo
+                kept.append(hit)
+        return kept
+
+    def scores(self, text: str, hits: Optional[List[KeywordHit]] = None) -> Dict[str, float]:
+        """
+        Pontuação de cada rótulo encontrado: uma unidade por ocorrência (mais
+        longa), mais um peso que favorece ocorrências próximas do início
+        """
+        if hits is None:
+            hits = self.find_all(text, longest_only=True)
+        length = max(len(text), 1)
+        scores: Dict[str, float] = {}
+        for hit in hits:
+            weight = 1.0 + self.POSITION_WEIGHT * (1 - hit.inicio / length)
+            scores[hit.rotulo] = scores.get(hit.rotulo, 0.0) + weight
+        return scores
+
+    def best(self, text: str, hits: Optional[List[KeywordHit]] = None) -> Optional[str]:
+        """Rótulo de maior pontuação (empates pela ordem da tabela) ou None"""
+        scores = self.scores(text, hits)
+        if not scores:
+            return None
+        return max(scores, key=lambda label: (scores[label], -self._order[label]))
@@ -0,0 +1,318 @@
+"""
+JurisPilot - Motor de OCR
+Executa OCR de páginas em paralelo usando processos de longa duração que
+carregam o modelo de idioma do Tesseract uma única vez (com tesserocr; sem
+ele, o pytesseract inicia um processo tesseract por imagem)
+"""
+
+import os
+import queue
+import threading
+import multiprocessing
+from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+import pytesseract
+from loguru import logger
+from image_preprocessing import ImagePreprocessor
+
+try:
+    import tesserocr
+except ImportError:  # dependência opcional
+    tesserocr = None
+
+
+class OCREngine:
+    """Interface dos motores de OCR"""
+
+    name = 'base'
+
+    def recognize(self, image) -> Dict:
+        """
+        Executa OCR de uma imagem (PIL.Image ou caminho de arquivo)
+
+        Returns:
+            Dict com 'texto' e 'confianca' (média das palavras, 0-100; None se não há palavras)
+        """
+        raise NotImplementedError
+
+
+def _mean_confidence(confidences: List[float]) -> Optional[float]:
+    """Média das confianças válidas das palavras"""
+    valid = [conf for conf in confidences if conf >= 0]
+    return round(sum(valid) / len(valid), 2) if valid else None
+
+
+class PytesseractEngine(OCREngine):
+    """OCR via pytesseract (inicia um processo tesseract por imagem)"""
+
+    name = 'pytesseract'
+
+    def __init__(self, lang: str):
+        self.lang = lang
+
+    def recognize(self, image) -> Dict:
+        data = pytesseract.image_to_data(image, lang=self.lang, output_type=pytesseract.Output.DICT)
+
+        # Reconstrói o texto (linhas e parágrafos) a partir das palavras
+        lines = []
+        confidences = []
+        current_key = None
+        current_par = None
+        for i, word in enumerate(data['text']):
+            if not word or not word.strip():
+                continue
+            confidences.append(float(data['conf'][i]))
+            par = (data['block_num'][i], data['par_num'][i])
+            key = par + (data['line_num'][i],)
+            if key != current_key:
+                if current_par is not None and par != current_par:
+                    lines.append('')
+                lines.append(word)
+                current_key, current_par = key, par
+            else:
+                lines[-1] += ' ' + word
+
+        return {'texto': '\n'.join(lines), 'confianca': _mean_confidence(confidences)}
+
+
+class TesserocrEngine(OCREngine):
+    """OCR via API C do Tesseract (tesserocr); o modelo de idioma é carregado uma vez"""
+
+    name = 'tesserocr'
+
+    def __init__(self, lang: str):
+        self.api = tesserocr.PyTessBaseAPI(lang=lang)
+
+    def recognize(self, image) -> Dict:
+        if isinstance(image, (str, os.PathLike)):
+            self.api.SetImageFile(str(image))
+        else:
+            self.api.SetImage(image)
+        text = self.api.GetUTF8Text()
+        return {'texto': text, 'confianca': _mean_confidence(self.api.AllWordConfidences())}
+
+
+def create_engine(lang: str, engine: str = 'auto') -> OCREngine:
+    """
+    Cria o motor de OCR
+
+    Args:
+        lang: Idioma do Tesseract
+        engine: 'auto' (tesserocr se instalado), 'tesserocr' ou 'pytesseract'
+    """
+    if engine in ('auto', 'tesserocr') and tesserocr is not None:
+        try:
+            return TesserocrEngine(lang)
+        except Exception as e:
+            logger.warning(f"tesserocr indisponível, usando pytesseract: {e}")
+    elif engine == 'tesserocr':
+        logger.warning("tesserocr não instalado, usando pytesseract")
+    return PytesseractEngine(lang)
+
+
+def _worker_main(conn, lang: str, engine_name: str, tesseract_cmd: Optional[str],
+                 preprocess: Optional[Dict]):
+    """Laço de um processo de OCR: carrega o motor uma vez e atende pedidos pelo pipe"""
+    if tesseract_cmd:
+        pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+    # Cada processo já ocupa um núcleo; evita que o Tesseract abra threads extras
+    os.environ['OMP_THREAD_LIMIT'] = '1'
+
+    engine = create_engine(lang, engine_name)
+    preprocessor = ImagePreprocessor(**preprocess) if preprocess else None
+
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            break
+        if message is None:
+            break
+
+        kind, payload = message
+        if kind == 'ping':
+            conn.send(('pong', engine.name))
+            continue
+
+        try:
+            if preprocessor:
+                payload = preprocessor.apply(payload)
+            conn.send(('ok', engine.recognize(payload)))
+        except Exception as e:
+            conn.send(('erro', str(e)))
+
+
+class _OCRWorker:
+    """Processo de OCR e a ponta do pipe usada para conversar com ele"""
+
+    def __init__(self, lang: str, engine_name: str, preprocess: Optional[Dict]):
+        self.conn, child_conn = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(
+            target=_worker_main,
+            args=(child_conn, lang, engine_name, pytesseract.pytesseract.tesseract_cmd, preprocess),
+            daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.jobs = 0
+
+    def request(self, message, timeout: Optional[float]):
+        """Envia um pedido e aguarda a resposta"""
+        self.conn.send(message)
+        if not self.conn.poll(timeout):
+            raise TimeoutError(f"Processo de OCR {self.process.pid} não respondeu em {timeout}s")
+        return self.conn.recv()
+
+    def stop(self, timeout: float = 5):
+        """Encerra o processo (educadamente e, se preciso, à força)"""
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class OCRPool:
+    """
+    Pool de processos de OCR de longa duração
+
+    Cada processo carrega o motor de OCR (e o modelo de idioma, quando o
+    tesserocr está disponível) uma única vez e recebe imagens pelo pipe.
+    Processos são reiniciados após max_jobs tarefas e substituídos quando
+    morrem ou não respondem.
+    """
+
+    def __init__(self, workers: int = 0, lang: str = 'por', engine: str = 'auto',
+                 max_jobs: int = 200, job_timeout: Optional[float] = 300,
+                 preprocess: Optional[Dict] = None):
+        """
+        Inicializa o pool
+
+        Args:
+            workers: Número de processos (0 = número de CPUs)
+            lang: Idioma do Tesseract
+            engine: Motor de OCR ('auto', 'tesserocr' ou 'pytesseract')
+            max_jobs: Tarefas por processo antes de reiniciá-lo
+            job_timeout: Tempo máximo de OCR de uma imagem em segundos
+            preprocess: Opções do ImagePreprocessor aplicado antes do OCR (None = desligado)
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.lang = lang
+        self.engine = engine
+        self.max_jobs = max_jobs
+        self.job_timeout = job_timeout
+        self.preprocess = preprocess
+        if engine != 'pytesseract' and tesserocr is None:
+            logger.warning("tesserocr não instalado: o OCR usa pytesseract, que carrega o modelo "
+                           "de idioma a cada imagem (ver requirements.txt)")
+
+        self._lock = threading.Lock()
+        self._all: List[_OCRWorker] = []
+        self._idle: Optional[queue.Queue] = None
+        self._dispatcher: Optional[ThreadPoolExecutor] = None
+        logger.info(f"OCRPool inicializado com {self.workers} processo(s)")
+
+    def _start(self):
+        """Inicia os processos sob demanda e os reaproveita entre documentos"""
+        with self._lock:
+            if self._idle is not None:
+                return
+            self._idle = queue.Queue()
+            for _ in range(self.workers):
+                worker = _OCRWorker(self.lang, self.engine, self.preprocess)
+                self._all.append(worker)
+                self._idle.put(worker)
+            self._dispatcher = ThreadPoolExecutor(max_workers=self.workers)
+
+    def _replace(self, worker: _OCRWorker) -> _OCRWorker:
+        """Substitui um processo por um novo"""
+        worker.stop(timeout=1)
+        new_worker = _OCRWorker(self.lang, self.engine, self.preprocess)
+        with self._lock:
+            if worker in self._all:
+                self._all.remove(worker)
+            self._all.append(new_worker)
+        return new_worker
+
+    def _release(self, worker: _OCRWorker):
+        """Devolve o processo ao pool, reiniciando-o se atingiu o limite de tarefas"""
+        if worker.jobs >= self.max_jobs:
+            logger.debug(f"Reiniciando processo de OCR {worker.process.pid} após {worker.jobs} tarefas")
+            worker = self._replace(worker)
+        self._idle.put(worker)
+
+    def _run_job(self, image) -> Dict:
+        """Executa o OCR de uma imagem em um processo livre"""
+        for attempt in range(2):
+            worker = self._idle.get()
+            try:
+                status, payload = worker.request(('ocr', image), self.job_timeout)
+            except TimeoutError:
+                self._idle.put(self._replace(worker))
+                raise
+            except (EOFError, OSError) as e:
+                # Processo morreu durante a tarefa: substitui e tenta uma vez mais
+                logger.warning(f"Processo de OCR {worker.process.pid} falhou: {e}")
+                self._idle.put(self._replace(worker))
+                if attempt:
+                    raise
+                continue
+
+            worker.jobs += 1
+            self._release(worker)
+            if status == 'erro':
+                raise RuntimeError(payload)
+            return payload
+
+    def map(self, images: List) -> List[Dict]:
+        """
+        Executa OCR das imagens em paralelo mantendo a ordem das páginas
+
+        Returns:
+            Lista de Dicts com 'texto' e 'confianca' (ver OCREngine.recognize)
+        """
+        if not images:
+            return []
+        self._start()
+        return list(self._dispatcher.map(self._run_job, images))
+
+    def health_check(self, timeout: float = 5) -> List[Dict]:
+        """Verifica os processos livres (ping) e substitui os que não respondem"""
+        if self._idle is None:
+            return []
+
+        status = []
+        busy = self.workers
+        for _ in range(self.workers):
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            busy -= 1
+            try:
+                _, engine_name = worker.request(('ping', None), timeout)
+                status.append({'pid': worker.process.pid, 'motor': engine_name,
+                               'tarefas': worker.jobs, 'saudavel': True})
+            except (TimeoutError, EOFError, OSError):
+                logger.warning(f"Processo de OCR {worker.process.pid} não respondeu, substituindo")
+                status.append({'pid': worker.process.pid, 'tarefas': worker.jobs, 'saudavel': False})
+                worker = self._replace(worker)
+            self._idle.put(worker)
+
+        status.extend({'ocupado': True} for _ in range(busy))
+        return status
+
+    def shutdown(self):
+        """Encerra os processos do pool"""
+        with self._lock:
+            if self._dispatcher is not None:
+                self._dispatcher.shutdown(wait=True)
+            for worker in self._all:
+                worker.stop()
+            self._all = []
+            self._idle = None
+            self._dispatcher = None
@@ -0,0 +1,574 @@
+"""
+JurisPilot - Backends de Texto de PDF
+Extratores da camada de texto de PDFs (PyPDF2, pypdfium2, pdfminer.six e
+pdftotext do poppler) com a mesma interface, seleção do mais rápido por
+perfil de documento e o comando de calibração que faz essa escolha
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import hashlib
+import shutil
+import argparse
+import threading
+import subprocess
+from datetime import datetime
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Optional, Tuple, Type, Union
+import PyPDF2
+from pdf2image import pdfinfo_from_path
+from loguru import logger
+
+try:
+    import pypdfium2 as pdfium
+except ImportError:  # dependência opcional
+    pdfium = None
+
+# A PDFium não é thread-safe, nem entre documentos diferentes: sem a sandbox,
+# as threads do batch_executor e da JobQueue abrem PDFs ao mesmo tempo
+_PDFIUM_LOCK = threading.RLock()
+
+try:
+    from pdfminer.converter import TextConverter
+    from pdfminer.layout import LAParams
+    from pdfminer.pdfdocument import PDFDocument
+    from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+    from pdfminer.pdfpage import PDFPage
+    from pdfminer.pdfparser import PDFParser
+    from pdfminer.pdftypes import resolve1
+    from pdfminer.utils import decode_text
+except ImportError:  # dependência opcional
+    PDFParser = None
+
+# Tamanho de uma página A4 em pontos (usado quando o tamanho real é desconhecido)
+A4_POINTS = (595.0, 842.0)
+
+# Chaves de metadados do PDF registradas em metadados['pdf_metadata']
+METADATA_KEYS = ('title', 'author', 'subject', 'creator')
+
+
+class PDFTextDocument:
+    """PDF aberto por um backend: número de páginas, metadados e texto de cada página"""
+
+    num_pages: int = 0
+
+    def metadata(self) -> Dict[str, str]:
+        """Título, autor, assunto e criador (vazios quando ausentes)"""
+        return {key: '' for key in METADATA_KEYS}
+
+    def page_text(self, index: int) -> str:
+        """Texto da camada de texto da página (índice a partir de 0)"""
+        raise NotImplementedError
+
+    def page_size(self, index: int) -> Tuple[float, float]:
+        """Largura e altura da página em pontos"""
+        return A4_POINTS
+
+    def page_hasher(self, stream: BinaryIO) -> 'PDFPageHasher':
+        """Hashes de conteúdo das páginas (lidos com o PyPDF2, qualquer que seja o backend)"""
+        return PDFPageHasher(PyPDF2.PdfReader(stream))
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class PDFPageHasher:
+    """
+    Hash do conteúdo de cada página de um PDF
+
+    Combina os fluxos de conteúdo, os recursos usados pela página (fontes,
+    imagens e demais XObjects, em bytes como gravados no arquivo) e a
+    geometria (MediaBox, CropBox, Rotate). A mesma página em outra versão do
+    documento tem o mesmo hash, ainda que os objetos mudem de número.
+    """
+
+    PAGE_KEYS = ('/Contents', '/Resources', '/MediaBox', '/CropBox', '/Rotate')
+
+    def __init__(self, reader: PyPDF2.PdfReader):
+        self.reader = reader
+        # Resumo de cada objeto indireto já visto (fontes e imagens compartilhadas entre páginas)
+        self._objects: Dict[Tuple[int, int], bytes] = {}
+
+    def page_hash(self, index: int) -> Optional[str]:
+        """SHA-256 do conteúdo da página (índice a partir de 0) ou None se não puder ser lida"""
+        try:
+            page = self.reader.pages[index]
+            sha256 = hashlib.sha256()
+            for key in self.PAGE_KEYS:
+                if key in page:
+                    sha256.update(key.encode('latin-1'))
+                    sha256.update(self._digest(page.raw_get(key)))
+            return sha256.hexdigest()
+        except Exception as e:
+            logger.debug(f"Hash da página {index + 1} indisponível: {e}")
+            return None
+
+    def _digest(self, value) -> bytes:
+        """Resumo de um objeto PDF (objetos indiretos são resolvidos uma única vez)"""
+        if isinstance(value, PyPDF2.generic.IndirectObject):
+            ref = (value.idnum, value.generation)
+            if ref not in self._objects:
+                # Marca provisória: referências circulares não entram em laço
+                self._objects[ref] = b'R'
+                self._objects[ref] = self._digest(value.get_object())
+            return self._objects[ref]
+
+        sha256 = hashlib.sha256()
+        if isinstance(value, PyPDF2.generic.DictionaryObject):
+            for key in sorted(value):
+                if key != '/Parent':
+                    sha256.update(key.encode('latin-1'))
+                    sha256.update(self._digest(value.raw_get(key)))
+            if isinstance(value, PyPDF2.generic.StreamObject):
+                # Bytes do fluxo como gravados no arquivo, sem descompactar
+                sha256.update(value._data or b'')
+        elif isinstance(value, PyPDF2.generic.ArrayObject):
+            for item in value:
+                sha256.update(self._digest(item))
+        else:
+            sha256.update(repr(value).encode('utf-8', 'replace'))
+        return sha256.digest()
+
+
+class PDFTextBackend:
+    """Extrator da camada de texto de PDFs"""
+
+    name = ''
+    # O backend lê o arquivo pelo caminho (ferramentas externas) em vez de um fluxo binário
+    needs_path = False
+
+    @classmethod
+    def available(cls) -> bool:
+        """Dependências do backend instaladas"""
+        return True
+
+    def open(self, source: Union[str, BinaryIO]) -> PDFTextDocument:
+        """
+        Abre o PDF
+
+        Args:
+            source: Caminho (needs_path) ou fluxo binário posicionado no início
+        """
+        raise NotImplementedError
+
+
+BACKENDS: Dict[str, Type[PDFTextBackend]] = {}
+
+
+def register_backend(cls: Type[PDFTextBackend]) -> Type[PDFTextBackend]:
+    """Registra um backend pelo nome (decorador)"""
+    BACKENDS[cls.name] = cls
+    return cls
+
+
+def available_backends() -> List[str]:
+    """Nomes dos backends registrados cujas dependências estão instaladas"""
+    return [name for name, cls in BACKENDS.items() if cls.available()]
+
+
+class _PyPDF2Document(PDFTextDocument):
+
+    def __init__(self, stream: BinaryIO):
+        self.reader = PyPDF2.PdfReader(stream)
+        self.num_pages = len(self.reader.pages)
+
+    def metadata(self) -> Dict[str, str]:
+        info = self.reader.metadata or {}
+        return {key: info.get('/' + key.capitalize(), '') or '' for key in METADATA_KEYS}
+
+    def page_text(self, index: int) -> str:
+        return self.reader.pages[index].extract_text() or ''
+
+    def page_size(self, index: int) -> Tuple[float, float]:
+        try:
+            mediabox = self.reader.pages[index].mediabox
+            return float(mediabox.width), float(mediabox.height)
+        except Exception:
+            return A4_POINTS
+
+    def page_hasher(self, stream: BinaryIO) -> 'PDFPageHasher':
+        return PDFPageHasher(self.reader)
+
+
+@register_backend
+class PyPDF2Backend(PDFTextBackend):
+    """PyPDF2 (Python puro, sempre disponível)"""
+
+    name = 'pypdf2'
+
+    def open(self, source) -> PDFTextDocument:
+        return _PyPDF2Document(source)
+
+
+class _PdfiumDocument(PDFTextDocument):
+    """Documento da PDFium; toda chamada à biblioteca passa por _PDFIUM_LOCK"""
+
+    def __init__(self, stream: BinaryIO):
+        with _PDFIUM_LOCK:
+            self.pdf = pdfium.PdfDocument(stream)
+            self.num_pages = len(self.pdf)
+
+    def metadata(self) -> Dict[str, str]:
+        with _PDFIUM_LOCK:
+            info = self.pdf.get_metadata_dict()
+        return {key: info.get(key.capitalize(), '') or '' for key in METADATA_KEYS}
+
+    def page_text(self, index: int) -> str:
+        with _PDFIUM_LOCK:
+            page = self.pdf[index]
+            try:
+                textpage = page.get_textpage()
+                try:
+                    return textpage.get_text_range().replace('\r\n', '\n')
+                finally:
+                    textpage.close()
+            finally:
+                page.close()
+
+    def page_size(self, index: int) -> Tuple[float, float]:
+        with _PDFIUM_LOCK:
+            page = self.pdf[index]
+            try:
+                return tuple(page.get_size())
+            finally:
+                page.close()
+
+    def close(self):
+        with _PDFIUM_LOCK:
+            self.pdf.close()
+
+
+@register_backend
+class PdfiumBackend(PDFTextBackend):
+    """pypdfium2 (PDFium, em C++)"""
+
+    name = 'pypdfium2'
+
+    @classmethod
+    def available(cls) -> bool:
+        return pdfium is not None
+
+    def open(self, source) -> PDFTextDocument:
+        return _PdfiumDocument(source)
+
+
+class _PdfminerDocument(PDFTextDocument):
+
+    def __init__(self, stream: BinaryIO):
+        self.document = PDFDocument(PDFParser(stream))
+        self.pages = list(PDFPage.create_pages(self.document))
+        self.num_pages = len(self.pages)
+        self.resources = PDFResourceManager(caching=True)
+        self.laparams = LAParams()
+
+    def metadata(self) -> Dict[str, str]:
+        info = resolve1(self.document.info[0]) if self.document.info else {}
+        metadata = {}
+        for key in METADATA_KEYS:
+            value = resolve1(info.get(key.capitalize(), b''))
+            metadata[key] = decode_text(value) if isinstance(value, bytes) else str(value or '')
+        return metadata
+
+    def page_text(self, index: int) -> str:
+        output = io.StringIO()
+        device = TextConverter(self.resources, output, laparams=self.laparams)
+        try:
+            PDFPageInterpreter(self.resources, device).process_page(self.pages[index])
+        finally:
+            device.close()
+        return output.getvalue().rstrip('\f')
+
+    def page_size(self, index: int) -> Tuple[float, float]:
+        x0, y0, x1, y1 = self.pages[index].mediabox
+        return float(x1 - x0), float(y1 - y0)
+
+
+@register_backend
+class PdfminerBackend(PDFTextBackend):
+    """pdfminer.six (Python puro, análise de layout)"""
+
+    name = 'pdfminer'
+
+    @classmethod
+    def available(cls) -> bool:
+        return PDFParser is not None
+
+    def open(self, source) -> PDFTextDocument:
+        return _PdfminerDocument(source)
+
+
+class _PdftotextDocument(PDFTextDocument):
+
+    def __init__(self, file_path: str, chunk_pages: int, timeout: int):
+        self.file_path = file_path
+        self.chunk_pages = chunk_pages
+        self.timeout = timeout
+        self.info = pdfinfo_from_path(file_path)
+        self.num_pages = int(self.info['Pages'])
+        self._texts: Dict[int, str] = {}
+
+    def metadata(self) -> Dict[str, str]:
+        return {key: self.info.get(key.capitalize(), '') for key in METADATA_KEYS}
+
+    def page_text(self, index: int) -> str:
+        if index not in self._texts:
+            # Um processo por bloco de páginas; as páginas vêm separadas por \f
+            first = index + 1
+            last = min(index + self.chunk_pages, self.num_pages)
+            output = subprocess.run(
+                ['pdftotext', '-enc', 'UTF-8', '-f', str(first), '-l', str(last), self.file_path, '-'],
+                capture_output=True, check=True, timeout=self.timeout
+            ).stdout.decode('utf-8', errors='replace')
+            self._texts = dict(enumerate(output.split('\f')[:last - first + 1], index))
+        return self._texts.get(index, '')
+
+    def page_size(self, index: int) -> Tuple[float, float]:
+        # pdfinfo informa o tamanho da primeira página (ex: "595.276 x 841.89 pts (A4)")
+        try:
+            width, _, height = self.info['Page size'].split()[:3]
+            return float(width), float(height)
+        except (KeyError, ValueError):
+            return A4_POINTS
+
+
+@register_backend
+class PdftotextBackend(PDFTextBackend):
+    """pdftotext do poppler (processo externo, quando instalado)"""
+
+    name = 'pdftotext'
+    needs_path = True
+
+    # Páginas extraídas por execução do pdftotext e tempo máximo de cada execução
+    CHUNK_PAGES = 32
+    TIMEOUT = 120
+
+    @classmethod
+    def available(cls) -> bool:
+        return shutil.which('pdftotext') is not None
+
+    def open(self, source) -> PDFTextDocument:
+        return _PdftotextDocument(source, self.CHUNK_PAGES, self.TIMEOUT)
+
+
+class PDFBackendSelector:
+    """
+    Escolhe o backend de texto de cada PDF
+
+    Com backend 'auto', usa o backend registrado na calibração para o perfil
+    do documento (faixa de tamanho do arquivo) e PyPDF2 nos perfis não
+    calibrados ou cujo backend não está instalado. Um nome de backend fixa
+    o mesmo para todos os documentos.
+    """
+
+    DEFAULT_BACKEND = 'pypdf2'
+
+    # Perfis por tamanho do arquivo: (nome, limite superior em bytes)
+    PROFILES = [
+        ('pequeno', 1024 * 1024),
+        ('medio', 10 * 1024 * 1024),
+        ('grande', None)
+    ]
+
+    def __init__(self, backend: str = 'auto', calibration_path: Optional[str] = None):
+        """
+        Inicializa o seletor
+
+        Args:
+            backend: 'auto' ou nome de um backend registrado
+            calibration_path: Arquivo JSON gravado pelo comando de calibração
+        """
+        self.backend = backend
+        self.choices: Dict[str, str] = {}
+        self._instances: Dict[str, PDFTextBackend] = {}
+
+        if backend != 'auto':
+            if backend not in BACKENDS or not BACKENDS[backend].available():
+                logger.warning(f"Backend de PDF '{backend}' indisponível, usando {self.DEFAULT_BACKEND}")
+                self.backend = self.DEFAULT_BACKEND
+        elif calibration_path and os.path.exists(calibration_path):
+            self.choices = self._load_choices(calibration_path)
+
+    @staticmethod
+    def _load_choices(calibration_path: str) -> Dict[str, str]:
+        """Backend escolhido por perfil na calibração (apenas os instalados)"""
+        try:
+            with open(calibration_path, 'r', encoding='utf-8') as file:
+                profiles = json.load(file).get('perfis', {})
+        except (OSError, ValueError) as e:
+            logger.warning(f"Calibração de backends de PDF ignorada ({calibration_path}): {e}")
+            return {}
+
+        choices = {}
+        for profile, data in profiles.items():
+            name = data.get('backend')
+            if name in BACKENDS and BACKENDS[name].available():
+                choices[profile] = name
+            else:
+                logger.warning(f"Backend de PDF '{name}' (perfil {profile}) indisponível")
+        return choices
+
+    @classmethod
+    def profile_for(cls, size: int) -> str:
+        """Perfil do documento a partir do tamanho do arquivo em bytes"""
+        for name, limit in cls.PROFILES:
+            if limit is None or size < limit:
+                return name
+        return cls.PROFILES[-1][0]
+
+    def name_for(self, size: int) -> str:
+        """Nome do backend usado para um arquivo deste tamanho"""
+        if self.backend != 'auto':
+            return self.backend
+        return self.choices.get(self.profile_for(size), self.DEFAULT_BACKEND)
+
+    def select(self, size: int) -> PDFTextBackend:
+        """Backend usado para um arquivo deste tamanho"""
+        return self.get(self.name_for(size))
+
+    def get(self, name: str) -> PDFTextBackend:
+        """Instância (compartilhada) de um backend registrado"""
+        if name not in self._instances:
+            self._instances[name] = BACKENDS[name]()
+        return self._instances[name]
+
+    def signature(self) -> Dict:
+        """Escolhas que influenciam o texto extraído (parte da chave do cache)"""
+        if self.backend != 'auto':
+            return {'backend': self.backend}
+        return {
+            profile: self.choices.get(profile, self.DEFAULT_BACKEND)
+            for profile, _ in self.PROFILES
+        }
+
+
+def _extract_all(backend: PDFTextBackend, file_path: str) -> List[str]:
+    """Texto de todas as páginas de um PDF com um backend"""
+    if backend.needs_path:
+        with backend.open(file_path) as document:
+            return [document.page_text(index) for index in range(document.num_pages)]
+    with open(file_path, 'rb') as stream, backend.open(stream) as document:
+        return [document.page_text(index) for index in range(document.num_pages)]
+
+
+def calibrate(corpus: List[str], backends: Optional[List[str]] = None, repeats: int = 1,
+              usable_margin: float = 0.02, min_word_ratio: float = 0.9) -> Dict:
+    """
+    Mede os backends em um corpus de PDFs e escolhe o mais rápido aceitável por perfil
+
+    Um backend é aceitável em um perfil quando não falha em nenhum documento,
+    sua fração de páginas com camada de texto aproveitável fica a no máximo
+    usable_margin da melhor e extrai ao menos min_word_ratio das palavras
+    do backend que mais extraiu.
+
+    Args:
+        corpus: Caminhos dos PDFs de amostra
+        backends: Backends medidos (padrão: todos os instalados)
+        repeats: Repetições por documento (vale o menor tempo)
+
+    Returns:
+        Dict com 'calibrado_em' e, por perfil, o backend escolhido e as medições
+    """
+    # Importado aqui: document_processor depende deste módulo
+    from document_processor import DocumentProcessor
+
+    backends = backends or available_backends()
+    by_profile: Dict[str, List[str]] = {}
+    for file_path in corpus:
+        by_profile.setdefault(PDFBackendSelector.profile_for(os.path.getsize(file_path)), []).append(file_path)
+
+    profiles = {}
+    for profile, files in by_profile.items():
+        results = {}
+        for name in backends:
+            backend = BACKENDS[name]()
+            elapsed, pages, usable, words, failures = 0.0, 0, 0, 0, 0
+            for file_path in files:
+                best = float('inf')
+                try:
+                    for _ in range(repeats):
+                        start = time.perf_counter()
+                        texts = _extract_all(backend, file_path)
+                        best = min(best, time.perf_counter() - start)
+                except Exception as e:
+                    logger.warning(f"Backend {name} falhou em {file_path}: {e}")
+                    failures += 1
+                    continue
+                elapsed += best
+                pages += len(texts)
+                usable += sum(1 for text in texts if DocumentProcessor._has_usable_text_layer(text))
+                words += sum(len(text.split()) for text in texts)
+            results[name] = {
+                'tempo': round(elapsed, 4),
+                'paginas': pages,
+                'paginas_aproveitaveis': round(usable / pages, 4) if pages else 0.0,
+                'palavras': words,
+                'falhas': failures
+            }
+
+        best_usable = max(result['paginas_aproveitaveis'] for result in results.values())
+        most_words = max(result['palavras'] for result in results.values())
+        for result in results.values():
+            result['aceitavel'] = (
+                result['falhas'] == 0
+                and result['paginas_aproveitaveis'] >= best_usable - usable_margin
+                and result['palavras'] >= min_word_ratio * most_words
+            )
+
+        acceptable = [name for name, result in results.items() if result['aceitavel']]
+        chosen = min(acceptable, key=lambda name: results[name]['tempo']) if acceptable else None
+        profiles[profile] = {
+            'backend': chosen or PDFBackendSelector.DEFAULT_BACKEND,
+            'documentos': len(files),
+            'resultados': results
+        }
+        logger.info(f"Perfil {profile}: {profiles[profile]['backend']} ({len(files)} documento(s))")
+
+    return {'calibrado_em': datetime.now().isoformat(timespec='seconds'), 'perfis': profiles}
+
+
+def main(argv: Optional[List[str]] = None):
+    """Comando de calibração: python pdf_backends.py <corpus> [--saida arquivo.json]"""
+    from config import get_settings
+
+    parser = argparse.ArgumentParser(description="Calibra os backends de texto de PDF em um corpus de amostra")
+    parser.add_argument('corpus', help="Diretório com PDFs de amostra (busca recursiva)")
+    parser.add_argument('--saida', default=None,
+                        help="Arquivo JSON da calibração (padrão: PDF_CALIBRATION_PATH)")
+    parser.add_argument('--backends', default=None, help="Backends a medir, separados por vírgula")
+    parser.add_argument('--repeticoes', type=int, default=1)
+    args = parser.parse_args(argv)
+
+    corpus = sorted(str(path) for path in Path(args.corpus).rglob('*.pdf'))
+    if not corpus:
+        parser.error(f"Nenhum PDF encontrado em {args.corpus}")
+
+    backends = args.backends.split(',') if args.backends else None
+    unknown = [name for name in backends or [] if name not in BACKENDS or not BACKENDS[name].available()]
+    if unknown:
+        parser.error(f"Backends indisponíveis: {', '.join(unknown)} (instalados: {', '.join(available_backends())})")
+    result = calibrate(corpus, backends=backends, repeats=args.repeticoes)
+
+    output = Path(args.saida or get_settings().pdf.calibration_path)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding='utf-8')
+
+    print(f"{'perfil':>8} {'backend':>10} {'tempo (s)':>10} {'aproveit.':>10} {'palavras':>9} {'aceitável':>10}")
+    for profile, data in result['perfis'].items():
+        for name, measured in data['resultados'].items():
+            marker = ' *' if name == data['backend'] else ''
+            print(f"{profile:>8} {name:>10} {measured['tempo']:>10.3f} {measured['paginas_aproveitaveis']:>10.2f} "
+                  f"{measured['palavras']:>9} {str(measured['aceitavel']):>10}{marker}")
+    print(f"Calibração gravada em {output}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -6,6 +6,7 @@ Classifica documentos como provas jurídicas e atribui relevância
 from typing import Dict, List, Optional
 from enum import Enum
 from loguru import logger
+from keyword_automaton import KeywordAutomaton
 
 
 class TipoProva(Enum):
@@ -45,6 +46,14 @@ class ProofClassifier:
         'vistoria', 'inspecao'
     ]
     
+    # Autômato das tabelas acima (a ordem desempata: "laudo" é documento oficial)
+    PROOF_TYPE_AUTOMATON = KeywordAutomaton({
+        TipoProva.DOCUMENTO_OFICIAL.value: DOCUMENTOS_OFICIAIS,
+        TipoProva.COMPROVANTE_FINANCEIRO.value: COMPROVANTES_FINANCEIROS,
+        TipoProva.CONVERSA.value: CONVERSAS,
+        TipoProva.PROVA_TECNICA.value: PROVAS_TECNICAS
+    })
+    
     def __init__(self):
         """Inicializa o classificador de provas"""
         logger.info("ProofClassifier inicializado")
@@ -84,22 +93,14 @@ class ProofClassifier:
     
     def _determine_proof_type(self, tipo_documento: str, texto: str) -> TipoProva:
         """Determina o tipo de prova baseado no documento"""
-        tipo_lower = tipo_documento.lower()
-        
-        # Verifica documentos oficiais
-        if any(doc in tipo_lower for doc in self.DOCUMENTOS_OFICIAIS):
-            return TipoProva.DOCUMENTO_OFICIAL
-        
-        # Verifica comprovantes financeiros
-        if any(comp in tipo_lower for comp in self.COMPROVANTES_FINANCEIROS):
-            return TipoProva.COMPROVANTE_FINANCEIRO
-        
-        # Verifica conversas
-        if any(conv in tipo_lower for conv in self.CONVERSAS):
-            return TipoProva.CONVERSA
-        
-        # Verifica provas técnicas
-        if any(tec in tipo_lower or tec in texto for tec in self.PROVAS_TECNICAS):
+        # Tipo do documento: categoria de maior pontuação
+        tipo_prova = self.PROOF_TYPE_AUTOMATON.best(tipo_documento)
+        if tipo_prova:
+            return TipoProva(tipo_prova)
+        
+        # Pelo texto, apenas provas técnicas (ex: laudo, perícia)
+        hits = self.PROOF_TYPE_AUTOMATON.find_all(texto)
+        if any(hit.rotulo == TipoProva.PROVA_TECNICA.value for hit in hits):
             return TipoProva.PROVA_TECNICA
         
         return TipoProva.OUTRO
@@ -0,0 +1,148 @@
+"""
+JurisPilot - Varredor de Texto
+Identifica CPF, CNPJ, e-mail, telefone, valores monetários e datas em uma
+única passada sobre o texto com um padrão pré-compilado
+"""
+
+import re
+from bisect import bisect_left
+from operator import itemgetter
+from typing import List, NamedTuple, Optional
+
+
+class EntityMatch(NamedTuple):
+    """Entidade encontrada no texto"""
+    tipo: str            # cpf, cnpj, email, telefone, valor, data
+    valor: str           # trecho encontrado (para valores monetários, apenas o número)
+    inicio: int          # posição inicial no texto
+    fim: int             # posição final no texto
+    formato: Optional[str] = None  # formato da data (dd/mm/aaaa, dd-mm-aaaa, iso, extenso)
+
+
+# Número em formato brasileiro (1.234,56)
+_NUMBER = r'\d{1,3}(?:\.\d{3})*(?:,\d{2})?'
+
+
+class TextScanner:
+    """
+    Varre o texto uma única vez emitindo entidades tipadas com suas posições
+
+    As alternativas são testadas em ordem em cada posição; padrões mais longos
+    (CNPJ antes de CPF, datas antes de telefone) vêm primeiro para que um
+    trecho seja atribuído ao tipo mais específico. Cada trecho recebe um
+    único tipo (um CNPJ sem pontuação não é contado também como CPF) e
+    números dentro de um e-mail não são tratados como outras entidades.
+    """
+
+    # Quase todas as entidades começam por dígito ou "(": o lookahead descarta
+    # as demais posições sem testar cada alternativa. Sem re.IGNORECASE, que
+    # impede o motor de regex de buscar os prefixos literais rapidamente.
+    PATTERN = re.compile(
+        r'(?=[\d(])(?:'
+        r'(?P<cnpj>\d{2}\.?\d{3}\.?\d{3}/?\d{4}-?\d{2})'
+        r'|(?P<cpf>\d{3}\.?\d{3}\.?\d{3}-?\d{2})'
+        r'|(?P<data_barra>\d{2}/\d{2}/\d{4})'
+        r'|(?P<data_hifen>\d{2}-\d{2}-\d{4})'
+        r'|(?P<data_iso>\d{4}-\d{2}-\d{2})'
+        r'|(?P<data_extenso>\d{1,2}\s+de\s+\w+\s+de\s+\d{4})'
+        r'|(?P<telefone>\(?\d{2}\)?\s?\d{4,5}-?\d{4})'
+        r'|(?P<valor_reais>' + _NUMBER + r')\s*(?i:reais)'
+        r')'
+        r'|[Rr]\$\s*(?P<valor_rs>' + _NUMBER + r')'
+    )
+
+    # E-mails são localizados a partir de cada "@" (str.find) em vez de testar
+    # o padrão em todo início de palavra
+    EMAIL_PATTERN = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b')
+    EMAIL_LOCAL_CHARS = frozenset('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789._%+-')
+    EMAIL_DOMAIN_CHARS = frozenset('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789.-')
+
+    # Grupo do padrão -> (tipo, formato)
+    GROUPS = {
+        'cnpj': ('cnpj', None),
+        'cpf': ('cpf', None),
+        'data_barra': ('data', 'dd/mm/aaaa'),
+        'data_hifen': ('data', 'dd-mm-aaaa'),
+        'data_iso': ('data', 'iso'),
+        'data_extenso': ('data', 'extenso'),
+        'telefone': ('telefone', None),
+        'valor_rs': ('valor', None),
+        'valor_reais': ('valor', None),
+    }
+
+    # Ordem de preferência dos formatos de data
+    DATE_FORMATS = ['dd/mm/aaaa', 'dd-mm-aaaa', 'iso', 'extenso']
+
+    def scan(self, text: str) -> List[EntityMatch]:
+        """Retorna as entidades do texto na ordem em que aparecem"""
+        groups = self.GROUPS
+        matches = []
+        append = matches.append
+        for match in self.PATTERN.finditer(text):
+            group = match.lastgroup
+            start, end = match.span(group)
+            tipo, formato = groups[group]
+            append(EntityMatch(tipo, text[start:end], start, end, formato))
+
+        emails = self._scan_emails(text)
+        if not emails:
+            return matches
+
+        # E-mails prevalecem sobre entidades sobrepostas a eles
+        starts = [match.inicio for match in matches]
+        overlapped = set()
+        for email in emails:
+            index = bisect_left(starts, email.inicio)
+            if index and matches[index - 1].fim > email.inicio:
+                overlapped.add(index - 1)
+            while index < len(matches) and matches[index].inicio < email.fim:
+                overlapped.add(index)
+                index += 1
+        if overlapped:
+            matches = [match for index, match in enumerate(matches) if index not in overlapped]
+
+        # Intercala as duas listas já ordenadas
+        return sorted(matches + emails, key=itemgetter(2))
+
+    def _scan_emails(self, text: str) -> List[EntityMatch]:
+        """Localiza e-mails a partir de cada "@" do texto"""
+        emails = []
+        end = 0
+        at = text.find('@')
+        while at != -1:
+            if at >= end:
+                # Delimita a palavra em torno do "@" e aplica o padrão só nela
+                start = at
+                while start > end and text[start - 1] in self.EMAIL_LOCAL_CHARS:
+                    start -= 1
+                stop = at + 1
+                while stop < len(text) and text[stop] in self.EMAIL_DOMAIN_CHARS:
+                    stop += 1
+
+                match = self.EMAIL_PATTERN.search(text, start, stop)
+                if match:
+                    emails.append(EntityMatch('email', match.group(), match.start(), match.end()))
+                    end = match.end()
+            at = text.find('@', at + 1)
+        return emails
+
+    @staticmethod
+    def of_type(matches: List[EntityMatch], tipo: str) -> List[EntityMatch]:
+        """Filtra as entidades de um tipo"""
+        return [match for match in matches if match.tipo == tipo]
+
+    @classmethod
+    def preferred_dates(cls, matches: List[EntityMatch]) -> List[EntityMatch]:
+        """Primeira data de cada formato, na ordem de preferência (dd/mm/aaaa, dd-mm-aaaa, iso, extenso)"""
+        first = {}
+        for match in cls.of_type(matches, 'data'):
+            first.setdefault(match.formato, match)
+        return [first[formato] for formato in cls.DATE_FORMATS if formato in first]
+
+    @staticmethod
+    def parse_money(valor: str) -> Optional[float]:
+        """Converte um valor em formato brasileiro (1.234,56) para float"""
+        try:
+            return float(valor.replace('.', '').replace(',', '.'))
+        except ValueError:
+            return None
@@ -7,13 +7,20 @@ from typing import Dict, List, Optional
 from datetime import datetime
 from loguru import logger
 import json
+from date_engine import DateEngine, get_date_engine
 
 
 class TimelineGenerator:
     """Gera linha do tempo cronológica de casos jurídicos"""
     
-    def __init__(self):
-        """Inicializa o gerador de linha do tempo"""
+    def __init__(self, date_engine: Optional[DateEngine] = None):
+        """
+        Inicializa o gerador de linha do tempo
+        
+        Args:
+            date_engine: Motor de datas (usa a instância compartilhada se omitido)
+        """
+        self.date_engine = date_engine or get_date_engine()
         logger.info("TimelineGenerator inicializado")
     
     def generate_timeline(self, caso_info: Dict, documentos: List[Dict], 
@@ -84,23 +91,8 @@ class TimelineGenerator:
     def _sort_events_by_date(self, eventos: List[Dict]) -> List[Dict]:
         """Ordena eventos por data"""
         def get_date(evento):
-            data_str = evento.get('data_evento')
-            if isinstance(data_str, str):
-                try:
-                    # Tenta vários formatos
-                    for fmt in ['%Y-%m-%d', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M:%S', '%d/%m/%Y']:
-                        try:
-                            return datetime.strptime(data_str[:10], fmt)
-                        except:
-                            continue
-                    # Se não conseguir, usa data atual
-                    return datetime.now()
-                except:
-                    return datetime.now()
-            elif isinstance(data_str, datetime):
-                return data_str
-            else:
-                return datetime.now()
+            # Datas não reconhecidas ficam na posição da data atual
+            return self.date_engine.parse(evento.get('data_evento')) or datetime.now()
         
         eventos_ordenados = sorted(eventos, key=get_date)
         return eventos_ordenados
@@ -153,19 +145,8 @@ class TimelineGenerator:
             return None
         
         try:
-            def parse_date(date_str):
-                if isinstance(date_str, datetime):
-                    return date_str
-                if isinstance(date_str, str):
-                    for fmt in ['%Y-%m-%d', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M:%S', '%d/%m/%Y']:
-                        try:
-                            return datetime.strptime(date_str[:10], fmt)
-                        except:
-                            continue
-                return datetime.now()
-            
-            d1 = parse_date(data1)
-            d2 = parse_date(data2)
+            d1 = self.date_engine.parse(data1) or datetime.now()
+            d2 = self.date_engine.parse(data2) or datetime.now()
             
             delta = d2 - d1
             return delta.days
@@ -187,17 +168,8 @@ class TimelineGenerator:
         datas = [e.get('data_evento') for e in timeline if e.get('data_evento')]
         if datas:
             try:
-                datas_parseadas = []
-                for data_str in datas:
-                    if isinstance(data_str, datetime):
-                        datas_parseadas.append(data_str)
-                    elif isinstance(data_str, str):
-                        for fmt in ['%Y-%m-%d', '%Y-%m-%dT%H:%M:%S']:
-                            try:
-                                datas_parseadas.append(datetime.strptime(data_str[:10], fmt))
-                                break
-                            except:
-                                continue
+                datas_parseadas = [self.date_engine.parse(data_str) for data_str in datas]
+                datas_parseadas = [data for data in datas_parseadas if data]
                 
                 if datas_parseadas:
                     periodo_inicio = min(datas_parseadas)
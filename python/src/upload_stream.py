@@ -0,0 +1,65 @@
+"""
+JurisPilot - Recebimento de Uploads
+Grava cada arquivo enviado em um arquivo temporário próprio (em memória até
+um limite), calculando o SHA-256 e aplicando o tamanho máximo durante o envio
+"""
+
+import hashlib
+import tempfile
+from flask import Request, current_app
+from werkzeug.exceptions import RequestEntityTooLarge
+
+
+class HashingSpooledFile(tempfile.SpooledTemporaryFile):
+    """
+    Arquivo temporário que fica em memória até spool_size bytes
+
+    Cada bloco gravado atualiza o SHA-256 e a contagem de bytes; ao passar de
+    max_size o envio é interrompido com RequestEntityTooLarge (HTTP 413).
+    """
+
+    def __init__(self, max_size: int, spool_size: int):
+        super().__init__(max_size=spool_size, prefix='jurispilot_upload_')
+        self.limit = max_size
+        self.size = 0
+        self._sha256 = hashlib.sha256()
+
+    def write(self, data) -> int:
+        self.size += len(data)
+        if self.limit and self.size > self.limit:
+            raise RequestEntityTooLarge(
+                f"Arquivo maior que o limite de {self.limit} bytes (STORAGE_MAX_FILE_SIZE)"
+            )
+        self._sha256.update(data)
+        return super().write(data)
+
+    @property
+    def sha256(self) -> str:
+        """SHA-256 do conteúdo recebido"""
+        return self._sha256.hexdigest()
+
+
+class StreamingUploadRequest(Request):
+    """
+    Request do Flask que recebe os arquivos em HashingSpooledFile
+
+    Limites lidos da configuração da aplicação: UPLOAD_MAX_FILE_SIZE (bytes
+    por arquivo, 0 = sem limite) e UPLOAD_SPOOL_SIZE (bytes mantidos em memória).
+    Os endpoints em UPLOAD_BATCH_ENDPOINTS recebem vários arquivos e usam
+    UPLOAD_BATCH_MAX_CONTENT_LENGTH como limite do corpo da requisição.
+    """
+
+    @property
+    def max_content_length(self):
+        config = current_app.config
+        if self.endpoint in config.get('UPLOAD_BATCH_ENDPOINTS', ()):
+            return config.get('UPLOAD_BATCH_MAX_CONTENT_LENGTH')
+        return super().max_content_length
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None,
+                         content_length=None):
+        config = current_app.config
+        return HashingSpooledFile(
+            max_size=config.get('UPLOAD_MAX_FILE_SIZE', 0),
+            spool_size=config.get('UPLOAD_SPOOL_SIZE', 0)
+        )
@@ -0,0 +1,138 @@
+"""
+JurisPilot - Testes do calendário forense
+Vencimentos conferidos à mão no calendário de cada ano (feriados de
+python/data/feriados.json, recesso de 20/12 a 20/01)
+
+Uso:
+    python -m pytest tests/
+"""
+
+import sys
+import json
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from business_calendar import BusinessCalendar, easter
+
+
+@pytest.fixture(scope="module")
+def calendario():
+    return BusinessCalendar()
+
+
+@pytest.mark.parametrize("ano, pascoa", [
+    (2024, date(2024, 3, 31)),
+    (2025, date(2025, 4, 20)),
+    (2026, date(2026, 4, 5)),
+])
+def test_easter(ano, pascoa):
+    assert easter(ano) == pascoa
+
+
+def test_prazo_atravessa_recesso(calendario):
+    # 11 a 19/12 (7 dias), recesso de 20/12 a 20/01, 21 a 30/01 (8 dias)
+    assert calendario.add_business_days('2024-12-10', 15, 'TJSP') == date(2025, 1, 30)
+    assert calendario.add_business_days('2024-12-10', 15, 'TJSP', 'São Paulo') == date(2025, 1, 30)
+
+
+def test_carnaval(calendario):
+    # Carnaval de 2025: segunda 03/03 e terça 04/03
+    assert not calendario.is_business_day('2025-03-03')
+    assert not calendario.is_business_day('2025-03-04')
+    assert calendario.is_business_day('2025-03-05')
+    assert calendario.add_business_days('2025-02-28', 3) == date(2025, 3, 7)
+
+
+def test_semana_santa_por_tribunal(calendario):
+    # Justiça Federal: quarta, quinta e sexta-feira santas (16 a 18/04/2025); Tiradentes em 21/04
+    assert calendario.add_business_days('2025-04-14', 5, 'TRF3') == date(2025, 4, 25)
+    # Justiça estadual: apenas a sexta-feira santa
+    assert calendario.add_business_days('2025-04-14', 5, 'TJSP') == date(2025, 4, 23)
+
+
+def test_feriado_estadual(calendario):
+    # Revolução Constitucionalista (SP), quarta-feira 09/07/2025
+    assert not calendario.is_business_day('2025-07-09', 'TJSP')
+    assert calendario.is_business_day('2025-07-09', 'TJRJ')
+
+
+def test_feriado_da_comarca(calendario):
+    # Nossa Senhora dos Navegantes (Porto Alegre), segunda-feira 02/02/2026
+    assert calendario.add_business_days('2026-01-30', 1, 'TJRS', 'Porto Alegre') == date(2026, 2, 3)
+    assert calendario.add_business_days('2026-01-30', 1, 'TJRS') == date(2026, 2, 2)
+    # Nossa Senhora da Conceição (Campinas), segunda-feira 08/12/2025
+    assert calendario.add_business_days('2025-12-05', 1, 'TJSP', 'Campinas') == date(2025, 12, 9)
+    assert calendario.add_business_days('2025-12-05', 1, 'TJSP', 'São Paulo') == date(2025, 12, 8)
+
+
+def test_nomes_sem_acentos_nem_maiusculas(calendario):
+    assert calendario.add_business_days('2026-01-30', 1, 'tjrs', 'porto alegre') == date(2026, 2, 3)
+    assert not calendario.is_business_day('2025-12-08', 'TJSP', 'CAMPINAS')
+
+
+def test_desconhecidos_usam_nivel_acima(calendario):
+    # Comarca sem feriados próprios: calendário do tribunal
+    assert calendario.add_business_days('2026-01-30', 1, 'TJRS', 'Pelotas') == date(2026, 2, 2)
+    # Tribunal fora do arquivo: apenas feriados nacionais (Revolução Constitucionalista é estadual)
+    assert calendario.is_business_day('2025-07-09', 'TJXX')
+
+
+def test_feriado_com_ano_inicial(calendario):
+    # Consciência Negra é feriado nacional desde 2024
+    assert calendario.is_business_day('2023-11-20')
+    assert not calendario.is_business_day('2024-11-20')
+
+
+def test_dias_corridos_e_dias_uteis(calendario):
+    # 10 dias corridos a partir de 04/11/2024 vencem na quinta-feira 14/11
+    assert calendario.add_calendar_days('2024-11-04', 10) == date(2024, 11, 14)
+    # Em dias úteis, o feriado de 15/11 e dois fins de semana ficam de fora
+    assert calendario.add_business_days('2024-11-04', 10) == date(2024, 11, 19)
+
+
+def test_dias_corridos_prorrogados(calendario):
+    # Vencimento na segunda de Carnaval (03/03/2025) passa para a quarta-feira
+    assert calendario.add_calendar_days('2025-02-26', 5) == date(2025, 3, 5)
+    # Vencimento no sábado passa para a segunda-feira
+    assert calendario.add_calendar_days('2025-06-06', 1) == date(2025, 6, 9)
+
+
+def test_comeco_sem_expediente(calendario):
+    # Intimação no sábado: contagem a partir da segunda-feira
+    assert calendario.add_business_days('2025-06-07', 1) == date(2025, 6, 10)
+
+
+def test_dias_uteis_entre_datas(calendario):
+    # Semana do Carnaval de 2025: apenas quarta a sexta
+    assert calendario.business_days_between('2025-03-03', '2025-03-10') == 3
+
+
+def test_vencimentos_em_lote(calendario):
+    inicios = ['2024-12-10', '2025-04-14', '2026-01-30', '2025-02-26']
+    dias = [15, 5, 1, 5]
+    tribunais = ['TJSP', 'TRF3', 'TJRS', None]
+    comarcas = [None, None, 'Porto Alegre', None]
+    corridos = [False, False, False, True]
+    vencimentos = calendario.add_business_days_bulk(inicios, dias, tribunais, comarcas, corridos)
+    assert vencimentos.tolist() == [date(2025, 1, 30), date(2025, 4, 25), date(2026, 2, 3), date(2025, 3, 5)]
+    assert vencimentos.dtype == np.dtype('datetime64[D]')
+
+
+def test_suspensao_de_expediente(tmp_path):
+    feriados = {
+        'nacionais': {'fixos': {}},
+        'tribunais': {
+            'TJXX': {'suspensoes': [{'inicio': '2025-05-12', 'fim': '2025-05-14', 'motivo': 'Indisponibilidade'}]}
+        }
+    }
+    arquivo = tmp_path / 'feriados.json'
+    arquivo.write_text(json.dumps(feriados), encoding='utf-8')
+    calendario = BusinessCalendar(str(arquivo), first_year=2025, last_year=2025)
+
+    assert calendario.add_business_days('2025-05-09', 2, 'TJXX') == date(2025, 5, 16)
+    assert calendario.add_business_days('2025-05-09', 2) == date(2025, 5, 13)
@@ -174,6 +174,12 @@ pip install --upgrade pip --quiet
 # Instala dependências
 write_info "Instalando dependências Python..."
 if [ -f "requirements.txt" ]; then
+    # tesserocr é compilado contra a biblioteca do Tesseract
+    if ! pkg-config --exists tesseract lept 2>/dev/null; then
+        write_warning "Bibliotecas de desenvolvimento do Tesseract não encontradas (necessárias para o tesserocr)"
+        write_info "Ubuntu/Debian: sudo apt install libtesseract-dev libleptonica-dev pkg-config"
+        write_info "macOS: brew install tesseract pkg-config"
+    fi
     pip install -r requirements.txt
     if [ $? -eq 0 ]; then
         write_success "Dependências Python instaladas"